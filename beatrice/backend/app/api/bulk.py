@@ -0,0 +1,103 @@
+"""Bulk requests.
+
+This module contains the logic shared by the bulk endpoints of the
+media routers.
+"""
+
+import uuid
+from typing import List, Sequence, Type
+
+import fastapi
+import sqlmodel
+from fastapi import responses
+from fastapi import status
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.api import fieldsets
+from app.crud import base
+from app.models import patron as patron_model
+from app.models import response
+
+
+async def create_bulk(session: aio_session.AsyncSession,
+                      crud: Type[base.BaseCRUD],
+                      models_in: Sequence[sqlmodel.SQLModel], *,
+                      current_patron: patron_model.PatronPrincipal,
+                      conflict_detail: str) -> List[response.BulkItemResult]:
+    """Creates the given media in a single transaction.
+
+    Items are checked as the single create endpoint would, and the
+    accepted items are inserted in batches. Titles already in the catalog,
+    or repeated within the request, are rejected by the unique constraint.
+
+    Args:
+        session: The database session.
+        crud: The CRUD controller of the media.
+        models_in: The data used to create the media.
+        current_patron: The principal of the current authenticated patron.
+        conflict_detail: The detail of items whose title already exists.
+
+    Returns:
+        The result of each item, in the same order.
+    """
+    results: List[response.BulkItemResult | None] = [None] * len(models_in)
+    accepted = []
+
+    for index, model_in in enumerate(models_in):
+        if current_patron.id != model_in.proposed_by:
+            results[index] = response.BulkItemResult(
+                index=index,
+                status=status.HTTP_401_UNAUTHORIZED,
+                detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
+        else:
+            accepted.append(index)
+
+    models_db = await crud.create_multi(
+        session, models_in=[models_in[index] for index in accepted])
+
+    for index, model_db in zip(accepted, models_db):
+        if model_db is None:
+            results[index] = response.BulkItemResult(
+                index=index,
+                status=status.HTTP_409_CONFLICT,
+                detail=conflict_detail)
+        else:
+            results[index] = response.BulkItemResult(
+                index=index, status=status.HTTP_201_CREATED, id=model_db.id)
+
+    return results
+
+
+async def read_batch(session: aio_session.AsyncSession,
+                     crud: Type[base.BaseCRUD],
+                     read_model: Type[sqlmodel.SQLModel],
+                     model_ids: Sequence[uuid.UUID], *,
+                     fields: Sequence[str] | None,
+                     http_response: fastapi.Response) -> responses.Response:
+    """Reads the given media with a single query.
+
+    Args:
+        session: The database session.
+        crud: The CRUD controller of the media.
+        read_model: The model the media are serialized as.
+        model_ids: The ids of the media. Duplicates are read once.
+        fields: The names of the requested fields, or None to return all
+            the fields of the read model.
+        http_response: The response of the endpoint.
+
+    Returns:
+        The response holding the media found and the ids matching no
+        media, in the requested order.
+    """
+    model_ids = list(dict.fromkeys(model_ids))
+    rows_by_id = await crud.read_many(session,
+                                      model_ids,
+                                      fields=fields or
+                                      list(read_model.__fields__))
+    items = [
+        rows_by_id[model_id] for model_id in model_ids if model_id in rows_by_id
+    ]
+    missing = [model_id for model_id in model_ids if model_id not in rows_by_id]
+
+    return fieldsets.batch_response(items, missing, read_model, fields,
+                                    http_response)
@@ -0,0 +1,280 @@
+"""Response compression.
+
+This module contains the middleware compressing the response bodies with
+the encoding preferred by the client among gzip and, when their packages
+are installed, Brotli and Zstandard. Small bodies are sent as they are,
+streamed bodies are compressed chunk by chunk, and the compressed bodies
+of the `GET` responses carrying an `ETag` are cached, so that repeated
+requests for the same representation are not compressed again.
+"""
+
+import functools
+import zlib
+from typing import Callable, Dict, Hashable, Mapping, Sequence
+
+from starlette import datastructures
+from starlette import types
+
+from app.core import cache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class _GzipCompressor:
+    """Incremental gzip compressor."""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED,
+                                            zlib.MAX_WBITS | 16)
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compresses a chunk, flushing it so that it can be sent."""
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zlib.Z_SYNC_FLUSH)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        """Compresses the last chunk and ends the stream."""
+        return self._compressor.compress(chunk) + self._compressor.flush()
+
+
+class _BrotliCompressor:
+    """Incremental Brotli compressor."""
+
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compresses a chunk, flushing it so that it can be sent."""
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        """Compresses the last chunk and ends the stream."""
+        return self._compressor.process(chunk) + self._compressor.finish()
+
+
+class _ZstdCompressor:
+    """Incremental Zstandard compressor."""
+
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        """Compresses a chunk, flushing it so that it can be sent."""
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, chunk: bytes = b"") -> bytes:
+        """Compresses the last chunk and ends the stream."""
+        return self._compressor.compress(chunk) + self._compressor.flush()
+
+
+Compressor = _GzipCompressor | _BrotliCompressor | _ZstdCompressor
+
+# The compressors of the available encodings, by order of preference.
+COMPRESSORS: Dict[str, Callable[[int], Compressor]] = {
+    encoding: compressor
+    for encoding, compressor, module in (("zstd", _ZstdCompressor, zstandard),
+                                         ("br", _BrotliCompressor, brotli),
+                                         ("gzip", _GzipCompressor, zlib))
+    if module is not None
+}
+
+
+def negotiate(accept_encoding: str | None,
+              encodings: Sequence[str]) -> str | None:
+    """Returns the encoding preferred by a client.
+
+    The first of the given encodings wins ties. Responses are compressed
+    unless the client prefers `identity` explicitly.
+
+    Args:
+        accept_encoding: The value of the `Accept-Encoding` header.
+        encodings: The available encodings, by order of preference.
+
+    Returns:
+        The preferred encoding, or None to send the body as it is.
+    """
+    qualities = {}
+
+    for coding in (accept_encoding or "").split(","):
+        name, *params = coding.split(";")
+        quality = 1.0
+
+        for param in params:
+            param_name, _, value = param.partition("=")
+
+            if param_name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        qualities[name.strip().lower()] = quality
+
+    best, best_quality = None, qualities.get("identity", 0.0)
+
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+class CompressionMiddleware:
+    """Middleware compressing the response bodies.
+
+    Responses already encoded, bodiless ones and the ones marked
+    `no-transform` are left alone.
+
+    Attributes:
+        app: The wrapped application.
+        minimum_size: The size under which whole bodies are not compressed,
+            in bytes.
+        compressors: The compressor factories of the available encodings,
+            by order of preference.
+        cache: The compressed bodies of the cacheable responses.
+    """
+
+    def __init__(self, app: types.ASGIApp, *, levels: Mapping[str, int],
+                 minimum_size: int, cache_ttl: float, cache_max_bytes: int):
+        """Initializes the middleware.
+
+        Args:
+            app: The wrapped application.
+            levels: The compression levels, by encoding.
+            minimum_size: The size under which whole bodies are not
+                compressed, in bytes.
+            cache_ttl: The lifetime of a cached body, in seconds.
+            cache_max_bytes: The maximum total size of the cached bodies.
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressors = {
+            encoding: functools.partial(compressor, levels[encoding])
+            for encoding, compressor in COMPRESSORS.items()
+        }
+        self.cache = cache.TTLCache(ttl=cache_ttl,
+                                    max_entries=None,
+                                    max_bytes=cache_max_bytes,
+                                    name="compressed_responses")
+
+    async def __call__(self, scope: types.Scope, receive: types.Receive,
+                       send: types.Send):
+        if scope["type"] == "http":
+            encoding = negotiate(
+                datastructures.Headers(scope=scope).get("Accept-Encoding"),
+                list(self.compressors))
+
+            if encoding is not None:
+                responder = _Responder(self, scope, encoding, send)
+                await self.app(scope, receive, responder.send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+class _Responder:
+    """Compressor of a single response.
+
+    The start of the response is held back until its first body chunk is
+    sent, to decide whether and how the body is compressed.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, scope: types.Scope,
+                 encoding: str, send: types.Send):
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self._send = send
+        self._start: types.Message | None = None
+        self._compressor: Compressor | None = None
+
+    async def send(self, message: types.Message):
+        """Sends a message of the response, compressing its body."""
+        if message["type"] == "http.response.start":
+            self._start = message
+        elif message["type"] != "http.response.body":
+            await self._send(message)
+        elif self._start is not None:
+            start, self._start = self._start, None
+            await self._send_first(start, message)
+        elif self._compressor is not None:
+            more_body = message.get("more_body", False)
+            body = message.get("body", b"")
+            await self._send({
+                "type": "http.response.body",
+                "body": (self._compressor.compress(body)
+                         if more_body else self._compressor.finish(body)),
+                "more_body": more_body
+            })
+        else:
+            await self._send(message)
+
+    async def _send_first(self, start: types.Message, message: types.Message):
+        """Sends the start of the response and its first body chunk."""
+        headers = datastructures.MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if (not 200 <= start["status"] < 300 or start["status"] == 204 or
+                "Content-Encoding" in headers or
+                "no-transform" in headers.get("Cache-Control", "") or
+            (not more_body and len(body) < self.middleware.minimum_size)):
+            await self._send(start)
+            await self._send(message)
+            return
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+
+        if more_body:
+            del headers["Content-Length"]
+            self._compressor = self.middleware.compressors[self.encoding]()
+            await self._send(start)
+            await self._send({
+                "type": "http.response.body",
+                "body": self._compressor.compress(body),
+                "more_body": True
+            })
+            return
+
+        compressed = self._compressed(start["status"], headers, body)
+        headers["Content-Length"] = str(len(compressed))
+        await self._send(start)
+        await self._send({"type": "http.response.body", "body": compressed})
+
+    def _compressed(self, status: int, headers: datastructures.Headers,
+                    body: bytes) -> bytes:
+        """Returns a whole body compressed, from the cache when possible.
+
+        The bodies of the successful `GET` responses carrying an `ETag` are
+        cached by URL, entity tag, media type and encoding. The size of the
+        uncompressed body is checked as well on hits.
+        """
+        if (self.scope["method"] != "GET" or status != 200 or
+                "ETag" not in headers):
+            return self.middleware.compressors[self.encoding]().finish(body)
+
+        key: Hashable = (self.scope["path"],
+                         self.scope["query_string"], headers["ETag"],
+                         headers.get("Content-Type"), self.encoding)
+        entry = self.middleware.cache.get(key)
+
+        if entry is not None and entry[0] == len(body):
+            return entry[1]
+
+        compressed = self.middleware.compressors[self.encoding]().finish(body)
+        self.middleware.cache.set(key, (len(body), compressed),
+                                  size=len(compressed))
+
+        return compressed
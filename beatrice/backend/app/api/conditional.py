@@ -0,0 +1,181 @@
+"""Conditional requests.
+
+This module contains dependencies answering conditional `GET` requests
+with `304 Not Modified` when the representation cached by the client is
+still valid. Freshness is decided from the `updated_at` column through a
+cheap aggregate query, without loading or serializing the models.
+"""
+
+import datetime
+import email.utils
+import hashlib
+import uuid
+from typing import Any, Dict, Sequence, Type
+
+import fastapi
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.api import dependencies
+from app.crud import base
+from app.models import patron as patron_model
+
+
+class NotModifiedError(Exception):
+    """Raised when the representation cached by the client is still valid.
+
+    Attributes:
+        headers: The validators of the current representation.
+    """
+
+    def __init__(self, headers: Dict[str, str]):
+        super().__init__("Not modified.")
+        self.headers = headers
+
+
+def _validators(version: Sequence[Any]) -> Dict[str, str]:
+    """Returns the `ETag` and `Last-Modified` headers of a version.
+
+    The entity tag is weak, since the same version may be serialized
+    differently.
+
+    Args:
+        version: The values that change whenever the representation does.
+    """
+    digest = hashlib.blake2b(repr(tuple(version)).encode(),
+                             digest_size=16).hexdigest()
+    headers = {"ETag": f'W/"{digest}"'}
+    timestamps = [
+        value for value in version if isinstance(value, datetime.datetime)
+    ]
+
+    if timestamps:
+        headers["Last-Modified"] = email.utils.format_datetime(
+            max(timestamps).replace(tzinfo=datetime.timezone.utc), usegmt=True)
+
+    return headers
+
+
+def _is_fresh(request: fastapi.Request, headers: Dict[str, str]) -> bool:
+    """Checks whether the client's cached representation is still valid.
+
+    `If-None-Match` takes precedence over `If-Modified-Since`.
+
+    Args:
+        request: The conditional request.
+        headers: The validators of the current representation.
+    """
+    if_none_match = request.headers.get("If-None-Match")
+
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+
+        etag = headers["ETag"].removeprefix("W/")
+
+        return any(tag.strip().removeprefix("W/") == etag
+                   for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("If-Modified-Since")
+
+    if if_modified_since is None or "Last-Modified" not in headers:
+        return False
+
+    try:
+        since = email.utils.parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+
+    return email.utils.parsedate_to_datetime(
+        headers["Last-Modified"]) <= since.replace(
+            tzinfo=since.tzinfo or datetime.timezone.utc)
+
+
+class ConditionalRequests:
+    """Conditional requests support of a router.
+
+    Routers opt in by adding the `item` and `collection` dependencies to
+    their read endpoints. The dependencies set the `ETag` and
+    `Last-Modified` headers, and raise `NotModifiedError` when the client's
+    representation is still valid, before the endpoint reads anything.
+
+    Attributes:
+        crud: The CRUD controller of the router's models.
+        id_param: The name of the path parameter holding a model id.
+        load: The relationships serialized along with a single model.
+        related: The CRUD controllers of the related models summarized in
+            the lists of models.
+    """
+
+    def __init__(self,
+                 crud: Type[base.BaseCRUD],
+                 *,
+                 id_param: str,
+                 load: base.LoadingProfile = base.LoadingProfile.NONE,
+                 related: Sequence[Type[base.BaseCRUD]] = ()):
+        self.crud = crud
+        self.id_param = id_param
+        self.load = load
+        self.related = related
+
+    def _check(self, request: fastapi.Request, response: fastapi.Response,
+               version: Sequence[Any]):
+        """Sets the validators of a version and checks the client's ones.
+
+        Raises:
+            NotModifiedError: The client's representation is still valid.
+        """
+        headers = _validators(version)
+
+        if _is_fresh(request, headers):
+            raise NotModifiedError(headers)
+
+        response.headers.update(headers)
+
+    async def item(
+        self,
+        request: fastapi.Request,
+        response: fastapi.Response,
+        session: aio_session.AsyncSession = fastapi.Depends(
+            dependencies.get_session),
+        current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+            dependencies.get_current_active_patron),
+    ):
+        """Answers a conditional request for a single model.
+
+        The version of a model is its `updated_at` along with the ones of
+        the relationships loaded by `load`. Missing models and malformed
+        ids are left to the endpoint.
+        """
+        try:
+            model_id = uuid.UUID(request.path_params[self.id_param])
+        except ValueError:
+            return
+
+        version = await self.crud.read_version(session,
+                                               model_id,
+                                               load=self.load)
+
+        if version is not None:
+            self._check(request, response, version)
+
+    async def collection(
+        self,
+        request: fastapi.Request,
+        response: fastapi.Response,
+        session: aio_session.AsyncSession = fastapi.Depends(
+            dependencies.get_session),
+        current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+            dependencies.get_current_active_patron),
+    ):
+        """Answers a conditional request for a list of models.
+
+        The version of a list is the latest `updated_at` and the number of
+        models of the whole collection, so it covers every page, along
+        with the ones of the `related` collections.
+        """
+        version = await self.crud.read_multi_version(session)
+
+        for crud in self.related:
+            version += await crud.read_multi_version(session)
+
+        self._check(request, response, version)
@@ -2,7 +2,6 @@
 
 import fastapi
 import jose
-import sqlmodel
 from fastapi import security, status
 from jose import jwt
 from sqlmodel.ext.asyncio import session as aio_session
@@ -10,6 +9,7 @@ from sqlmodel.ext.asyncio import session as aio_session
 from app.core import config
 from app.core import database
 from app.core import security as appsecurity
+from app.crud import patron as patroncrud
 from app.models import patron as patronmodel
 from app.models import token as tokenmodel
 
@@ -28,8 +28,9 @@ async def get_session() -> aio_session.AsyncSession:
 
 async def get_current_patron(
         session: aio_session.AsyncSession = fastapi.Depends(get_session),
-        token: str = fastapi.Depends(oauth2_scheme)) -> patronmodel.Patron:
-    """Returns the current authenticated patron.
+        token: str = fastapi.Depends(oauth2_scheme)
+) -> patronmodel.PatronPrincipal:
+    """Returns the principal of the current authenticated patron.
 
     Args:
         session: The database session.
@@ -54,22 +55,20 @@ async def get_current_patron(
     except jose.JWTError as subject_missing:
         raise credentials_exception from subject_missing
 
-    patrons = await session.exec(
-        sqlmodel.select(patronmodel.Patron).where(
-            patronmodel.Patron.username == token_data.subject))
-    patron = patrons.first()
+    principal = await patroncrud.PatronCRUD.get_principal(
+        session, token_data.subject)
 
-    if patron is None:
+    if principal is None:
         raise credentials_exception
 
-    return patron
+    return principal
 
 
 async def get_current_patron_or_none(
         session: aio_session.AsyncSession = fastapi.Depends(get_session),
         token: str = fastapi.Depends(optional_oauth2_scheme)
-) -> patronmodel.Patron | None:
-    """Returns the current authenticated patron or `None`.
+) -> patronmodel.PatronPrincipal | None:
+    """Returns the principal of the current authenticated patron or `None`.
 
     Args:
         session: The database session.
@@ -82,12 +81,12 @@ async def get_current_patron_or_none(
 
 
 async def get_current_active_patron(
-        current_patron: patronmodel.Patron = fastapi.Depends(get_current_patron)
-) -> patronmodel.Patron:
+        current_patron: patronmodel.PatronPrincipal = fastapi.Depends(
+            get_current_patron)) -> patronmodel.PatronPrincipal:
     """Returns the current user if active.
 
     Args:
-        current_patron: The current authenticated patron.
+        current_patron: The principal of the current authenticated patron.
     """
     if not current_patron.is_active:
         raise fastapi.HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
@@ -97,12 +96,12 @@ async def get_current_active_patron(
 
 
 async def get_current_active_superuser(
-        current_patron: patronmodel.Patron = fastapi.Depends(get_current_patron)
-) -> patronmodel.Patron:
+        current_patron: patronmodel.PatronPrincipal = fastapi.Depends(
+            get_current_patron)) -> patronmodel.PatronPrincipal:
     """Returns the current user if superuser.
 
     Args:
-        current_patron: The current authenticated patron.
+        current_patron: The principal of the current authenticated patron.
     """
     if not current_patron.is_superuser:
         raise fastapi.HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,128 @@
+"""JSON encoders of database rows.
+
+This module contains encoders serializing the rows read by the CRUD
+controllers straight to JSON, as FastAPI would serialize the same rows
+validated into a read model, without building nor validating models.
+"""
+
+import datetime
+import functools
+import json
+import uuid
+from json import encoder as json_encoder
+from typing import Any, Callable, Mapping, Sequence, Tuple, Type
+
+import pydantic
+from fastapi import encoders
+
+RowEncoder = Callable[[Mapping[str, Any]], str]
+
+
+def _encode_bool(value: bool) -> str:
+    """Encodes a boolean."""
+    return "true" if value else "false"
+
+
+def _encode_uuid(value: uuid.UUID) -> str:
+    """Encodes a UUID as a string."""
+    return f'"{value}"'
+
+
+def _encode_date(value: datetime.date) -> str:
+    """Encodes a date or a datetime in the ISO 8601 format."""
+    return f'"{value.isoformat()}"'
+
+
+def _encode_any(value: Any) -> str:
+    """Encodes any value as FastAPI's JSON responses do."""
+    return json.dumps(encoders.jsonable_encoder(value),
+                      ensure_ascii=False,
+                      allow_nan=False,
+                      separators=(",", ":"))
+
+
+def _value_encoder(field: pydantic.fields.ModelField) -> Callable[[Any], str]:
+    """Returns the function encoding the non-null values of a field.
+
+    Args:
+        field: The model field.
+    """
+    field_type = field.type_
+
+    if field.shape != pydantic.fields.SHAPE_SINGLETON or not isinstance(
+            field_type, type):
+        return _encode_any
+    if issubclass(field_type, bool):
+        return _encode_bool
+    if issubclass(field_type, int):
+        return int.__repr__
+    if issubclass(field_type, str):
+        return json_encoder.encode_basestring
+    if issubclass(field_type, uuid.UUID):
+        return _encode_uuid
+    if issubclass(field_type, datetime.date):
+        return _encode_date
+
+    return _encode_any
+
+
+@functools.lru_cache(maxsize=None)
+def row_encoder(read_model: Type[pydantic.BaseModel],
+                fields: Tuple[str, ...] | None = None) -> RowEncoder:
+    """Returns the encoder of rows as JSON objects.
+
+    The keys and the value encoders are resolved once per read model and
+    fields, so encoding a row only looks up and encodes its values.
+
+    Args:
+        read_model: The model the rows are serialized as.
+        fields: The names of the only fields to encode, in this order, or
+            None to encode all the fields of the model.
+    """
+    names = read_model.__fields__ if fields is None else fields
+    parts = [(name, f"{json.dumps(read_model.__fields__[name].alias)}:",
+              _value_encoder(read_model.__fields__[name])) for name in names]
+
+    def encode(row: Mapping[str, Any]) -> str:
+        members = []
+
+        for name, key, encode_value in parts:
+            value = row[name]
+            members.append(key +
+                           ("null" if value is None else encode_value(value)))
+
+        return "{" + ",".join(members) + "}"
+
+    return encode
+
+
+def encode_rows(read_model: Type[pydantic.BaseModel],
+                rows: Sequence[Mapping[str, Any]],
+                fields: Sequence[str] | None = None) -> bytes:
+    """Encodes rows as a JSON array of objects.
+
+    Args:
+        read_model: The model the rows are serialized as.
+        rows: The rows, holding at least the values of the fields.
+        fields: The names of the only fields to encode, or None to encode
+            all the fields of the model.
+    """
+    encode = row_encoder(read_model, None if fields is None else tuple(fields))
+
+    return f"[{','.join(map(encode, rows))}]".encode()
+
+
+def encode_row(read_model: Type[pydantic.BaseModel],
+               row: Mapping[str, Any],
+               fields: Sequence[str] | None = None) -> bytes:
+    """Encodes a row as a JSON object.
+
+    Args:
+        read_model: The model the row is serialized as.
+        row: The row, holding at least the values of the fields.
+        fields: The names of the only fields to encode, or None to encode
+            all the fields of the model.
+    """
+    encode = row_encoder(read_model, None if fields is None else tuple(fields))
+
+    return encode(row).encode()
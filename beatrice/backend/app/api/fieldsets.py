@@ -0,0 +1,143 @@
+"""Sparse fieldsets.
+
+This module contains utility functions letting read endpoints return only
+the fields requested with the `fields` query parameter. Only the matching
+columns are selected, and the rows are encoded straight to JSON, without
+building nor validating models.
+"""
+
+import uuid
+from typing import Any, Dict, List, Sequence, Type
+
+import fastapi
+import sqlmodel
+from fastapi import responses
+from fastapi import status
+
+from app.api import encoders
+from app.api import serialization
+
+
+def parse(fields: str | None,
+          read_model: Type[sqlmodel.SQLModel]) -> List[str] | None:
+    """Returns the names of the requested fields.
+
+    Args:
+        fields: The comma-separated names of the fields, or None to return
+            whole models.
+        read_model: The model whose fields can be requested.
+
+    Returns:
+        The names of the fields, without duplicates, or None if no fields
+        were requested.
+
+    Raises:
+        HTTPException: A field is not serialized by the read model.
+    """
+    if fields is None:
+        return None
+
+    names = list(dict.fromkeys(field.strip() for field in fields.split(",")))
+
+    for name in names:
+        if name not in read_model.__fields__:
+            raise fastapi.HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field {name!r}. Available fields: "
+                f"{', '.join(read_model.__fields__)}.")
+
+    return names
+
+
+def _sparse(row: Dict[str, Any], names: Sequence[str]) -> Dict[str, Any]:
+    """Returns the values of the given fields of a row."""
+    return {name: row[name] for name in names}
+
+
+def _render(content: Dict[str, Any] | Sequence[Dict[str, Any]],
+            read_model: Type[sqlmodel.SQLModel], fields: Sequence[str] | None,
+            media_type: str) -> bytes:
+    """Serializes a row or a list of rows to the given media type."""
+    if media_type == serialization.MSGPACK_MEDIA_TYPE:
+        names = list(read_model.__fields__) if fields is None else fields
+
+        if isinstance(content, dict):
+            return serialization.render(_sparse(content, names), media_type)
+
+        return serialization.render([_sparse(row, names) for row in content],
+                                    media_type)
+
+    if isinstance(content, dict):
+        return encoders.encode_row(read_model, content, fields)
+
+    return encoders.encode_rows(read_model, content, fields)
+
+
+def _response(body: bytes, media_type: str,
+              http_response: fastapi.Response) -> responses.Response:
+    """Returns a response holding a serialized body.
+
+    Endpoints returning a response directly skip its serialization, so the
+    headers already set on the endpoint's response are copied over.
+    """
+    rows_response = responses.Response(body, media_type=media_type)
+    rows_response.headers.raw.extend(http_response.headers.raw)
+    rows_response.headers.add_vary_header("Accept")
+
+    return rows_response
+
+
+def response(content: Dict[str, Any] | Sequence[Dict[str, Any]],
+             read_model: Type[sqlmodel.SQLModel], fields: Sequence[str] | None,
+             http_response: fastapi.Response) -> responses.Response:
+    """Returns a response holding the requested fields of rows.
+
+    Rows are encoded straight to JSON, or serialized to MessagePack for the
+    clients preferring it.
+
+    Args:
+        content: A row or a list of rows, as read by the CRUD controllers
+            with `fields`.
+        read_model: The model the rows are serialized as.
+        fields: The names of the requested fields, or None to return all
+            the fields of the read model.
+        http_response: The response of the endpoint.
+    """
+    media_type = serialization.media_type()
+
+    return _response(_render(content, read_model, fields, media_type),
+                     media_type, http_response)
+
+
+def batch_response(items: Sequence[Dict[str,
+                                        Any]], missing: Sequence[uuid.UUID],
+                   read_model: Type[sqlmodel.SQLModel],
+                   fields: Sequence[str] | None,
+                   http_response: fastapi.Response) -> responses.Response:
+    """Returns a response holding the result of a batch get request.
+
+    The body matches `response.BatchGetResult`.
+
+    Args:
+        items: The rows found, as read by the CRUD controllers with `fields`.
+        missing: The requested ids matching no row.
+        read_model: The model the rows are serialized as.
+        fields: The names of the requested fields, or None to return all
+            the fields of the read model.
+        http_response: The response of the endpoint.
+    """
+    media_type = serialization.media_type()
+
+    if media_type == serialization.MSGPACK_MEDIA_TYPE:
+        names = list(read_model.__fields__) if fields is None else fields
+        body = serialization.render(
+            {
+                "items": [_sparse(row, names) for row in items],
+                "missing": missing
+            }, media_type)
+    else:
+        items_body = _render(items, read_model, fields, media_type)
+        missing_body = serialization.render(missing, media_type)
+        body = b'{"items":%b,"missing":%b}' % (items_body, missing_body)
+
+    return _response(body, media_type, http_response)
@@ -0,0 +1,55 @@
+"""Near-duplicate checks.
+
+This module contains the check of the English title of new media against
+the titles of the media in the catalog, shared by the create endpoints of
+the media routers.
+"""
+
+import enum
+
+import fastapi
+from fastapi import status
+
+from app.crud import duplicates
+
+# The header listing the ids of the media similar to the created one.
+HEADER = "X-Near-Duplicates"
+
+
+class Mode(str, enum.Enum):
+    """What to do when the title of a new media is similar to others."""
+    IGNORE = "ignore"
+    WARN = "warn"
+    REJECT = "reject"
+
+
+def check(media_type: str, title: str, *, mode: Mode,
+          http_response: fastapi.Response):
+    """Checks a new title against the titles of a media type.
+
+    Args:
+        media_type: The media type.
+        title: The English title of the new media.
+        mode: What to do when the title is similar to others.
+        http_response: The response of the endpoint, whose headers list the
+            similar media in warn mode.
+
+    Raises:
+        HTTPException: The title is similar to others in reject mode.
+    """
+    if mode is Mode.IGNORE:
+        return
+
+    matches = duplicates.find(media_type, title)
+
+    if not matches:
+        return
+    if mode is Mode.REJECT:
+        titles = ", ".join(f"'{match['title_en']}'" for match in matches[:5])
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Media with a similar title exist in the system: {titles}.",
+        )
+
+    http_response.headers[HEADER] = ", ".join(
+        str(match["id"]) for match in matches)
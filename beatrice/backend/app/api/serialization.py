@@ -0,0 +1,285 @@
+"""Response serialization.
+
+This module contains the route class serializing the responses of the
+endpoints with orjson, or with MessagePack for the clients preferring it,
+instead of FastAPI's `jsonable_encoder` and `json`. Responses are still
+validated against the `response_model` of their endpoint, and models are
+then turned into dicts whose UUIDs, dates and datetimes are encoded by the
+serializers themselves.
+"""
+
+import asyncio
+import contextvars
+import datetime
+import functools
+import inspect
+import uuid
+from typing import Any, Callable, Tuple
+
+import fastapi
+import msgpack
+import orjson
+import pydantic
+from fastapi import encoders
+from fastapi import routing
+from pydantic import utils as pydantic_utils
+from starlette import concurrency
+
+from app.core import config
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# The media types of the serializers, by the media types clients accept.
+_ACCEPTED = {
+    "*/*": JSON_MEDIA_TYPE,
+    "application/*": JSON_MEDIA_TYPE,
+    JSON_MEDIA_TYPE: JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE: MSGPACK_MEDIA_TYPE,
+    "application/x-msgpack": MSGPACK_MEDIA_TYPE,
+}
+
+# The media type negotiated for the response of the current request.
+_media_type: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "media_type", default=JSON_MEDIA_TYPE)
+
+# The names of the parameters the route class adds to endpoints lacking
+# them.
+_REQUEST_PARAM = "_serialization_request"
+_RESPONSE_PARAM = "_serialization_response"
+
+
+def negotiate(accept: str | None) -> str:
+    """Returns the media type of the serializer preferred by a client.
+
+    JSON is preferred on ties, and when nothing else is accepted.
+
+    Args:
+        accept: The value of the `Accept` header.
+    """
+    best, best_quality = JSON_MEDIA_TYPE, 0.0
+
+    for media_range in (accept or "").split(","):
+        range_type, *params = media_range.split(";")
+        quality = 1.0
+
+        for param in params:
+            name, _, value = param.partition("=")
+
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        accepted = _ACCEPTED.get(range_type.strip().lower())
+
+        if accepted is not None and (quality > best_quality or
+                                     (quality == best_quality and
+                                      accepted == JSON_MEDIA_TYPE)):
+            best, best_quality = accepted, quality
+
+    return best
+
+
+def media_type() -> str:
+    """Returns the media type negotiated for the current response."""
+    return _media_type.get()
+
+
+def _default(value: Any, **options: Any) -> Any:
+    """Converts the values orjson does not serialize natively.
+
+    Args:
+        value: The value to convert.
+        options: The arguments of `jsonable_encoder`, e.g. `exclude_unset`,
+            models are converted with. Models are converted by alias unless
+            stated otherwise.
+    """
+    options = {"by_alias": True, **options}
+
+    if isinstance(value, pydantic.BaseModel):
+        return value.dict(**options)
+
+    return encoders.jsonable_encoder(value, **options)
+
+
+def _msgpack_default(value: Any, **options: Any) -> Any:
+    """Converts the values MessagePack does not serialize natively.
+
+    UUIDs, dates and datetimes are converted to the same strings as in
+    JSON.
+
+    Args:
+        value: The value to convert.
+        options: The arguments models are converted with, as in `_default`.
+    """
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+
+    return _default(value, **options)
+
+
+def render(content: Any, serialized_media_type: str, **options: Any) -> bytes:
+    """Serializes content to the given media type.
+
+    Args:
+        content: The content to serialize.
+        serialized_media_type: `JSON_MEDIA_TYPE` or `MSGPACK_MEDIA_TYPE`.
+        options: The arguments models are converted with, as in `_default`.
+    """
+    if serialized_media_type == MSGPACK_MEDIA_TYPE:
+        return msgpack.packb(content,
+                             default=functools.partial(_msgpack_default,
+                                                       **options))
+
+    return orjson.dumps(content, default=functools.partial(_default, **options))
+
+
+def _param_name(signature: inspect.Signature, annotation: type,
+                default_name: str) -> Tuple[str, bool]:
+    """Returns the name of the parameter of an endpoint with an annotation.
+
+    Args:
+        signature: The signature of the endpoint.
+        annotation: The annotation of the parameter.
+        default_name: The name of the parameter to add when missing.
+
+    Returns:
+        The name of the parameter, and whether it must be added.
+    """
+    for param in signature.parameters.values():
+        if pydantic_utils.lenient_issubclass(param.annotation, annotation):
+            return param.name, False
+
+    return default_name, True
+
+
+class Route(routing.APIRoute):
+    """Route serializing the responses of its endpoint.
+
+    The endpoint is wrapped by a function taking the request and the
+    response of the endpoint as well, so that it negotiates the media type
+    of the response and carries over the headers and the status code set
+    on it, as FastAPI does. Endpoints returning a response directly are
+    left alone. When `FAST_SERIALIZATION_ENABLED` is false, the route
+    behaves as FastAPI's ones do.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if not config.settings.FAST_SERIALIZATION_ENABLED:
+            super().__init__(path, endpoint, **kwargs)
+            return
+
+        super().__init__(path, self._serializing(endpoint), **kwargs)
+        # Routers including this one wrap the original endpoint again.
+        self.endpoint = endpoint
+
+    def _serializing(self, endpoint: Callable[..., Any]) -> Callable[..., Any]:
+        """Returns the endpoint wrapped so that it serializes its responses.
+
+        Args:
+            endpoint: The endpoint.
+        """
+        signature = inspect.signature(endpoint)
+        params = list(signature.parameters.values())
+        request_name, add_request = _param_name(signature, fastapi.Request,
+                                                _REQUEST_PARAM)
+        response_name, add_response = _param_name(signature, fastapi.Response,
+                                                  _RESPONSE_PARAM)
+
+        if add_request:
+            params.append(
+                inspect.Parameter(request_name,
+                                  inspect.Parameter.KEYWORD_ONLY,
+                                  annotation=fastapi.Request))
+        if add_response:
+            params.append(
+                inspect.Parameter(response_name,
+                                  inspect.Parameter.KEYWORD_ONLY,
+                                  annotation=fastapi.Response))
+
+        @functools.wraps(endpoint)
+        async def serializing_endpoint(**values: Any) -> fastapi.Response:
+            request = values[request_name]
+            response = values[response_name]
+
+            if add_request:
+                del values[request_name]
+            if add_response:
+                del values[response_name]
+
+            serialized_media_type = negotiate(request.headers.get("Accept"))
+            token = _media_type.set(serialized_media_type)
+
+            try:
+                if asyncio.iscoroutinefunction(endpoint):
+                    content = await endpoint(**values)
+                else:
+                    content = await concurrency.run_in_threadpool(
+                        endpoint, **values)
+            finally:
+                _media_type.reset(token)
+
+            if isinstance(content, fastapi.Response):
+                return content
+
+            return self._response(content, serialized_media_type, response)
+
+        serializing_endpoint.__signature__ = signature.replace(
+            parameters=params)
+
+        return serializing_endpoint
+
+    def _response(self, content: Any, serialized_media_type: str,
+                  response: fastapi.Response) -> fastapi.Response:
+        """Returns the response holding the serialized content.
+
+        The `response_model_*` settings of the route apply as they do in
+        FastAPI's routes: models are converted to dicts without the excluded
+        fields before being validated, and again once validated. `Accept`
+        is added to the fields the endpoint's response varies on.
+
+        Args:
+            content: The value returned by the endpoint.
+            serialized_media_type: The negotiated media type.
+            response: The response of the endpoint.
+
+        Raises:
+            ValidationError: The content does not match the response model.
+        """
+        if self.secure_cloned_response_field is not None:
+            content = routing._prepare_response_content(  # pylint: disable=protected-access
+                content,
+                exclude_unset=self.response_model_exclude_unset,
+                exclude_defaults=self.response_model_exclude_defaults,
+                exclude_none=self.response_model_exclude_none)
+            content, errors = self.secure_cloned_response_field.validate(
+                content, {}, loc=("response",))
+
+            if errors:
+                raise pydantic.ValidationError(
+                    errors if isinstance(errors, list) else [errors],
+                    self.secure_cloned_response_field.type_)
+
+        body = render(content,
+                      serialized_media_type,
+                      include=self.response_model_include,
+                      exclude=self.response_model_exclude,
+                      by_alias=self.response_model_by_alias,
+                      exclude_unset=self.response_model_exclude_unset,
+                      exclude_defaults=self.response_model_exclude_defaults,
+                      exclude_none=self.response_model_exclude_none)
+        serialized_response = fastapi.Response(body,
+                                               status_code=self.status_code or
+                                               200,
+                                               media_type=serialized_media_type)
+        serialized_response.headers.raw.extend(response.headers.raw)
+        serialized_response.headers.add_vary_header("Accept")
+
+        if response.status_code:
+            serialized_response.status_code = response.status_code
+
+        return serialized_response
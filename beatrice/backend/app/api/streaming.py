@@ -0,0 +1,89 @@
+"""Streaming responses.
+
+This module contains utility functions to export whole collections as
+newline delimited JSON (NDJSON) without holding them in memory.
+"""
+
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, Type
+
+import sqlmodel
+from fastapi import responses
+from pydantic import json as pydantic_json
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.core import config
+from app.crud import base
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def ndjson_lines(
+        session: aio_session.AsyncSession,
+        crud: Type[base.BaseCRUD],
+        read_model: Type[sqlmodel.SQLModel],
+        extra: Dict[str, Any] | None = None) -> AsyncIterator[bytes]:
+    """Yields all the models of a collection as NDJSON chunks.
+
+    Only the columns serialized by the read model are selected, and each
+    chunk holds one batch of rows.
+
+    Args:
+        session: The database session.
+        crud: The CRUD controller of the collection.
+        read_model: The model whose fields are exported.
+        extra: Fields prepended to every exported object.
+    """
+    extra = extra or {}
+
+    async for rows in crud.stream(session,
+                                  fields=list(read_model.__fields__),
+                                  batch_size=config.settings.EXPORT_BATCH_SIZE):
+        yield "".join(
+            json.dumps({
+                **extra,
+                **row
+            }, default=pydantic_json.pydantic_encoder) + "\n"
+            for row in rows).encode()
+
+
+async def _gzip(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Compresses the given chunks incrementally in the gzip format.
+
+    Args:
+        chunks: The uncompressed chunks.
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+
+        if compressed:
+            yield compressed
+
+    yield compressor.flush()
+
+
+def ndjson_response(chunks: AsyncIterator[bytes], *, filename: str,
+                    compress: bool) -> responses.StreamingResponse:
+    """Returns a response streaming the given NDJSON chunks.
+
+    The next chunk is produced only once the previous one has been sent,
+    so slow clients slow down the database cursor instead of filling the
+    memory.
+
+    Args:
+        chunks: The NDJSON chunks.
+        filename: The name of the downloaded file.
+        compress: Whether to gzip the response body.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if compress:
+        chunks = _gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return responses.StreamingResponse(chunks,
+                                       media_type=NDJSON_MEDIA_TYPE,
+                                       headers=headers)
@@ -1,20 +1,33 @@
 """Anime endpoints."""
 
 import http
+import uuid
 from typing import List
 
 import fastapi
-import pydantic
 from fastapi import status
 from sqlmodel.ext.asyncio import session as aio_session
 
+from app.api import bulk
+from app.api import conditional
 from app.api import dependencies
+from app.api import fieldsets
+from app.api import near_duplicates
+from app.api import serialization
+from app.api import streaming
+from app.core import config
+from app.core import pagination
 from app.crud import anime as anime_crud
+from app.crud import base as base_crud
 from app.models import anime as anime_model
 from app.models import patron as patron_model
 from app.models import response
 
-router = fastapi.APIRouter()
+router = fastapi.APIRouter(route_class=serialization.Route)
+conditional_requests = conditional.ConditionalRequests(
+    anime_crud.AnimeCRUD,
+    id_param="anime_id",
+    load=base_crud.LoadingProfile.PATRON)
 
 
 @router.post("/",
@@ -33,73 +46,224 @@ async def create_anime(
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
     anime_in: anime_model.AnimeCreate,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    near_duplicate: near_duplicates.Mode = near_duplicates.Mode.IGNORE,
+    http_response: fastapi.Response,
 ) -> anime_model.Anime:
-    """Creates a new anime."""
-    anime_db = await anime_crud.AnimeCRUD.get_by_title(session,
-                                                       anime_in.title_en)
+    """Creates a new anime.
 
-    if anime_db:
-        raise fastapi.HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="An anime with this title already exists in the system.",
-        )
+    Titles similar to the ones of other anime are accepted, reported in the
+    `X-Near-Duplicates` header or rejected, depending on `near_duplicate`.
+    """
     if current_patron.id != anime_in.proposed_by:
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
+    near_duplicates.check("anime",
+                          anime_in.title_en,
+                          mode=near_duplicate,
+                          http_response=http_response)
     anime = await anime_crud.AnimeCRUD.create(session, model_in=anime_in)
 
+    if not anime:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An anime with this title already exists in the system.",
+        )
+
     return anime
 
 
+@router.post("/bulk",
+             response_model=List[response.BulkItemResult],
+             responses={401: {
+                 "model": response.Response
+             }})
+async def create_anime_bulk(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    anime_in: List[anime_model.AnimeCreate] = fastapi.Body(
+        ..., max_items=config.settings.BULK_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+) -> List[response.BulkItemResult]:
+    """Creates many anime in a single transaction.
+
+    Each item is checked as a single create would be, and the response
+    holds the status of every item.
+    """
+    return await bulk.create_bulk(
+        session,
+        anime_crud.AnimeCRUD,
+        anime_in,
+        current_patron=current_patron,
+        conflict_detail="An anime with this title already exists in the system."
+    )
+
+
+@router.post("/batch-get",
+             response_model=response.BatchGetResult[anime_model.AnimeRead],
+             responses={
+                 400: {
+                     "model": response.Response
+                 },
+                 401: {
+                     "model": response.Response
+                 }
+             })
+async def read_anime_batch(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    ids: List[uuid.UUID] = fastapi.Body(
+        ..., embed=True, max_items=config.settings.BATCH_GET_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
+) -> fastapi.Response:
+    """Returns many anime given their ids.
+
+    The anime are read with a single query and returned in the requested
+    order, along with the ids matching no anime. Only the comma-separated
+    `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, anime_model.AnimeRead)
+
+    return await bulk.read_batch(session,
+                                 anime_crud.AnimeCRUD,
+                                 anime_model.AnimeRead,
+                                 ids,
+                                 fields=field_names,
+                                 http_response=http_response)
+
+
+@router.get("/export",
+            responses={
+                200: {
+                    "content": {
+                        streaming.NDJSON_MEDIA_TYPE: {}
+                    }
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def export_anime(
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    compress: bool = False,
+) -> fastapi.Response:
+    """Exports all the anime as NDJSON, optionally gzipped."""
+    lines = streaming.ndjson_lines(session, anime_crud.AnimeCRUD,
+                                   anime_model.AnimeRead)
+
+    return streaming.ndjson_response(lines,
+                                     filename="anime.ndjson",
+                                     compress=compress)
+
+
 @router.get("/{anime_id}",
             response_model=anime_model.AnimeReadWithPatron,
             responses={
+                400: {
+                    "model": response.Response
+                },
                 401: {
                     "model": response.Response
                 },
                 404: {
                     "model": response.Response
                 }
-            })
+            },
+            dependencies=[fastapi.Depends(conditional_requests.item)])
 async def read_anime(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    anime_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    anime_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
 ) -> anime_model.Anime:
-    """Returns an anime given the id."""
-    anime = await anime_crud.AnimeCRUD.read(session, anime_id)
+    """Returns an anime given the id.
+
+    Only the comma-separated `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, anime_model.AnimeRead)
+    anime = await anime_crud.AnimeCRUD.read(
+        session,
+        anime_id,
+        load=base_crud.LoadingProfile.PATRON,
+        fields=field_names)
 
     if not anime:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Anime not found.")
 
+    if field_names is not None:
+        return fieldsets.response(anime, anime_model.AnimeRead, field_names,
+                                  http_response)
+
     return anime
 
 
 @router.get("/",
             response_model=List[anime_model.AnimeRead],
-            responses={401: {
-                "model": response.Response
-            }})
+            responses={
+                400: {
+                    "model": response.Response
+                },
+                401: {
+                    "model": response.Response
+                }
+            },
+            dependencies=[fastapi.Depends(conditional_requests.collection)])
 async def read_anime_list(
+    request: fastapi.Request,
+    http_response: fastapi.Response,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
     offset: int = 0,
     limit: int = fastapi.Query(default=100, le=100),
-) -> List[anime_model.Anime]:
-    """Returns a list of anime."""
-    return await anime_crud.AnimeCRUD.read_multi(session,
-                                                 offset=offset,
-                                                 limit=limit)
+    cursor: str | None = None,
+    filters: anime_model.AnimeFilters = fastapi.Depends(),
+    sort: str | None = None,
+    fields: str | None = None,
+) -> fastapi.Response:
+    """Returns a list of anime.
+
+    The list is filtered by the given fields, and sorted by `sort`, the
+    comma-separated names of fields each prefixed by `-` for a descending
+    order. When the page is full, the `Link` header points to the next page.
+    Only the comma-separated `fields` are returned, when given.
+
+    The rows are encoded straight to JSON, without building models.
+    """
+    field_names = fieldsets.parse(fields, anime_model.AnimeRead)
+    anime_list = await anime_crud.AnimeCRUD.read_multi(
+        session,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        filters=filters.dict(exclude_none=True),
+        sort=sort,
+        fields=field_names or list(anime_model.AnimeRead.__fields__))
+
+    if len(anime_list) == limit:
+        http_response.headers["Link"] = pagination.next_page_link(
+            request.url, anime_crud.AnimeCRUD.cursor(anime_list[-1], sort=sort))
+
+    return fieldsets.response(anime_list, anime_model.AnimeRead, field_names,
+                              http_response)
 
 
 @router.put("/",
@@ -110,35 +274,92 @@ async def read_anime_list(
                 },
                 404: {
                     "model": response.Response
+                },
+                409: {
+                    "model": response.Response
                 }
             })
 async def update_anime(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
-    anime_id: pydantic.UUID4,
+    anime_id: uuid.UUID,
     anime_in: anime_model.AnimeUpdate,
 ) -> anime_model.Anime:
     """Updates an anime."""
-    anime_db = await anime_crud.AnimeCRUD.read(session, anime_id)
+    try:
+        anime_db = await anime_crud.AnimeCRUD.update_by_id(
+            session,
+            anime_id,
+            model_in=anime_in,
+            conditions={"proposed_by": current_patron.id})
+    except base_crud.ConflictError as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An anime with this title already exists in the system.",
+        ) from exc
 
     if not anime_db:
-        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Anime not found.")
-    if current_patron.id != anime_db.proposed_by:
+        if not await anime_crud.AnimeCRUD.exists(session, anime_id):
+            raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail="Anime not found.")
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
-    anime_db = await anime_crud.AnimeCRUD.update(session,
-                                                 model_db=anime_db,
-                                                 model_in=anime_in)
-
     return anime_db
 
 
+@router.put("/by-title",
+            response_model=anime_model.AnimeRead,
+            responses={
+                201: {
+                    "model": anime_model.AnimeRead
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def upsert_anime(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    anime_in: anime_model.AnimeCreate,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+    http_response: fastapi.Response,
+) -> anime_model.Anime:
+    """Creates an anime, or updates the one with the same title.
+
+    The anime is written with a single statement, and the status code tells
+    whether it was created. Only the patron who proposed an existing anime
+    can update it.
+    """
+    unauthorized = fastapi.HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
+
+    if current_patron.id != anime_in.proposed_by:
+        raise unauthorized
+
+    written = await anime_crud.AnimeCRUD.upsert(
+        session,
+        model_in=anime_in,
+        conditions={"proposed_by": current_patron.id})
+
+    if not written:
+        raise unauthorized
+
+    anime, created = written
+
+    if created:
+        http_response.status_code = status.HTTP_201_CREATED
+
+    return anime
+
+
 @router.delete("/",
                status_code=204,
                responses={
@@ -153,17 +374,15 @@ async def delete_anime(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    anime_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    anime_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_superuser),
 ):
     """Deletes an anime."""
-    anime_db = await anime_crud.AnimeCRUD.read(session, anime_id)
+    anime_db = await anime_crud.AnimeCRUD.delete_by_id(session, anime_id)
 
     if not anime_db:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Anime not found.")
 
-    await anime_crud.AnimeCRUD.delete(session, anime_id)
-
     return fastapi.Response(status_code=http.HTTPStatus.NO_CONTENT.value)
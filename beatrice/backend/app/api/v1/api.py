@@ -2,17 +2,32 @@
 
 import fastapi
 
+from app.api import serialization
 from app.api.v1 import anime
+from app.api.v1 import batch
 from app.api.v1 import book
+from app.api.v1 import cache
+from app.api.v1 import duplicates
+from app.api.v1 import export
 from app.api.v1 import login
 from app.api.v1 import manga
 from app.api.v1 import movie
 from app.api.v1 import patrons
+from app.api.v1 import search
+from app.api.v1 import suggest
 
-api_router = fastapi.APIRouter()
+api_router = fastapi.APIRouter(route_class=serialization.Route)
 api_router.include_router(anime.router, prefix="/anime", tags=["anime"])
+api_router.include_router(batch.router, prefix="/batch", tags=["batch"])
 api_router.include_router(book.router, prefix="/books", tags=["books"])
+api_router.include_router(cache.router, prefix="/cache", tags=["cache"])
+api_router.include_router(duplicates.router,
+                          prefix="/duplicates",
+                          tags=["duplicates"])
+api_router.include_router(export.router, prefix="/export", tags=["export"])
 api_router.include_router(login.router, prefix="/login", tags=["login"])
 api_router.include_router(manga.router, prefix="/manga", tags=["manga"])
 api_router.include_router(movie.router, prefix="/movies", tags=["movies"])
 api_router.include_router(patrons.router, prefix="/patrons", tags=["patrons"])
+api_router.include_router(search.router, prefix="/search", tags=["search"])
+api_router.include_router(suggest.router, prefix="/suggest", tags=["suggest"])
@@ -0,0 +1,233 @@
+"""Batch endpoints."""
+
+import uuid
+from typing import List, Sequence, Tuple
+
+import fastapi
+import pydantic
+import sqlalchemy
+from fastapi import status
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.api import dependencies
+from app.api import near_duplicates
+from app.api import serialization
+from app.api.v1 import anime
+from app.api.v1 import book
+from app.api.v1 import manga
+from app.api.v1 import movie
+from app.core import config
+from app.crud import base as base_crud
+from app.models import anime as anime_model
+from app.models import batch as batch_model
+from app.models import book as book_model
+from app.models import manga as manga_model
+from app.models import movie as movie_model
+from app.models import patron as patron_model
+from app.models import response
+
+router = fastapi.APIRouter(route_class=serialization.Route)
+
+# The prefix of the parameters of the write endpoints, the create and
+# update models, and the create, update and delete endpoints, by media.
+ENDPOINTS = {
+    batch_model.Media.ANIME:
+        ("anime", anime_model.AnimeCreate, anime_model.AnimeUpdate,
+         anime.create_anime, anime.update_anime, anime.delete_anime),
+    batch_model.Media.BOOKS:
+        ("book", book_model.BookCreate, book_model.BookUpdate, book.create_book,
+         book.update_book, book.delete_book),
+    batch_model.Media.MANGA:
+        ("manga", manga_model.MangaCreate, manga_model.MangaUpdate,
+         manga.create_manga, manga.update_manga, manga.delete_manga),
+    batch_model.Media.MOVIES:
+        ("movie", movie_model.MovieCreate, movie_model.MovieUpdate,
+         movie.create_movie, movie.update_movie, movie.delete_movie),
+}
+
+
+class _FailedError(Exception):
+    """Raised to roll back an atomic batch whose operation failed.
+
+    Attributes:
+        results: The results of the operations run so far.
+    """
+
+    def __init__(self, results: List[response.BulkItemResult]):
+        super().__init__("A batch operation failed.")
+        self.results = results
+
+
+async def _run(
+        session: aio_session.AsyncSession, operation: batch_model.Operation,
+        current_patron: patron_model.PatronPrincipal) -> Tuple[int, uuid.UUID]:
+    """Runs an operation as its endpoint would.
+
+    Args:
+        session: The database session.
+        operation: The operation.
+        current_patron: The principal of the current authenticated patron.
+
+    Returns:
+        The status code of the operation and the id of the written media.
+
+    Raises:
+        HTTPException: The endpoint rejected the operation.
+        ValidationError: The data of the operation is invalid.
+    """
+    prefix, create_model, update_model, create, update, delete = ENDPOINTS[
+        operation.media]
+
+    # The data is validated as FastAPI does, since the `parse_obj` of SQLModel
+    # marks every field as set, so that updates would reset the others.
+    if operation.action is batch_model.Action.CREATE:
+        model_db = await create(
+            **{
+                "session": session,
+                f"{prefix}_in": create_model.validate(operation.data),
+                "current_patron": current_patron,
+                "near_duplicate": near_duplicates.Mode.IGNORE,
+                "http_response": fastapi.Response(),
+            })
+
+        return status.HTTP_201_CREATED, model_db.id
+
+    if operation.action is batch_model.Action.UPDATE:
+        model_db = await update(
+            **{
+                "session": session,
+                f"{prefix}_id": operation.id,
+                f"{prefix}_in": update_model.validate(operation.data),
+                "current_patron": current_patron,
+            })
+
+        return status.HTTP_200_OK, model_db.id
+
+    superuser = await dependencies.get_current_active_superuser(current_patron)
+    await delete(
+        **{
+            "session": session,
+            f"{prefix}_id": operation.id,
+            "current_patron": superuser,
+        })
+
+    return status.HTTP_204_NO_CONTENT, operation.id
+
+
+async def _run_all(session: aio_session.AsyncSession,
+                   operations: Sequence[batch_model.Operation], *,
+                   current_patron: patron_model.PatronPrincipal,
+                   atomic: bool) -> List[response.BulkItemResult]:
+    """Runs the operations in order.
+
+    Args:
+        session: The database session.
+        operations: The operations.
+        current_patron: The principal of the current authenticated patron.
+        atomic: Whether the operations are committed all together.
+
+    Returns:
+        The result of each operation.
+
+    Raises:
+        _FailedError: An operation failed in an atomic batch.
+    """
+    results = []
+
+    for index, operation in enumerate(operations):
+        try:
+            status_code, model_id = await _run(session, operation,
+                                               current_patron)
+            result = response.BulkItemResult(index=index,
+                                             status=status_code,
+                                             id=model_id)
+        except fastapi.HTTPException as exc:
+            result = response.BulkItemResult(index=index,
+                                             status=exc.status_code,
+                                             detail=exc.detail)
+        except pydantic.ValidationError as exc:
+            result = response.BulkItemResult(
+                index=index,
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(exc))
+        except sqlalchemy.exc.IntegrityError:
+            if not atomic:
+                await session.rollback()
+
+            result = response.BulkItemResult(
+                index=index,
+                status=status.HTTP_409_CONFLICT,
+                detail="The operation conflicts with the data in the system.")
+
+        results.append(result)
+
+        if atomic and result.status >= status.HTTP_400_BAD_REQUEST:
+            raise _FailedError(results)
+
+    return results
+
+
+def _rolled_back(results: Sequence[response.BulkItemResult],
+                 count: int) -> List[response.BulkItemResult]:
+    """Returns the results of an atomic batch whose last operation failed.
+
+    The operations run before the failed one are reported as rolled back,
+    and the ones after it as not run.
+
+    Args:
+        results: The results of the operations run, the failed one last.
+        count: The number of operations of the batch.
+    """
+    failed = results[-1]
+    detail = f"Operation {failed.index} failed."
+
+    return [
+        response.BulkItemResult(index=index,
+                                status=status.HTTP_424_FAILED_DEPENDENCY,
+                                detail=f"Rolled back: {detail}")
+        for index in range(failed.index)
+    ] + [failed] + [
+        response.BulkItemResult(index=index,
+                                status=status.HTTP_424_FAILED_DEPENDENCY,
+                                detail=f"Not run: {detail}")
+        for index in range(failed.index + 1, count)
+    ]
+
+
+@router.post("/",
+             response_model=List[response.BulkItemResult],
+             responses={401: {
+                 "model": response.Response
+             }})
+async def run_batch(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    operations: List[batch_model.Operation] = fastapi.Body(
+        ..., max_items=config.settings.BULK_MAX_ITEMS),
+    mode: batch_model.Mode = batch_model.Mode.ATOMIC,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+) -> List[response.BulkItemResult]:
+    """Runs many create, update and delete operations on media at once.
+
+    The operations are run in order as their endpoints would be, with a
+    single session and authentication, and the response holds the status
+    of every operation. In atomic mode, they are committed in a single
+    transaction, rolled back as soon as one fails. Otherwise, each one is
+    committed on its own.
+    """
+    if mode is batch_model.Mode.EACH:
+        return await _run_all(session,
+                              operations,
+                              current_patron=current_patron,
+                              atomic=False)
+
+    try:
+        async with base_crud.atomic() as atomic_session:
+            return await _run_all(atomic_session,
+                                  operations,
+                                  current_patron=current_patron,
+                                  atomic=True)
+    except _FailedError as exc:
+        return _rolled_back(exc.results, len(operations))
@@ -1,20 +1,33 @@
 """Book endpoints."""
 
 import http
+import uuid
 from typing import List
 
 import fastapi
-import pydantic
 from fastapi import status
 from sqlmodel.ext.asyncio import session as aio_session
 
+from app.api import bulk
+from app.api import conditional
 from app.api import dependencies
+from app.api import fieldsets
+from app.api import near_duplicates
+from app.api import serialization
+from app.api import streaming
+from app.core import config
+from app.core import pagination
+from app.crud import base as base_crud
 from app.crud import book as book_crud
 from app.models import book as book_model
 from app.models import patron as patron_model
 from app.models import response
 
-router = fastapi.APIRouter()
+router = fastapi.APIRouter(route_class=serialization.Route)
+conditional_requests = conditional.ConditionalRequests(
+    book_crud.BookCRUD,
+    id_param="book_id",
+    load=base_crud.LoadingProfile.PATRON)
 
 
 @router.post("/",
@@ -33,72 +46,222 @@ async def create_book(
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
     book_in: book_model.BookCreate,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    near_duplicate: near_duplicates.Mode = near_duplicates.Mode.IGNORE,
+    http_response: fastapi.Response,
 ) -> book_model.Book:
-    """Creates a new book."""
-    book_db = await book_crud.BookCRUD.get_by_title(session, book_in.title_en)
+    """Creates a new book.
 
-    if book_db:
-        raise fastapi.HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="An book with this title already exists in the system.",
-        )
+    Titles similar to the ones of other books are accepted, reported in the
+    `X-Near-Duplicates` header or rejected, depending on `near_duplicate`.
+    """
     if current_patron.id != book_in.proposed_by:
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
+    near_duplicates.check("book",
+                          book_in.title_en,
+                          mode=near_duplicate,
+                          http_response=http_response)
     book = await book_crud.BookCRUD.create(session, model_in=book_in)
 
+    if not book:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An book with this title already exists in the system.",
+        )
+
     return book
 
 
+@router.post("/bulk",
+             response_model=List[response.BulkItemResult],
+             responses={401: {
+                 "model": response.Response
+             }})
+async def create_book_bulk(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    book_in: List[book_model.BookCreate] = fastapi.Body(
+        ..., max_items=config.settings.BULK_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+) -> List[response.BulkItemResult]:
+    """Creates many books in a single transaction.
+
+    Each item is checked as a single create would be, and the response
+    holds the status of every item.
+    """
+    return await bulk.create_bulk(
+        session,
+        book_crud.BookCRUD,
+        book_in,
+        current_patron=current_patron,
+        conflict_detail="An book with this title already exists in the system.")
+
+
+@router.post("/batch-get",
+             response_model=response.BatchGetResult[book_model.BookRead],
+             responses={
+                 400: {
+                     "model": response.Response
+                 },
+                 401: {
+                     "model": response.Response
+                 }
+             })
+async def read_book_batch(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    ids: List[uuid.UUID] = fastapi.Body(
+        ..., embed=True, max_items=config.settings.BATCH_GET_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
+) -> fastapi.Response:
+    """Returns many books given their ids.
+
+    The books are read with a single query and returned in the requested
+    order, along with the ids matching no book. Only the comma-separated
+    `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, book_model.BookRead)
+
+    return await bulk.read_batch(session,
+                                 book_crud.BookCRUD,
+                                 book_model.BookRead,
+                                 ids,
+                                 fields=field_names,
+                                 http_response=http_response)
+
+
+@router.get("/export",
+            responses={
+                200: {
+                    "content": {
+                        streaming.NDJSON_MEDIA_TYPE: {}
+                    }
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def export_book(
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    compress: bool = False,
+) -> fastapi.Response:
+    """Exports all the books as NDJSON, optionally gzipped."""
+    lines = streaming.ndjson_lines(session, book_crud.BookCRUD,
+                                   book_model.BookRead)
+
+    return streaming.ndjson_response(lines,
+                                     filename="books.ndjson",
+                                     compress=compress)
+
+
 @router.get("/{book_id}",
             response_model=book_model.BookReadWithPatron,
             responses={
+                400: {
+                    "model": response.Response
+                },
                 401: {
                     "model": response.Response
                 },
                 404: {
                     "model": response.Response
                 }
-            })
+            },
+            dependencies=[fastapi.Depends(conditional_requests.item)])
 async def read_book(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    book_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    book_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
 ) -> book_model.Book:
-    """Returns a book given the id."""
-    book = await book_crud.BookCRUD.read(session, book_id)
+    """Returns a book given the id.
+
+    Only the comma-separated `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, book_model.BookRead)
+    book = await book_crud.BookCRUD.read(session,
+                                         book_id,
+                                         load=base_crud.LoadingProfile.PATRON,
+                                         fields=field_names)
 
     if not book:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Book not found.")
 
+    if field_names is not None:
+        return fieldsets.response(book, book_model.BookRead, field_names,
+                                  http_response)
+
     return book
 
 
 @router.get("/",
             response_model=List[book_model.BookRead],
-            responses={401: {
-                "model": response.Response
-            }})
+            responses={
+                400: {
+                    "model": response.Response
+                },
+                401: {
+                    "model": response.Response
+                }
+            },
+            dependencies=[fastapi.Depends(conditional_requests.collection)])
 async def read_book_list(
-        session: aio_session.AsyncSession = fastapi.Depends(
-            dependencies.get_session),
-        current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
-            dependencies.get_current_active_patron),
-        offset: int = 0,
-        limit: int = fastapi.Query(default=100, le=100),
-) -> List[book_model.Book]:
-    """Returns a list of books."""
-    return await book_crud.BookCRUD.read_multi(session,
-                                               offset=offset,
-                                               limit=limit)
+    request: fastapi.Request,
+    http_response: fastapi.Response,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    offset: int = 0,
+    limit: int = fastapi.Query(default=100, le=100),
+    cursor: str | None = None,
+    filters: book_model.BookFilters = fastapi.Depends(),
+    sort: str | None = None,
+    fields: str | None = None,
+) -> fastapi.Response:
+    """Returns a list of books.
+
+    The list is filtered by the given fields, and sorted by `sort`, the
+    comma-separated names of fields each prefixed by `-` for a descending
+    order. When the page is full, the `Link` header points to the next page.
+    Only the comma-separated `fields` are returned, when given.
+
+    The rows are encoded straight to JSON, without building models.
+    """
+    field_names = fieldsets.parse(fields, book_model.BookRead)
+    books = await book_crud.BookCRUD.read_multi(
+        session,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        filters=filters.dict(exclude_none=True),
+        sort=sort,
+        fields=field_names or list(book_model.BookRead.__fields__))
+
+    if len(books) == limit:
+        http_response.headers["Link"] = pagination.next_page_link(
+            request.url, book_crud.BookCRUD.cursor(books[-1], sort=sort))
+
+    return fieldsets.response(books, book_model.BookRead, field_names,
+                              http_response)
 
 
 @router.put("/",
@@ -109,35 +272,92 @@ async def read_book_list(
                 },
                 404: {
                     "model": response.Response
+                },
+                409: {
+                    "model": response.Response
                 }
             })
 async def update_book(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
-    book_id: pydantic.UUID4,
+    book_id: uuid.UUID,
     book_in: book_model.BookUpdate,
 ) -> book_model.Book:
     """Updates a book."""
-    book_db = await book_crud.BookCRUD.read(session, book_id)
+    try:
+        book_db = await book_crud.BookCRUD.update_by_id(
+            session,
+            book_id,
+            model_in=book_in,
+            conditions={"proposed_by": current_patron.id})
+    except base_crud.ConflictError as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An book with this title already exists in the system.",
+        ) from exc
 
     if not book_db:
-        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Book not found.")
-    if current_patron.id != book_db.proposed_by:
+        if not await book_crud.BookCRUD.exists(session, book_id):
+            raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail="Book not found.")
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
-    book_db = await book_crud.BookCRUD.update(session,
-                                              model_db=book_db,
-                                              model_in=book_in)
-
     return book_db
 
 
+@router.put("/by-title",
+            response_model=book_model.BookRead,
+            responses={
+                201: {
+                    "model": book_model.BookRead
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def upsert_book(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    book_in: book_model.BookCreate,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+    http_response: fastapi.Response,
+) -> book_model.Book:
+    """Creates a book, or updates the one with the same title.
+
+    The book is written with a single statement, and the status code tells
+    whether it was created. Only the patron who proposed an existing book
+    can update it.
+    """
+    unauthorized = fastapi.HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
+
+    if current_patron.id != book_in.proposed_by:
+        raise unauthorized
+
+    written = await book_crud.BookCRUD.upsert(
+        session,
+        model_in=book_in,
+        conditions={"proposed_by": current_patron.id})
+
+    if not written:
+        raise unauthorized
+
+    book, created = written
+
+    if created:
+        http_response.status_code = status.HTTP_201_CREATED
+
+    return book
+
+
 @router.delete("/",
                status_code=204,
                responses={
@@ -152,17 +372,15 @@ async def delete_book(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    book_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    book_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_superuser),
 ):
     """Deletes a book."""
-    book_db = await book_crud.BookCRUD.read(session, book_id)
+    book_db = await book_crud.BookCRUD.delete_by_id(session, book_id)
 
     if not book_db:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Book not found.")
 
-    await book_crud.BookCRUD.delete(session, book_id)
-
     return fastapi.Response(status_code=http.HTTPStatus.NO_CONTENT.value)
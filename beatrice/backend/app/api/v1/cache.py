@@ -0,0 +1,26 @@
+"""Cache endpoints."""
+
+from typing import Dict
+
+import fastapi
+
+from app.api import dependencies
+from app.api import serialization
+from app.core import cache
+from app.models import patron as patron_model
+from app.models import response
+
+router = fastapi.APIRouter(route_class=serialization.Route)
+
+
+@router.get("/",
+            response_model=Dict[str, response.CacheStats],
+            responses={401: {
+                "model": response.Response
+            }})
+async def read_cache_stats(
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_superuser),
+) -> Dict[str, Dict[str, int]]:
+    """Returns the usage statistics of the caches of this worker."""
+    return {name: cache_.stats() for name, cache_ in cache.registry.items()}
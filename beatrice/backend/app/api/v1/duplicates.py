@@ -0,0 +1,37 @@
+"""Near-duplicate titles endpoints."""
+
+from typing import Any, Dict, List, Literal
+
+import fastapi
+from fastapi import concurrency
+
+from app.api import dependencies
+from app.api import serialization
+from app.core import config
+from app.crud import duplicates as duplicates_crud
+from app.models import patron as patron_model
+from app.models import response
+from app.models import search as search_model
+
+router = fastapi.APIRouter(route_class=serialization.Route)
+
+
+@router.get("/{media_type}",
+            response_model=List[List[search_model.NearDuplicate]],
+            responses={401: {
+                "model": response.Response
+            }})
+async def read_duplicate_clusters(
+    media_type: Literal["anime", "book", "manga", "movie"],
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_superuser),
+    threshold: float = fastapi.Query(
+        default=config.settings.NEAR_DUPLICATE_THRESHOLD, gt=0, le=1),
+) -> List[List[Dict[str, Any]]]:
+    """Returns the groups of media of a type whose titles are similar.
+
+    The groups are computed in a worker thread, since it takes seconds for
+    large catalogs.
+    """
+    return await concurrency.run_in_threadpool(duplicates_crud.clusters,
+                                               media_type, threshold)
@@ -0,0 +1,71 @@
+"""Export endpoints."""
+
+from typing import AsyncIterator
+
+import fastapi
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.api import dependencies
+from app.api import serialization
+from app.api import streaming
+from app.crud import anime as anime_crud
+from app.crud import book as book_crud
+from app.crud import manga as manga_crud
+from app.crud import movie as movie_crud
+from app.models import anime as anime_model
+from app.models import book as book_model
+from app.models import manga as manga_model
+from app.models import movie as movie_model
+from app.models import patron as patron_model
+from app.models import response
+
+router = fastapi.APIRouter(route_class=serialization.Route)
+
+MEDIA = (
+    ("anime", anime_crud.AnimeCRUD, anime_model.AnimeRead),
+    ("book", book_crud.BookCRUD, book_model.BookRead),
+    ("manga", manga_crud.MangaCRUD, manga_model.MangaRead),
+    ("movie", movie_crud.MovieCRUD, movie_model.MovieRead),
+)
+
+
+async def _media_lines(
+        session: aio_session.AsyncSession) -> AsyncIterator[bytes]:
+    """Yields all the media as NDJSON chunks, one collection at a time.
+
+    Args:
+        session: The database session.
+    """
+    for media_type, crud, read_model in MEDIA:
+        async for chunk in streaming.ndjson_lines(session,
+                                                  crud,
+                                                  read_model,
+                                                  extra={"type": media_type}):
+            yield chunk
+
+
+@router.get("/",
+            responses={
+                200: {
+                    "content": {
+                        streaming.NDJSON_MEDIA_TYPE: {}
+                    }
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def export_media(
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    compress: bool = False,
+) -> fastapi.Response:
+    """Exports all the media as NDJSON, optionally gzipped.
+
+    Every object carries a `type` field telling its media type.
+    """
+    return streaming.ndjson_response(_media_lines(session),
+                                     filename="media.ndjson",
+                                     compress=compress)
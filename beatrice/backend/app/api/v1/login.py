@@ -8,12 +8,13 @@ from fastapi import status
 from sqlmodel.ext.asyncio import session as aio_session
 
 from app.api import dependencies
+from app.api import serialization
 from app.core import config
 from app.core import security as appsecurity
 from app.crud import patron as patron_crud
 from app.models import token
 
-router = fastapi.APIRouter()
+router = fastapi.APIRouter(route_class=serialization.Route)
 
 
 @router.post("/token", response_model=token.Token)
@@ -1,20 +1,33 @@
 """Manga endpoints."""
 
 import http
+import uuid
 from typing import List
 
 import fastapi
-import pydantic
 from fastapi import status
 from sqlmodel.ext.asyncio import session as aio_session
 
+from app.api import bulk
+from app.api import conditional
 from app.api import dependencies
+from app.api import fieldsets
+from app.api import near_duplicates
+from app.api import serialization
+from app.api import streaming
+from app.core import config
+from app.core import pagination
+from app.crud import base as base_crud
 from app.crud import manga as manga_crud
 from app.models import manga as manga_model
 from app.models import patron as patron_model
 from app.models import response
 
-router = fastapi.APIRouter()
+router = fastapi.APIRouter(route_class=serialization.Route)
+conditional_requests = conditional.ConditionalRequests(
+    manga_crud.MangaCRUD,
+    id_param="manga_id",
+    load=base_crud.LoadingProfile.PATRON)
 
 
 @router.post("/",
@@ -33,73 +46,224 @@ async def create_manga(
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
     manga_in: manga_model.MangaCreate,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    near_duplicate: near_duplicates.Mode = near_duplicates.Mode.IGNORE,
+    http_response: fastapi.Response,
 ) -> manga_model.Manga:
-    """Creates a new manga."""
-    manga_db = await manga_crud.MangaCRUD.get_by_title(session,
-                                                       manga_in.title_en)
+    """Creates a new manga.
 
-    if manga_db:
-        raise fastapi.HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="An manga with this title already exists in the system.",
-        )
+    Titles similar to the ones of other manga are accepted, reported in the
+    `X-Near-Duplicates` header or rejected, depending on `near_duplicate`.
+    """
     if current_patron.id != manga_in.proposed_by:
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
+    near_duplicates.check("manga",
+                          manga_in.title_en,
+                          mode=near_duplicate,
+                          http_response=http_response)
     manga = await manga_crud.MangaCRUD.create(session, model_in=manga_in)
 
+    if not manga:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An manga with this title already exists in the system.",
+        )
+
     return manga
 
 
+@router.post("/bulk",
+             response_model=List[response.BulkItemResult],
+             responses={401: {
+                 "model": response.Response
+             }})
+async def create_manga_bulk(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    manga_in: List[manga_model.MangaCreate] = fastapi.Body(
+        ..., max_items=config.settings.BULK_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+) -> List[response.BulkItemResult]:
+    """Creates many manga in a single transaction.
+
+    Each item is checked as a single create would be, and the response
+    holds the status of every item.
+    """
+    return await bulk.create_bulk(
+        session,
+        manga_crud.MangaCRUD,
+        manga_in,
+        current_patron=current_patron,
+        conflict_detail="An manga with this title already exists in the system."
+    )
+
+
+@router.post("/batch-get",
+             response_model=response.BatchGetResult[manga_model.MangaRead],
+             responses={
+                 400: {
+                     "model": response.Response
+                 },
+                 401: {
+                     "model": response.Response
+                 }
+             })
+async def read_manga_batch(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    ids: List[uuid.UUID] = fastapi.Body(
+        ..., embed=True, max_items=config.settings.BATCH_GET_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
+) -> fastapi.Response:
+    """Returns many manga given their ids.
+
+    The manga are read with a single query and returned in the requested
+    order, along with the ids matching no manga. Only the comma-separated
+    `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, manga_model.MangaRead)
+
+    return await bulk.read_batch(session,
+                                 manga_crud.MangaCRUD,
+                                 manga_model.MangaRead,
+                                 ids,
+                                 fields=field_names,
+                                 http_response=http_response)
+
+
+@router.get("/export",
+            responses={
+                200: {
+                    "content": {
+                        streaming.NDJSON_MEDIA_TYPE: {}
+                    }
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def export_manga(
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    compress: bool = False,
+) -> fastapi.Response:
+    """Exports all the manga as NDJSON, optionally gzipped."""
+    lines = streaming.ndjson_lines(session, manga_crud.MangaCRUD,
+                                   manga_model.MangaRead)
+
+    return streaming.ndjson_response(lines,
+                                     filename="manga.ndjson",
+                                     compress=compress)
+
+
 @router.get("/{manga_id}",
             response_model=manga_model.MangaReadWithPatron,
             responses={
+                400: {
+                    "model": response.Response
+                },
                 401: {
                     "model": response.Response
                 },
                 404: {
                     "model": response.Response
                 }
-            })
+            },
+            dependencies=[fastapi.Depends(conditional_requests.item)])
 async def read_manga(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    manga_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    manga_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
 ) -> manga_model.Manga:
-    """Returns a manga given the id."""
-    manga = await manga_crud.MangaCRUD.read(session, manga_id)
+    """Returns a manga given the id.
+
+    Only the comma-separated `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, manga_model.MangaRead)
+    manga = await manga_crud.MangaCRUD.read(
+        session,
+        manga_id,
+        load=base_crud.LoadingProfile.PATRON,
+        fields=field_names)
 
     if not manga:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Manga not found.")
 
+    if field_names is not None:
+        return fieldsets.response(manga, manga_model.MangaRead, field_names,
+                                  http_response)
+
     return manga
 
 
 @router.get("/",
             response_model=List[manga_model.MangaRead],
-            responses={401: {
-                "model": response.Response
-            }})
+            responses={
+                400: {
+                    "model": response.Response
+                },
+                401: {
+                    "model": response.Response
+                }
+            },
+            dependencies=[fastapi.Depends(conditional_requests.collection)])
 async def read_manga_list(
+    request: fastapi.Request,
+    http_response: fastapi.Response,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
     offset: int = 0,
     limit: int = fastapi.Query(default=100, le=100),
-) -> List[manga_model.Manga]:
-    """Returns a list of manga."""
-    return await manga_crud.MangaCRUD.read_multi(session,
-                                                 offset=offset,
-                                                 limit=limit)
+    cursor: str | None = None,
+    filters: manga_model.MangaFilters = fastapi.Depends(),
+    sort: str | None = None,
+    fields: str | None = None,
+) -> fastapi.Response:
+    """Returns a list of manga.
+
+    The list is filtered by the given fields, and sorted by `sort`, the
+    comma-separated names of fields each prefixed by `-` for a descending
+    order. When the page is full, the `Link` header points to the next page.
+    Only the comma-separated `fields` are returned, when given.
+
+    The rows are encoded straight to JSON, without building models.
+    """
+    field_names = fieldsets.parse(fields, manga_model.MangaRead)
+    manga_list = await manga_crud.MangaCRUD.read_multi(
+        session,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        filters=filters.dict(exclude_none=True),
+        sort=sort,
+        fields=field_names or list(manga_model.MangaRead.__fields__))
+
+    if len(manga_list) == limit:
+        http_response.headers["Link"] = pagination.next_page_link(
+            request.url, manga_crud.MangaCRUD.cursor(manga_list[-1], sort=sort))
+
+    return fieldsets.response(manga_list, manga_model.MangaRead, field_names,
+                              http_response)
 
 
 @router.put("/",
@@ -110,35 +274,92 @@ async def read_manga_list(
                 },
                 404: {
                     "model": response.Response
+                },
+                409: {
+                    "model": response.Response
                 }
             })
 async def update_manga(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
-    manga_id: pydantic.UUID4,
+    manga_id: uuid.UUID,
     manga_in: manga_model.MangaUpdate,
 ) -> manga_model.Manga:
     """Updates a manga."""
-    manga_db = await manga_crud.MangaCRUD.read(session, manga_id)
+    try:
+        manga_db = await manga_crud.MangaCRUD.update_by_id(
+            session,
+            manga_id,
+            model_in=manga_in,
+            conditions={"proposed_by": current_patron.id})
+    except base_crud.ConflictError as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An manga with this title already exists in the system.",
+        ) from exc
 
     if not manga_db:
-        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Manga not found.")
-    if current_patron.id != manga_db.proposed_by:
+        if not await manga_crud.MangaCRUD.exists(session, manga_id):
+            raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail="Manga not found.")
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
-    manga_db = await manga_crud.MangaCRUD.update(session,
-                                                 model_db=manga_db,
-                                                 model_in=manga_in)
-
     return manga_db
 
 
+@router.put("/by-title",
+            response_model=manga_model.MangaRead,
+            responses={
+                201: {
+                    "model": manga_model.MangaRead
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def upsert_manga(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    manga_in: manga_model.MangaCreate,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+    http_response: fastapi.Response,
+) -> manga_model.Manga:
+    """Creates a manga, or updates the one with the same title.
+
+    The manga is written with a single statement, and the status code tells
+    whether it was created. Only the patron who proposed an existing manga
+    can update it.
+    """
+    unauthorized = fastapi.HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
+
+    if current_patron.id != manga_in.proposed_by:
+        raise unauthorized
+
+    written = await manga_crud.MangaCRUD.upsert(
+        session,
+        model_in=manga_in,
+        conditions={"proposed_by": current_patron.id})
+
+    if not written:
+        raise unauthorized
+
+    manga, created = written
+
+    if created:
+        http_response.status_code = status.HTTP_201_CREATED
+
+    return manga
+
+
 @router.delete("/",
                status_code=204,
                responses={
@@ -153,17 +374,15 @@ async def delete_manga(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    manga_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    manga_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_superuser),
 ):
     """Deletes a manga."""
-    manga_db = await manga_crud.MangaCRUD.read(session, manga_id)
+    manga_db = await manga_crud.MangaCRUD.delete_by_id(session, manga_id)
 
     if not manga_db:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Manga not found.")
 
-    await manga_crud.MangaCRUD.delete(session, manga_id)
-
     return fastapi.Response(status_code=http.HTTPStatus.NO_CONTENT.value)
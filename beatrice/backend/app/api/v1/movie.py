@@ -1,20 +1,33 @@
 """Movie endpoints."""
 
 import http
+import uuid
 from typing import List
 
 import fastapi
-import pydantic
 from fastapi import status
 from sqlmodel.ext.asyncio import session as aio_session
 
+from app.api import bulk
+from app.api import conditional
 from app.api import dependencies
+from app.api import fieldsets
+from app.api import near_duplicates
+from app.api import serialization
+from app.api import streaming
+from app.core import config
+from app.core import pagination
+from app.crud import base as base_crud
 from app.crud import movie as movie_crud
 from app.models import movie as movie_model
 from app.models import patron as patron_model
 from app.models import response
 
-router = fastapi.APIRouter()
+router = fastapi.APIRouter(route_class=serialization.Route)
+conditional_requests = conditional.ConditionalRequests(
+    movie_crud.MovieCRUD,
+    id_param="movie_id",
+    load=base_crud.LoadingProfile.PATRON)
 
 
 @router.post("/",
@@ -33,73 +46,224 @@ async def create_movie(
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
     movie_in: movie_model.MovieCreate,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    near_duplicate: near_duplicates.Mode = near_duplicates.Mode.IGNORE,
+    http_response: fastapi.Response,
 ) -> movie_model.Movie:
-    """Creates a new movie."""
-    movie_db = await movie_crud.MovieCRUD.get_by_title(session,
-                                                       movie_in.title_en)
+    """Creates a new movie.
 
-    if movie_db:
-        raise fastapi.HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="An movie with this title already exists in the system.",
-        )
+    Titles similar to the ones of other movies are accepted, reported in the
+    `X-Near-Duplicates` header or rejected, depending on `near_duplicate`.
+    """
     if current_patron.id != movie_in.proposed_by:
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
+    near_duplicates.check("movie",
+                          movie_in.title_en,
+                          mode=near_duplicate,
+                          http_response=http_response)
     movie = await movie_crud.MovieCRUD.create(session, model_in=movie_in)
 
+    if not movie:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An movie with this title already exists in the system.",
+        )
+
     return movie
 
 
+@router.post("/bulk",
+             response_model=List[response.BulkItemResult],
+             responses={401: {
+                 "model": response.Response
+             }})
+async def create_movie_bulk(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    movie_in: List[movie_model.MovieCreate] = fastapi.Body(
+        ..., max_items=config.settings.BULK_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+) -> List[response.BulkItemResult]:
+    """Creates many movies in a single transaction.
+
+    Each item is checked as a single create would be, and the response
+    holds the status of every item.
+    """
+    return await bulk.create_bulk(
+        session,
+        movie_crud.MovieCRUD,
+        movie_in,
+        current_patron=current_patron,
+        conflict_detail="An movie with this title already exists in the system."
+    )
+
+
+@router.post("/batch-get",
+             response_model=response.BatchGetResult[movie_model.MovieRead],
+             responses={
+                 400: {
+                     "model": response.Response
+                 },
+                 401: {
+                     "model": response.Response
+                 }
+             })
+async def read_movie_batch(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    ids: List[uuid.UUID] = fastapi.Body(
+        ..., embed=True, max_items=config.settings.BATCH_GET_MAX_ITEMS),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
+) -> fastapi.Response:
+    """Returns many movies given their ids.
+
+    The movies are read with a single query and returned in the requested
+    order, along with the ids matching no movie. Only the comma-separated
+    `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, movie_model.MovieRead)
+
+    return await bulk.read_batch(session,
+                                 movie_crud.MovieCRUD,
+                                 movie_model.MovieRead,
+                                 ids,
+                                 fields=field_names,
+                                 http_response=http_response)
+
+
+@router.get("/export",
+            responses={
+                200: {
+                    "content": {
+                        streaming.NDJSON_MEDIA_TYPE: {}
+                    }
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def export_movie(
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    compress: bool = False,
+) -> fastapi.Response:
+    """Exports all the movies as NDJSON, optionally gzipped."""
+    lines = streaming.ndjson_lines(session, movie_crud.MovieCRUD,
+                                   movie_model.MovieRead)
+
+    return streaming.ndjson_response(lines,
+                                     filename="movies.ndjson",
+                                     compress=compress)
+
+
 @router.get("/{movie_id}",
             response_model=movie_model.MovieReadWithPatron,
             responses={
+                400: {
+                    "model": response.Response
+                },
                 401: {
                     "model": response.Response
                 },
                 404: {
                     "model": response.Response
                 }
-            })
+            },
+            dependencies=[fastapi.Depends(conditional_requests.item)])
 async def read_movie(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    movie_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    movie_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    fields: str | None = None,
+    http_response: fastapi.Response,
 ) -> movie_model.Movie:
-    """Returns a movie given the id."""
-    movie = await movie_crud.MovieCRUD.read(session, movie_id)
+    """Returns a movie given the id.
+
+    Only the comma-separated `fields` are returned, when given.
+    """
+    field_names = fieldsets.parse(fields, movie_model.MovieRead)
+    movie = await movie_crud.MovieCRUD.read(
+        session,
+        movie_id,
+        load=base_crud.LoadingProfile.PATRON,
+        fields=field_names)
 
     if not movie:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Movie not found.")
 
+    if field_names is not None:
+        return fieldsets.response(movie, movie_model.MovieRead, field_names,
+                                  http_response)
+
     return movie
 
 
 @router.get("/",
             response_model=List[movie_model.MovieRead],
-            responses={401: {
-                "model": response.Response
-            }})
+            responses={
+                400: {
+                    "model": response.Response
+                },
+                401: {
+                    "model": response.Response
+                }
+            },
+            dependencies=[fastapi.Depends(conditional_requests.collection)])
 async def read_movie_list(
+    request: fastapi.Request,
+    http_response: fastapi.Response,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
     offset: int = 0,
     limit: int = fastapi.Query(default=100, le=100),
-) -> List[movie_model.Movie]:
-    """Returns a list of movies."""
-    return await movie_crud.MovieCRUD.read_multi(session,
-                                                 offset=offset,
-                                                 limit=limit)
+    cursor: str | None = None,
+    filters: movie_model.MovieFilters = fastapi.Depends(),
+    sort: str | None = None,
+    fields: str | None = None,
+) -> fastapi.Response:
+    """Returns a list of movies.
+
+    The list is filtered by the given fields, and sorted by `sort`, the
+    comma-separated names of fields each prefixed by `-` for a descending
+    order. When the page is full, the `Link` header points to the next page.
+    Only the comma-separated `fields` are returned, when given.
+
+    The rows are encoded straight to JSON, without building models.
+    """
+    field_names = fieldsets.parse(fields, movie_model.MovieRead)
+    movies = await movie_crud.MovieCRUD.read_multi(
+        session,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        filters=filters.dict(exclude_none=True),
+        sort=sort,
+        fields=field_names or list(movie_model.MovieRead.__fields__))
+
+    if len(movies) == limit:
+        http_response.headers["Link"] = pagination.next_page_link(
+            request.url, movie_crud.MovieCRUD.cursor(movies[-1], sort=sort))
+
+    return fieldsets.response(movies, movie_model.MovieRead, field_names,
+                              http_response)
 
 
 @router.put("/",
@@ -110,35 +274,92 @@ async def read_movie_list(
                 },
                 404: {
                     "model": response.Response
+                },
+                409: {
+                    "model": response.Response
                 }
             })
 async def update_movie(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
-    movie_id: pydantic.UUID4,
+    movie_id: uuid.UUID,
     movie_in: movie_model.MovieUpdate,
 ) -> movie_model.Movie:
     """Updates a movie."""
-    movie_db = await movie_crud.MovieCRUD.read(session, movie_id)
+    try:
+        movie_db = await movie_crud.MovieCRUD.update_by_id(
+            session,
+            movie_id,
+            model_in=movie_in,
+            conditions={"proposed_by": current_patron.id})
+    except base_crud.ConflictError as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An movie with this title already exists in the system.",
+        ) from exc
 
     if not movie_db:
-        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Movie not found.")
-    if current_patron.id != movie_db.proposed_by:
+        if not await movie_crud.MovieCRUD.exists(session, movie_id):
+            raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail="Movie not found.")
         raise fastapi.HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
 
-    movie_db = await movie_crud.MovieCRUD.update(session,
-                                                 model_db=movie_db,
-                                                 model_in=movie_in)
-
     return movie_db
 
 
+@router.put("/by-title",
+            response_model=movie_model.MovieRead,
+            responses={
+                201: {
+                    "model": movie_model.MovieRead
+                },
+                401: {
+                    "model": response.Response
+                }
+            })
+async def upsert_movie(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    movie_in: movie_model.MovieCreate,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+    http_response: fastapi.Response,
+) -> movie_model.Movie:
+    """Creates a movie, or updates the one with the same title.
+
+    The movie is written with a single statement, and the status code tells
+    whether it was created. Only the patron who proposed an existing movie
+    can update it.
+    """
+    unauthorized = fastapi.HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="https://www.youtube.com/watch?v=Z4oDZCJMDeY")
+
+    if current_patron.id != movie_in.proposed_by:
+        raise unauthorized
+
+    written = await movie_crud.MovieCRUD.upsert(
+        session,
+        model_in=movie_in,
+        conditions={"proposed_by": current_patron.id})
+
+    if not written:
+        raise unauthorized
+
+    movie, created = written
+
+    if created:
+        http_response.status_code = status.HTTP_201_CREATED
+
+    return movie
+
+
 @router.delete("/",
                status_code=204,
                responses={
@@ -153,17 +374,15 @@ async def delete_movie(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    movie_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    movie_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_superuser),
 ):
     """Deletes a movie."""
-    movie_db = await movie_crud.MovieCRUD.read(session, movie_id)
+    movie_db = await movie_crud.MovieCRUD.delete_by_id(session, movie_id)
 
     if not movie_db:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Movie not found.")
 
-    await movie_crud.MovieCRUD.delete(session, movie_id)
-
     return fastapi.Response(status_code=http.HTTPStatus.NO_CONTENT.value)
@@ -1,21 +1,87 @@
 """Patron endpoints."""
 
 import http
-from typing import List
+import uuid
+from typing import List, Union
 
 import fastapi
-import pydantic
 from fastapi import responses
 from fastapi import status
 from sqlmodel.ext.asyncio import session as aio_session
 
+from app.api import conditional
 from app.api import dependencies
+from app.api import fieldsets
+from app.api import serialization
+from app.core import config
+from app.core import pagination
 from app.core import security
+from app.crud import anime as anime_crud
+from app.crud import base as base_crud
+from app.crud import book as book_crud
+from app.crud import manga as manga_crud
+from app.crud import movie as movie_crud
 from app.crud import patron as patron_crud
+from app.models import anime as anime_model
+from app.models import batch as batch_model
+from app.models import book as book_model
+from app.models import manga as manga_model
+from app.models import movie as movie_model
 from app.models import patron as patron_model
 from app.models import response
 
-router = fastapi.APIRouter()
+router = fastapi.APIRouter(route_class=serialization.Route)
+conditional_requests = conditional.ConditionalRequests(patron_crud.PatronCRUD,
+                                                       id_param="patron_id")
+
+# The CRUD controller and the read model of the media, by their path.
+MEDIA = {
+    batch_model.Media.ANIME: (anime_crud.AnimeCRUD, anime_model.AnimeRead),
+    batch_model.Media.BOOKS: (book_crud.BookCRUD, book_model.BookRead),
+    batch_model.Media.MANGA: (manga_crud.MangaCRUD, manga_model.MangaRead),
+    batch_model.Media.MOVIES: (movie_crud.MovieCRUD, movie_model.MovieRead),
+}
+
+# The conditional requests of the patrons represented with their media.
+media_conditional_requests = conditional.ConditionalRequests(
+    patron_crud.PatronCRUD,
+    id_param="patron_id",
+    load=base_crud.LoadingProfile.MEDIA,
+    related=[crud for crud, _ in MEDIA.values()])
+
+
+async def _conditional_item(
+    request: fastapi.Request,
+    http_response: fastapi.Response,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+    embed: bool = False,
+):
+    """Answers a conditional request for a patron, with or without media.
+
+    The version of an embedding patron covers their media as well.
+    """
+    requests = media_conditional_requests if embed else conditional_requests
+    await requests.item(request, http_response, session, current_patron)
+
+
+async def _conditional_collection(
+    request: fastapi.Request,
+    http_response: fastapi.Response,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(
+        dependencies.get_current_active_patron),
+    counts: bool = False,
+):
+    """Answers a conditional request for patrons, with or without counts.
+
+    The version of a list with media counts covers the media as well.
+    """
+    requests = media_conditional_requests if counts else conditional_requests
+    await requests.collection(request, http_response, session, current_patron)
 
 
 @router.post("/",
@@ -34,20 +100,25 @@ async def create_patron(
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
     patron_in: patron_model.PatronCreate,
-    current_patron: patron_model.Patron | None = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal | None = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_patron_or_none),
 ) -> patron_model.Patron:
-    """Creates a new patron."""
+    """Creates a new patron.
+
+    Taken usernames are looked up first, to spare hashing the password, but
+    the unique constraint still rejects the ones taken meanwhile.
+    """
     if current_patron is not None:
         return responses.RedirectResponse(url="/")
     patron_db = await patron_crud.PatronCRUD.get_by_username(
         session, patron_in.username)
+    conflict = fastapi.HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A patron with this username already exists in the system.",
+    )
 
     if patron_db:
-        raise fastapi.HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="A patron with this username already exists in the system.",
-        )
+        raise conflict
 
     #if settings.EMAILS_ENABLED and patron_in.email:
     #    send_new_account_email(email_to=patron_in.email,
@@ -58,14 +129,19 @@ async def create_patron(
         session,
         model_in=patron_in,
         update={
-            "hashed_password": security.get_password_hash(patron_in.password)
+            "hashed_password":
+                await security.password_hasher.hash(patron_in.password)
         })
 
+    if not patron:
+        raise conflict
+
     return patron
 
 
 @router.get("/{patron_id}",
-            response_model=patron_model.PatronReadWithMedia,
+            response_model=Union[patron_model.PatronReadWithMedia,
+                                 patron_model.PatronRead],
             responses={
                 401: {
                     "model": response.Response
@@ -73,42 +149,185 @@ async def create_patron(
                 404: {
                     "model": response.Response
                 }
-            })
+            },
+            dependencies=[fastapi.Depends(_conditional_item)])
 async def read_patron(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    patron_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    patron_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
+    embed: bool = False,
+    http_response: fastapi.Response,
 ) -> patron_model.Patron:
-    """Returns a patron given the id."""
-    patron = await patron_crud.PatronCRUD.read(session, patron_id)
+    """Returns a patron given the id.
+
+    The patron's media are only embedded when `embed` is true. Otherwise,
+    they are counted by `/{patron_id}/summary` and paginated by
+    `/{patron_id}/{media}`.
+    """
+    if embed:
+        patron = await patron_crud.PatronCRUD.read(
+            session, patron_id, load=base_crud.LoadingProfile.MEDIA)
+    else:
+        patron = await patron_crud.PatronCRUD.read(
+            session, patron_id, fields=list(patron_model.PatronRead.__fields__))
 
     if not patron:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Patron not found.")
 
+    if not embed:
+        return fieldsets.response(patron, patron_model.PatronRead, None,
+                                  http_response)
+
     return patron
 
 
+@router.get("/{patron_id}/summary",
+            response_model=patron_model.PatronSummary,
+            responses={
+                401: {
+                    "model": response.Response
+                },
+                404: {
+                    "model": response.Response
+                }
+            })
+async def read_patron_summary(
+    *,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    patron_id: uuid.UUID,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+) -> patron_model.PatronSummary:
+    """Returns the numbers of media proposed by a patron, by type."""
+    summary = await patron_crud.PatronCRUD.read_summary(session, patron_id)
+
+    if not summary:
+        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                    detail="Patron not found.")
+
+    return summary
+
+
+@router.get("/{patron_id}/{media}",
+            response_model=List[Union[anime_model.AnimeRead,
+                                      book_model.BookRead,
+                                      manga_model.MangaRead,
+                                      movie_model.MovieRead]],
+            responses={
+                400: {
+                    "model": response.Response
+                },
+                401: {
+                    "model": response.Response
+                },
+                404: {
+                    "model": response.Response
+                }
+            })
+async def read_patron_media(
+    request: fastapi.Request,
+    http_response: fastapi.Response,
+    patron_id: uuid.UUID,
+    media: batch_model.Media,
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    limit: int = fastapi.Query(default=100, le=100),
+    cursor: str | None = None,
+    fields: str | None = None,
+) -> fastapi.Response:
+    """Returns a page of the media of a type proposed by a patron.
+
+    The media are sorted by creation, and read from the index on
+    `proposed_by`. When the page is full, the `Link` header points to the
+    next page. Only the comma-separated `fields` are returned, when given.
+    """
+    crud, read_model = MEDIA[media]
+    field_names = fieldsets.parse(fields, read_model)
+    media_list = await crud.read_multi(session,
+                                       limit=limit,
+                                       cursor=cursor,
+                                       filters={"proposed_by": patron_id},
+                                       fields=field_names or
+                                       list(read_model.__fields__))
+
+    if not media_list and not await patron_crud.PatronCRUD.exists(
+            session, patron_id):
+        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                    detail="Patron not found.")
+
+    if len(media_list) == limit:
+        http_response.headers["Link"] = pagination.next_page_link(
+            request.url, crud.cursor(media_list[-1]))
+
+    return fieldsets.response(media_list, read_model, field_names,
+                              http_response)
+
+
 @router.get("/",
-            response_model=List[patron_model.PatronRead],
-            responses={401: {
-                "model": response.Response
-            }})
+            response_model=List[Union[patron_model.PatronReadWithCounts,
+                                      patron_model.PatronRead]],
+            responses={
+                400: {
+                    "model": response.Response
+                },
+                401: {
+                    "model": response.Response
+                }
+            },
+            dependencies=[fastapi.Depends(_conditional_collection)])
 async def read_patron_list(
+    request: fastapi.Request,
+    http_response: fastapi.Response,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
     offset: int = 0,
     limit: int = fastapi.Query(default=100, le=100),
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    cursor: str | None = None,
+    counts: bool = False,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
-) -> List[patron_model.Patron]:
-    """Returns a list of patrons."""
-    return await patron_crud.PatronCRUD.read_multi(session,
-                                                   offset=offset,
-                                                   limit=limit)
+) -> fastapi.Response:
+    """Returns a list of patrons.
+
+    The patrons carry the numbers of their media by type only when
+    `counts` is true, which are then read for the whole page with a single
+    query. When the page is full, the `Link` header points to the next
+    page.
+
+    The rows are encoded straight to JSON, without building models.
+    """
+    patrons = await patron_crud.PatronCRUD.read_multi(
+        session,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        fields=list(patron_model.PatronRead.__fields__))
+
+    if len(patrons) == limit:
+        http_response.headers["Link"] = pagination.next_page_link(
+            request.url, patron_crud.PatronCRUD.cursor(patrons[-1]))
+
+    if not counts:
+        return fieldsets.response(patrons, patron_model.PatronRead, None,
+                                  http_response)
+
+    media_counts = await patron_crud.PatronCRUD.read_media_counts(
+        session, [patron["id"] for patron in patrons])
+
+    rows = [{
+        **patron,
+        **media_counts[patron["id"]]
+    } for patron in patrons if patron["id"] in media_counts]
+
+    return fieldsets.response(rows, patron_model.PatronReadWithCounts, None,
+                              http_response)
 
 
 @router.put("/",
@@ -119,30 +338,40 @@ async def read_patron_list(
                 },
                 404: {
                     "model": response.Response
+                },
+                409: {
+                    "model": response.Response
                 }
             })
 async def update_patron(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    patron_id: pydantic.UUID4,
+    patron_id: uuid.UUID,
     patron_in: patron_model.PatronUpdate,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_patron),
 ) -> patron_model.Patron:
     """Updates a patron."""
-    patron_db = await patron_crud.PatronCRUD.read(session, patron_id)
-
-    if not patron_db:
-        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Patron not found.")
     if current_patron.id != patron_id:
+        if not await patron_crud.PatronCRUD.exists(session, patron_id):
+            raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                        detail="Patron not found.")
         raise fastapi.HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
                                     detail="Cannot update another patron.")
 
-    patron_db = await patron_crud.PatronCRUD.update(session,
-                                                    model_db=patron_db,
-                                                    model_in=patron_in)
+    try:
+        patron_db = await patron_crud.PatronCRUD.update_by_id(
+            session, patron_id, model_in=patron_in)
+    except base_crud.ConflictError as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A patron with this username already exists in the system.",
+        ) from exc
+
+    if not patron_db:
+        raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                    detail="Patron not found.")
 
     return patron_db
 
@@ -155,51 +384,87 @@ async def update_patron(
                 },
                 404: {
                     "model": response.Response
+                },
+                409: {
+                    "model": response.Response
                 }
             })
 async def update_patron_as_superuser(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    patron_id: pydantic.UUID4,
+    patron_id: uuid.UUID,
     patron_in: patron_model.PatronUpdateAsSuperuser,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_superuser),
 ) -> patron_model.Patron:
     """Updates a patron as a superuser."""
-    patron_db = await patron_crud.PatronCRUD.read(session, patron_id)
+    try:
+        patron_db = await patron_crud.PatronCRUD.update_by_id(
+            session, patron_id, model_in=patron_in)
+    except base_crud.ConflictError as exc:
+        raise fastapi.HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A patron with this username already exists in the system.",
+        ) from exc
 
     if not patron_db:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Patron not found.")
 
-    patron_db = await patron_crud.PatronCRUD.update(session,
-                                                    model_db=patron_db,
-                                                    model_in=patron_in)
-
     return patron_db
 
 
 @router.delete("/",
                status_code=status.HTTP_204_NO_CONTENT,
-               responses={401: {
-                   "model": response.Response
-               }})
+               responses={
+                   401: {
+                       "model": response.Response
+                   },
+                   404: {
+                       "model": response.Response
+                   },
+                   409: {
+                       "model": response.Response
+                   }
+               })
 async def delete_patron(
     *,
     session: aio_session.AsyncSession = fastapi.Depends(
         dependencies.get_session),
-    patron_id: pydantic.UUID4,
-    current_patron: patron_model.Patron = fastapi.Depends(  # pylint: disable=unused-argument
+    patron_id: uuid.UUID,
+    media: patron_model.MediaDeletion = patron_model.MediaDeletion.REASSIGN,
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
         dependencies.get_current_active_superuser),
 ):
-    """Deletes a patron."""
-    patron_db = await patron_crud.PatronCRUD.read(session, patron_id)
+    """Deletes a patron.
+
+    The patron's media are reassigned to the archive patron, named by
+    `ARCHIVE_PATRON_USERNAME`, or deleted as well, depending on `media`.
+    """
+    reassign_to = None
+
+    if media is patron_model.MediaDeletion.REASSIGN:
+        archive = await patron_crud.PatronCRUD.get_principal(
+            session, config.settings.ARCHIVE_PATRON_USERNAME or
+            config.settings.ADMIN_USERNAME)
+
+        if not archive:
+            raise fastapi.HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="The archive patron does not exist.")
+        if archive.id == patron_id:
+            raise fastapi.HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Cannot reassign the media of the archive patron.")
+
+        reassign_to = archive.id
+
+    patron_db = await patron_crud.PatronCRUD.delete_with_media(
+        patron_id, reassign_to=reassign_to)
 
     if not patron_db:
         raise fastapi.HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                     detail="Patron not found.")
 
-    await patron_crud.PatronCRUD.delete(session, patron_id)
-
     return fastapi.Response(status_code=http.HTTPStatus.NO_CONTENT.value)
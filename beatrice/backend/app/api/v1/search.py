@@ -0,0 +1,40 @@
+"""Search endpoints."""
+
+from typing import List
+
+import fastapi
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.api import dependencies
+from app.api import serialization
+from app.crud import search as search_crud
+from app.models import patron as patron_model
+from app.models import response
+from app.models import search as search_model
+
+router = fastapi.APIRouter(route_class=serialization.Route)
+
+
+@router.get("/",
+            response_model=List[search_model.SearchResult],
+            responses={401: {
+                "model": response.Response
+            }})
+async def search_media(
+    session: aio_session.AsyncSession = fastapi.Depends(
+        dependencies.get_session),
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    q: str = fastapi.Query(..., min_length=1, max_length=200),
+    offset: int = 0,
+    limit: int = fastapi.Query(default=100, le=100),
+) -> List[search_model.SearchResult]:
+    """Searches all the media by title, author and notes.
+
+    The query supports the web search syntax: quoted phrases, `or` and
+    `-` to exclude a term.
+    """
+    return await search_crud.search_media(session,
+                                          q,
+                                          offset=offset,
+                                          limit=limit)
@@ -0,0 +1,42 @@
+"""Title suggestion endpoints."""
+
+from typing import Any, Dict, List
+
+import fastapi
+
+from app.api import dependencies
+from app.api import serialization
+from app.crud import suggest as suggest_crud
+from app.models import patron as patron_model
+from app.models import response
+from app.models import search as search_model
+
+router = fastapi.APIRouter(route_class=serialization.Route)
+
+
+@router.get("/",
+            response_model=List[search_model.Suggestion],
+            responses={401: {
+                "model": response.Response
+            }})
+async def suggest_titles(
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_patron),
+    prefix: str = fastapi.Query(..., min_length=1, max_length=200),
+    limit: int = fastapi.Query(default=10, ge=1, le=50),
+) -> List[Dict[str, Any]]:
+    """Returns the media titles starting with the given prefix."""
+    return suggest_crud.suggest(prefix, limit)
+
+
+@router.get("/stats",
+            response_model=search_model.SuggestionStats,
+            responses={401: {
+                "model": response.Response
+            }})
+async def read_suggestion_stats(
+    current_patron: patron_model.PatronPrincipal = fastapi.Depends(  # pylint: disable=unused-argument
+        dependencies.get_current_active_superuser),
+) -> Dict[str, int]:
+    """Returns the size of the title suggestions index of this worker."""
+    return suggest_crud.titles.stats()
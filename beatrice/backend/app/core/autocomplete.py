@@ -0,0 +1,230 @@
+"""Autocomplete utils.
+
+This module contains an in-memory index answering prefix queries over
+short texts, such as titles, in logarithmic time.
+"""
+
+import bisect
+import sys
+from typing import Callable, Dict, Hashable, Iterable, List, Tuple
+
+# The number of entries below which adding or removing them in place is
+# faster than rebuilding the index, whatever its size: both copy all the
+# entries after the first one written.
+_IN_PLACE_ENTRIES = 256
+
+
+class PrefixIndex:
+    """An index of keys, each pointing to a value, searchable by prefix.
+
+    Entries are kept in a single sorted list of `(key, value)` tuples, so
+    that the entries starting with a prefix are contiguous and found with
+    a binary search. A value may have many keys, e.g. a title per language.
+
+    Attributes:
+        normalize: The function applied to keys and prefixes.
+    """
+
+    def __init__(self, normalize: Callable[[str], str]):
+        self.normalize = normalize
+        self._entries: List[Tuple[str, Hashable]] = []
+        self._keys: Dict[Hashable, Tuple[str, ...]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _keys_of(self, keys: Iterable[str | None]) -> Tuple[str, ...]:
+        """Returns the distinct normalized keys among the given ones."""
+        return tuple(
+            dict.fromkeys(
+                self.normalize(key) for key in keys if key and key.strip()))
+
+    def _sizeof(self, value: Hashable, keys: Tuple[str, ...]) -> int:
+        """Returns the memory used by the entries of a value, in bytes."""
+        size = sys.getsizeof(value) + sys.getsizeof(keys)
+
+        if isinstance(value, tuple):
+            size += sum(sys.getsizeof(item) for item in value)
+
+        return size + sum(
+            sys.getsizeof(key) + sys.getsizeof((key, value)) for key in keys)
+
+    def build(self, items: Iterable[Tuple[Hashable, Iterable[str | None]]]):
+        """Replaces the content of the index.
+
+        Sorting all the entries at once is much faster than adding them one
+        by one.
+
+        Args:
+            items: The values along with their keys.
+        """
+        entries = []
+        keys_by_value = {}
+        size = 0
+
+        for value, keys in items:
+            keys = self._keys_of(keys)
+            keys_by_value[value] = keys
+            entries.extend((key, value) for key in keys)
+            size += self._sizeof(value, keys)
+
+        entries.sort()
+        self._entries, self._keys, self._size = entries, keys_by_value, size
+
+    def add(self, value: Hashable, keys: Iterable[str | None]):
+        """Adds or replaces the keys of a value.
+
+        Nothing is done if the value already has the same keys, as when its
+        other columns are updated.
+
+        Args:
+            value: The value.
+            keys: The keys of the value. Empty keys are ignored.
+        """
+        self.add_many([(value, keys)])
+
+    def add_many(self, items: Iterable[Tuple[Hashable, Iterable[str | None]]]):
+        """Adds or replaces the keys of many values.
+
+        Each entry inserted in place shifts all the entries after it, so
+        beyond `_IN_PLACE_ENTRIES` entries, as when many media are created
+        at once, the new entries are sorted and merged into the index in a
+        single pass instead. Values whose keys are unchanged are skipped.
+
+        Args:
+            items: The values along with their keys. Empty keys are ignored.
+        """
+        changed = {}
+
+        for value, keys in items:
+            keys = self._keys_of(keys)
+
+            if self._keys.get(value) != keys:
+                changed[value] = keys
+
+        self.remove_many(changed)
+        added = sorted(
+            (key, value) for value, keys in changed.items() for key in keys)
+
+        if len(added) < _IN_PLACE_ENTRIES:
+            for entry in added:
+                bisect.insort(self._entries, entry)
+        else:
+            entries = []
+            start = 0
+
+            for entry in added:
+                position = bisect.bisect_left(self._entries, entry, start)
+                entries.extend(self._entries[start:position])
+                entries.append(entry)
+                start = position
+
+            entries.extend(self._entries[start:])
+            self._entries = entries
+
+        for value, keys in changed.items():
+            self._keys[value] = keys
+            self._size += self._sizeof(value, keys)
+
+    def remove(self, value: Hashable):
+        """Removes the keys of a value, if any.
+
+        Args:
+            value: The value.
+        """
+        keys = self._keys.pop(value, None)
+
+        if keys is None:
+            return
+
+        for key in keys:
+            position = bisect.bisect_left(self._entries, (key, value))
+
+            if (position < len(self._entries) and
+                    self._entries[position] == (key, value)):
+                del self._entries[position]
+
+        self._size -= self._sizeof(value, keys)
+
+    def remove_many(self, values: Iterable[Hashable]):
+        """Removes the keys of many values, if any.
+
+        Each entry removed in place shifts all the entries after it, so
+        beyond `_IN_PLACE_ENTRIES` entries, as when all the media of a
+        patron are deleted, the index is rebuilt from the slices between
+        them instead.
+
+        Args:
+            values: The values.
+        """
+        positions = []
+
+        for value in values:
+            keys = self._keys.pop(value, None)
+
+            if keys is None:
+                continue
+
+            for key in keys:
+                position = bisect.bisect_left(self._entries, (key, value))
+
+                if (position < len(self._entries) and
+                        self._entries[position] == (key, value)):
+                    positions.append(position)
+
+            self._size -= self._sizeof(value, keys)
+
+        if len(positions) < _IN_PLACE_ENTRIES:
+            for position in sorted(positions, reverse=True):
+                del self._entries[position]
+
+            return
+
+        entries = []
+        start = 0
+
+        for position in sorted(positions):
+            entries.extend(self._entries[start:position])
+            start = position + 1
+
+        entries.extend(self._entries[start:])
+        self._entries = entries
+
+    def search(self,
+               prefix: str,
+               limit: int = 10) -> List[Tuple[str, Hashable]]:
+        """Returns the entries whose key starts with the given prefix.
+
+        Args:
+            prefix: The prefix, normalized like the keys.
+            limit: The maximum number of entries.
+
+        Returns:
+            The matching `(key, value)` entries, sorted by key.
+        """
+        prefix = self.normalize(prefix)
+
+        if not prefix:
+            return []
+
+        position = bisect.bisect_left(self._entries, (prefix,))
+        matches = []
+
+        for key, value in self._entries[position:position + limit]:
+            if not key.startswith(prefix):
+                break
+
+            matches.append((key, value))
+
+        return matches
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of entries and the memory used by the index."""
+        return {
+            "entries":
+                len(self._entries),
+            "size_bytes":
+                self._size + sys.getsizeof(self._entries) +
+                sys.getsizeof(self._keys),
+        }
@@ -0,0 +1,176 @@
+"""Caching utils.
+
+This module contains in-process caches shared by the requests served by
+a single worker.
+"""
+
+import collections
+import sys
+import time
+from typing import Any, Dict, Hashable
+
+# The named caches, whose statistics are reported by the API.
+registry: Dict[str, "TTLCache"] = {}
+
+
+def sizeof(value: Any) -> int:
+    """Returns an estimate of the memory used by a value, in bytes.
+
+    Containers and objects are walked recursively, so that the size of a
+    model includes the size of the related models loaded along with it.
+    The SQLAlchemy instance state is shared bookkeeping and not counted.
+
+    Args:
+        value: The value to measure.
+    """
+    seen = set()
+    size = 0
+    stack = [value]
+
+    while stack:
+        item = stack.pop()
+
+        if id(item) in seen:
+            continue
+
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.extend(attribute for name, attribute in vars(item).items()
+                         if name != "_sa_instance_state")
+
+    return size
+
+
+class TTLCache:
+    """A bounded least recently used cache whose entries expire.
+
+    Attributes:
+        ttl: The lifetime of an entry expressed in seconds.
+        max_entries: The maximum number of entries kept in the cache, or
+            None for no limit.
+        max_bytes: The maximum total size of the entries kept in the cache,
+            or None for no limit. Sizes are given when setting entries.
+        hits: The number of lookups that found a fresh entry.
+        misses: The number of lookups that found no entry or an expired one.
+        evictions: The number of entries removed to make room.
+    """
+
+    def __init__(self,
+                 ttl: float,
+                 max_entries: int | None = 1024,
+                 max_bytes: int | None = None,
+                 name: str | None = None):
+        """Initializes the cache.
+
+        Args:
+            ttl: The lifetime of an entry expressed in seconds.
+            max_entries: The maximum number of entries.
+            max_bytes: The maximum total size of the entries.
+            name: The name the cache is registered under, if any.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = 0
+        self._entries: collections.OrderedDict[Hashable, tuple[
+            float, int, Any]] = collections.OrderedDict()
+
+        if name is not None:
+            registry[name] = self
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> tuple[float, int, Any] | None:
+        """Removes an entry and returns it."""
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self._size -= entry[1]
+
+        return entry
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns the value cached for the given key.
+
+        Args:
+            key: The key of the entry.
+            default: The value returned if the entry is missing or expired.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, _, value = entry
+
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+
+        return value
+
+    def set(self, key: Hashable, value: Any, size: int = 0):
+        """Caches a value, evicting the least recently used entries if full.
+
+        Values larger than `max_bytes` are not cached.
+
+        Args:
+            key: The key of the entry.
+            value: The value to cache.
+            size: The size of the value, in bytes.
+        """
+        self._remove(key)
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self._size += size
+
+        while ((self.max_entries is not None and
+                len(self._entries) > self.max_entries) or
+               (self.max_bytes is not None and self._size > self.max_bytes)):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Removes an entry from the cache and returns its value.
+
+        Args:
+            key: The key of the entry.
+            default: The value returned if the entry is missing.
+        """
+        entry = self._remove(key)
+
+        return default if entry is None else entry[2]
+
+    def clear(self):
+        """Removes all the entries from the cache."""
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the usage statistics of the cache."""
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
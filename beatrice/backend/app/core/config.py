@@ -1,5 +1,7 @@
 """Application settings."""
 
+from typing import Literal
+
 import pydantic
 
 
@@ -10,10 +12,31 @@ class Settings(pydantic.BaseSettings):
     API_V1_STR: str = "/api/v1"
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 30  # 30 days
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 1024
+    ID_STRATEGY: Literal["uuid4", "uuid7"] = "uuid7"
+    CACHE_ENABLED: bool = True
+    CACHE_TTL_SECONDS: float = 30
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # 64 MiB
+    EXPORT_BATCH_SIZE: int = 1000
+    NEAR_DUPLICATE_THRESHOLD: float = 0.8
+    BULK_MAX_ITEMS: int = 10000
+    BATCH_GET_MAX_ITEMS: int = 1000
+    FAST_SERIALIZATION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # 1 KiB
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    COMPRESSION_CACHE_TTL_SECONDS: float = 300
+    COMPRESSION_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # 32 MiB
+    PASSWORD_HASHER_POOL: Literal["thread", "process"] = "thread"
+    PASSWORD_HASHER_WORKERS: int = 2
+    PASSWORD_HASHER_QUEUE_TIMEOUT_SECONDS: float = 10
     ADMIN_USERNAME: str
     ADMIN_EMAIL: str
     ADMIN_NAME: str
     ADMIN_PASSWORD: str
+    ARCHIVE_PATRON_USERNAME: str | None = None  # The admin when unset
 
     class Config:
         """Contains Pydantic's configuration."""
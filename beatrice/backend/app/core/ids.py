@@ -0,0 +1,74 @@
+"""Primary key generation.
+
+This module contains the generators of the ids of new models. Random
+UUIDs (version 4) land anywhere in the primary key indexes, so that every
+insert may split a different page, while time-ordered ones (version 7)
+are appended to their right-most pages, which keeps the indexes compact
+and the pages being written in memory.
+"""
+
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict
+
+from app.core import config
+
+# The bits of the sub-millisecond precision of the timestamps.
+_FRACTION_BITS = 12
+
+
+class _Clock:
+    """Clock of the timestamps of the time-ordered ids.
+
+    The timestamps have a sub-millisecond precision, and are strictly
+    increasing within the process, so that the ids generated in the same
+    tick are still ordered.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last = 0
+
+    def tick(self) -> int:
+        """Returns the next timestamp, in 1/4096 of milliseconds."""
+        timestamp = (time.time_ns() << _FRACTION_BITS) // 1_000_000
+
+        with self._lock:
+            if timestamp <= self._last:
+                timestamp = self._last + 1
+
+            self._last = timestamp
+
+        return timestamp
+
+
+_clock = _Clock()
+
+
+def uuid7() -> uuid.UUID:
+    """Returns a new time-ordered UUID.
+
+    The UUID follows the version 7 layout of RFC 9562: 48 bits of Unix
+    timestamp in milliseconds, the version, 12 bits of sub-millisecond
+    precision, the variant and 62 random bits.
+    """
+    timestamp = _clock.tick()
+    value = ((timestamp >> _FRACTION_BITS) << 80 | 0x7 << 76 |
+             (timestamp & 0xfff) << 64 | 0b10 << 62 |
+             int.from_bytes(os.urandom(8), "big") >> 2)
+
+    return uuid.UUID(int=value)
+
+
+# The id generators, by strategy.
+GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+def generate() -> uuid.UUID:
+    """Returns a new id, generated by the configured strategy."""
+    return GENERATORS[config.settings.ID_STRATEGY]()
@@ -0,0 +1,67 @@
+"""Keyset pagination utils.
+
+This module contains utility functions to encode and decode the opaque
+cursors used to paginate lists. A cursor holds the sort key values of the
+last model of a page, so that the next page can be read with an indexed
+range scan instead of skipping rows with `OFFSET`.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, List, Sequence
+
+from starlette import datastructures
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class InvalidSortError(ValueError):
+    """Raised when a list is sorted by columns it cannot be sorted by."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Returns the opaque cursor for the given sort key values.
+
+    Args:
+        values: The sort key values of the last model of a page.
+    """
+    data = json.dumps(list(values), default=str, separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Returns the sort key values encoded in the given cursor.
+
+    Args:
+        cursor: The opaque cursor.
+
+    Raises:
+        InvalidCursorError: The cursor is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise InvalidCursorError("Invalid cursor.") from error
+
+    if not isinstance(values, list):
+        raise InvalidCursorError("Invalid cursor.")
+
+    return values
+
+
+def next_page_link(url: datastructures.URL, cursor: str) -> str:
+    """Returns the `Link` header value pointing to the next page.
+
+    Args:
+        url: The URL of the current page.
+        cursor: The cursor of the next page.
+    """
+    next_url = url.remove_query_params("offset").include_query_params(
+        cursor=cursor)
+
+    return f'<{next_url}>; rel="next"'
@@ -4,7 +4,10 @@ This module contains utility functions related to password and
 authentication tokens management.
 """
 
+import asyncio
+from concurrent import futures
 import datetime
+from typing import Any, Callable
 
 from passlib import context
 import jose
@@ -38,6 +41,101 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherBusyError(Exception):
+    """Raised when no password worker frees up within the queue timeout."""
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords off the event loop.
+
+    bcrypt is deliberately slow, so running it in a request handler would
+    stall every other request served by the event loop. Hashing runs in
+    a thread or process pool instead, with at most `workers` passwords
+    processed at a time. Requests wait up to `queue_timeout` seconds for
+    a free worker before `PasswordHasherBusyError` is raised.
+
+    Attributes:
+        pool: Either "thread" or "process".
+        workers: The maximum number of concurrent hashing operations.
+        queue_timeout: The time to wait for a free worker, in seconds.
+    """
+
+    def __init__(self, *, pool: str, workers: int, queue_timeout: float):
+        if pool not in ("thread", "process"):
+            raise ValueError(f"Unknown password hasher pool {pool!r}")
+
+        self.pool = pool
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self._executor: futures.Executor | None = None
+        self._slots = asyncio.Semaphore(workers)
+
+    def _get_executor(self) -> futures.Executor:
+        """Returns the worker pool, creating it on first use."""
+        if self._executor is None:
+            if self.pool == "process":
+                self._executor = futures.ProcessPoolExecutor(self.workers)
+            else:
+                self._executor = futures.ThreadPoolExecutor(
+                    self.workers, thread_name_prefix="password-hasher")
+
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs the given function in the worker pool.
+
+        Args:
+            func: The function to run.
+            args: The arguments of the function.
+
+        Raises:
+            PasswordHasherBusyError: No worker freed up in time.
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError as timeout:
+            raise PasswordHasherBusyError(
+                "Too many concurrent password operations") from timeout
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._get_executor(), func, *args)
+        finally:
+            self._slots.release()
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verifies the match between the given plain and hashed passwords.
+
+        Args:
+            plain_password: The password in plain text.
+            hashed_password: The hashed password.
+
+        Returns:
+            True if the passwords match.
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """Returns the hash for the given password.
+
+        Args:
+            password: The password in plain text.
+        """
+        return await self._run(get_password_hash, password)
+
+    def shutdown(self):
+        """Shuts the worker pool down."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    pool=config.settings.PASSWORD_HASHER_POOL,
+    workers=config.settings.PASSWORD_HASHER_WORKERS,
+    queue_timeout=config.settings.PASSWORD_HASHER_QUEUE_TIMEOUT_SECONDS)
+
+
 def create_access_token(data: dict,
                         expires_delta: datetime.timedelta | None = None):
     """Returns an encoded JWT token.
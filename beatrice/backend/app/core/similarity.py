@@ -0,0 +1,319 @@
+"""Text similarity utils.
+
+This module contains an in-memory inverted index of character trigrams
+finding the texts similar to a given one, and the groups of similar
+texts, without comparing every pair of texts.
+"""
+
+import collections
+import math
+import re
+from typing import Deque, Dict, FrozenSet, Hashable, Iterable, List, Set, Tuple
+
+_NON_ALPHANUMERIC = re.compile(r"[\W_]+")
+
+# The number of first trigrams a candidate must share with the query.
+# Requiring more than one discards most chance matches before computing
+# their similarity, at the cost of indexing a few more trigrams per text.
+SHARED_PREFIX_TRIGRAMS = 3
+
+# The tolerance of the bounds derived from thresholds to rounding errors.
+_EPSILON = 1e-9
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Returns the character trigrams of a text.
+
+    The text is lowercased and split into words on punctuation and spaces,
+    and each word is padded, so that "Steins;Gate" and "steins gate" have
+    the same trigrams.
+
+    Args:
+        text: The text.
+    """
+    grams = set()
+
+    for word in _NON_ALPHANUMERIC.sub(" ", text.lower()).split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    return frozenset(grams)
+
+
+def jaccard(grams: FrozenSet[str], other_grams: FrozenSet[str]) -> float:
+    """Returns the Jaccard similarity of two sets of trigrams.
+
+    Args:
+        grams: The trigrams of a text.
+        other_grams: The trigrams of another text.
+    """
+    if not grams or not other_grams:
+        return 0.0
+
+    shared = len(grams & other_grams)
+
+    return shared / (len(grams) + len(other_grams) - shared)
+
+
+def _min_overlap(size: int, threshold: float) -> int:
+    """Returns the trigrams a text must share with a similar one.
+
+    A text of `size` trigrams whose Jaccard similarity with another is at
+    least `threshold` shares at least `ceil(threshold * size)` trigrams
+    with it, whatever the size of the other text.
+    """
+    return math.ceil(threshold * size - _EPSILON)
+
+
+class TrigramIndex:
+    """An inverted index from trigrams to the texts holding them.
+
+    Candidates are generated with prefix filtering: trigrams are ranked
+    from the rarest to the most common, and two texts of `n` and `m`
+    trigrams sharing at least `o` of them share at least `k` among their
+    `n - o + k` and `m - o + k` first trigrams. Each text only indexes its
+    first trigrams, which are rare, so that postings are short and a query
+    only reads the postings of its own first trigrams. Postings are also
+    split by the number of trigrams of the texts, since texts whose sizes
+    are too far apart cannot be similar. Candidates are verified exactly.
+
+    The ranking of trigrams is computed when building the index, and any
+    fixed ranking is correct, so that texts added later are ranked alike.
+    Texts with the same trigrams, e.g. exact duplicates, are indexed once.
+
+    Attributes:
+        min_threshold: The minimum Jaccard similarity of searches. Lower
+            thresholds index more trigrams of each text.
+    """
+
+    def __init__(self, min_threshold: float):
+        self.min_threshold = min_threshold
+        self._frequencies: Dict[str, int] = {}
+        self._grams: Dict[Hashable, FrozenSet[str]] = {}
+        self._values: Dict[FrozenSet[str], Set[Hashable]] = {}
+        self._postings: Dict[Tuple[str, int], Set[FrozenSet[str]]] = (
+            collections.defaultdict(set))
+
+    def __len__(self) -> int:
+        return len(self._grams)
+
+    def _prefix(self, grams: FrozenSet[str], threshold: float,
+                shared: int) -> List[str]:
+        """Returns the rarest trigrams of a text to probe or index."""
+        rarest = sorted(grams,
+                        key=lambda gram: (self._frequencies.get(gram, 0), gram))
+
+        return rarest[:len(grams) - _min_overlap(len(grams), threshold) +
+                      shared]
+
+    def build(self, items: Iterable[Tuple[Hashable, str | None]]):
+        """Replaces the content of the index.
+
+        Args:
+            items: The values along with their text.
+        """
+        grams_by_value = {value: trigrams(text or "") for value, text in items}
+        self._frequencies = collections.Counter(
+            gram for grams in set(grams_by_value.values()) for gram in grams)
+        self._grams.clear()
+        self._values.clear()
+        self._postings.clear()
+
+        for value, grams in grams_by_value.items():
+            self._add(value, grams)
+
+    def add(self, value: Hashable, text: str | None):
+        """Adds or replaces the text of a value.
+
+        Nothing is done if the value already has the same trigrams, as when
+        its other columns are updated.
+
+        Args:
+            value: The value.
+            text: The text of the value. Empty texts are ignored.
+        """
+        grams = trigrams(text or "")
+
+        if self._grams.get(value) == grams:
+            return
+
+        self.remove(value)
+        self._add(value, grams)
+
+    def _add(self, value: Hashable, grams: FrozenSet[str]):
+        """Adds the trigrams of a value missing from the index."""
+        if not grams:
+            return
+
+        self._grams[value] = grams
+
+        if grams in self._values:
+            self._values[grams].add(value)
+            return
+
+        self._values[grams] = {value}
+
+        for gram in self._prefix(grams, self.min_threshold,
+                                 SHARED_PREFIX_TRIGRAMS):
+            self._postings[gram, len(grams)].add(grams)
+
+    def remove(self, value: Hashable):
+        """Removes the text of a value, if any.
+
+        Args:
+            value: The value.
+        """
+        grams = self._grams.pop(value, None)
+
+        if grams is None:
+            return
+
+        values = self._values[grams]
+        values.discard(value)
+
+        if values:
+            return
+
+        del self._values[grams]
+
+        for gram in self._prefix(grams, self.min_threshold,
+                                 SHARED_PREFIX_TRIGRAMS):
+            postings = self._postings[gram, len(grams)]
+            postings.discard(grams)
+
+            if not postings:
+                del self._postings[gram, len(grams)]
+
+    def _candidates(self, grams: FrozenSet[str],
+                    threshold: float) -> List[FrozenSet[str]]:
+        """Returns the indexed trigrams possibly similar to the given ones.
+
+        Args:
+            grams: The trigrams of the query.
+            threshold: The minimum Jaccard similarity.
+
+        Raises:
+            ValueError: The threshold is lower than the minimum threshold.
+        """
+        if threshold < self.min_threshold:
+            raise ValueError(
+                f"The threshold must be at least {self.min_threshold}")
+
+        shared = min(_min_overlap(len(grams), threshold),
+                     SHARED_PREFIX_TRIGRAMS)
+        sizes = range(_min_overlap(len(grams), threshold),
+                      math.floor(len(grams) / threshold + _EPSILON) + 1)
+        hits = collections.Counter()
+
+        for gram in self._prefix(grams, threshold, shared):
+            for size in sizes:
+                hits.update(self._postings.get((gram, size), ()))
+
+        return [
+            candidate for candidate, count in hits.items() if count >= shared
+        ]
+
+    def search(self, text: str,
+               threshold: float) -> List[Tuple[Hashable, float]]:
+        """Returns the values whose text is similar to the given one.
+
+        Args:
+            text: The query text.
+            threshold: The minimum Jaccard similarity, at least the minimum
+                threshold of the index.
+
+        Returns:
+            The `(value, similarity)` pairs, most similar first.
+
+        Raises:
+            ValueError: The threshold is lower than the minimum threshold.
+        """
+        grams = trigrams(text)
+
+        if not grams:
+            return []
+
+        matches = []
+
+        for candidate in self._candidates(grams, threshold):
+            similarity = jaccard(grams, candidate)
+
+            if similarity >= threshold:
+                matches.extend(
+                    (value, similarity) for value in self._values[candidate])
+
+        return sorted(matches, key=lambda match: match[1], reverse=True)
+
+    def clusters(self, threshold: float) -> List[List[Hashable]]:
+        """Returns the groups of values whose texts are similar.
+
+        Values are grouped transitively: two values belong to the same
+        group if a chain of similar texts links them.
+
+        The texts are joined with themselves from the shortest to the
+        longest, against a temporary index of the texts already seen. Since
+        these are not longer than the current one, two similar texts share
+        at least `o = ceil(2 * threshold / (1 + threshold) * m)` trigrams,
+        where `m` is the size of the shortest, so that it only indexes its
+        `m - o + k` first trigrams. Texts too short to be similar to the
+        current one are dropped from the postings, never to be read again.
+
+        The groups are computed from a copy of the index, which may be
+        updated by another thread meanwhile.
+
+        Args:
+            threshold: The minimum Jaccard similarity, greater than 0.
+
+        Returns:
+            The groups of at least two values, largest first.
+        """
+        values = dict(self._values)
+        texts = sorted(values, key=len)
+        frequencies = collections.Counter()
+
+        for grams in texts:
+            frequencies.update(grams)
+
+        postings: Dict[str,
+                       Deque[int]] = collections.defaultdict(collections.deque)
+        parents = list(range(len(texts)))
+
+        def root(position: int) -> int:
+            while parents[position] != position:
+                parents[position] = parents[parents[position]]
+                position = parents[position]
+
+            return position
+
+        for position, grams in enumerate(texts):
+            rarest = sorted(grams, key=frequencies.__getitem__)
+            overlap = _min_overlap(len(grams), threshold)
+            shared = min(overlap, SHARED_PREFIX_TRIGRAMS)
+            hits = collections.Counter()
+
+            for gram in rarest[:len(grams) - overlap + shared]:
+                gram_postings = postings.get(gram, ())
+
+                while gram_postings and len(texts[gram_postings[0]]) < overlap:
+                    gram_postings.popleft()
+
+                hits.update(gram_postings)
+
+            for candidate, count in hits.items():
+                if (count >= shared and
+                        jaccard(grams, texts[candidate]) >= threshold):
+                    parents[root(candidate)] = root(position)
+
+            overlap = _min_overlap(len(grams), 2 * threshold / (1 + threshold))
+
+            for gram in rarest[:len(grams) - overlap + SHARED_PREFIX_TRIGRAMS]:
+                postings[gram].append(position)
+
+        groups = collections.defaultdict(list)
+
+        for position, grams in enumerate(texts):
+            groups[root(position)].extend(values[grams])
+
+        return sorted((group for group in groups.values() if len(group) > 1),
+                      key=len,
+                      reverse=True)
@@ -1,10 +1,11 @@
 """Anime CRUD controller."""
 
 import sqlmodel
-from sqlmodel.ext.asyncio import session as aio_session
+from sqlalchemy import orm
 
 from app.crud import base
 from app.models import anime
+from app.models import patron
 
 
 class AnimeCRUD(base.BaseCRUD[anime.Anime, anime.AnimeCreate,
@@ -14,15 +15,15 @@ class AnimeCRUD(base.BaseCRUD[anime.Anime, anime.AnimeCreate,
     It contains Create, Read, Update, and Delete methods.
     """
 
-    @classmethod
-    async def get_by_title(cls, session: aio_session.AsyncSession,
-                           title: str) -> anime.Anime | None:
-        """Gets an anime by their title.
+    LOADER_OPTIONS = {
+        base.LoadingProfile.PATRON: (orm.selectinload(anime.Anime.patron),),
+    }
+    VERSION_COLUMNS = {
+        base.LoadingProfile.PATRON:
+            (sqlmodel.select(patron.Patron.updated_at).where(
+                patron.Patron.id == anime.Anime.proposed_by).scalar_subquery(),
+            ),
+    }
 
-        Args:
-            session: The database session.
-            title: The anime's title.
-        """
-        anime_list = await session.exec(
-            sqlmodel.select(anime.Anime).where(anime.Anime.title_en == title))
-        return anime_list.first()
+    SORTABLE = ("created_at", "updated_at", "title_en", "year")
+    UNIQUE = ("title_en",)
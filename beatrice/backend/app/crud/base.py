@@ -1,119 +1,1151 @@
 """Base CRUD controller."""
 
 import abc
-from typing import Any, Dict, Generic, get_args, List, TypeVar
+import asyncio
+import collections
+import contextlib
+import contextvars
+import datetime
+import enum
+import operator
+import uuid
+from typing import (Any, AsyncIterator, Callable, ClassVar, Dict, Generic,
+                    get_args, List, Mapping, Sequence, Tuple, TypeVar)
 
+import sqlalchemy
 import sqlmodel
+from sqlalchemy.dialects import postgresql
 from sqlmodel.ext.asyncio import session as aio_session
+from sqlmodel.sql import sqltypes
+
+from app.core import cache
+from app.core import config
+from app.core import database
+from app.core import pagination
 
 ModelType = TypeVar("ModelType", bound=sqlmodel.SQLModel)
 CreateModelType = TypeVar("CreateModelType", bound=ModelType)
 UpdateModelType = TypeVar("UpdateModelType", bound=ModelType)
 
+# The number of rows sent per statement by the bulk methods.
+BATCH_SIZE = 1000
+
+# The number of rows of the writes of many models notified to the write
+# listeners at once, before yielding to the other requests.
+NOTIFY_BATCH_SIZE = 100
+
+# The reads of single models and of lists share the cache budget evenly.
+_entities = cache.TTLCache(ttl=config.settings.CACHE_TTL_SECONDS,
+                           max_entries=None,
+                           max_bytes=config.settings.CACHE_MAX_BYTES // 2,
+                           name="entities")
+_queries = cache.TTLCache(ttl=config.settings.CACHE_TTL_SECONDS,
+                          max_entries=None,
+                          max_bytes=config.settings.CACHE_MAX_BYTES // 2,
+                          name="queries")
+
+# The number of writes of each model, part of the keys of cached reads.
+_generations: collections.Counter[type] = collections.Counter()
+
+# The comparison applied by a filter, given the suffix of its name. Filters
+# without suffix are equalities.
+_FILTER_OPERATORS = {
+    "_from": operator.ge,
+    "_to": operator.le,
+    "_since": operator.ge,
+}
+
+# A sort key column and whether the order is descending.
+SortKey = Tuple[sqlalchemy.Column, bool]
+
+# The SQLSTATE of the unique constraint violations.
+UNIQUE_VIOLATION = "23505"
+
+
+class ConflictError(Exception):
+    """Raised when a write conflicts with a unique constraint."""
+
+
+class Write(enum.Enum):
+    """Kinds of writes notified to the write listeners."""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+WriteListener = Callable[[Write, Sequence[Any]], None]
+_write_listeners: Dict[type,
+                       List[WriteListener]] = collections.defaultdict(list)
+
+# The fields read by the write listeners of each model, besides the id.
+_listened_fields: Dict[type, set[str]] = collections.defaultdict(set)
+
+# A write handled once its `atomic` block commits: the function handling
+# it, the kind of write and the written models.
+_DeferredWrite = Tuple[WriteListener, Write, Sequence[Any]]
+
+# The `_DeferredWrite`s of the current `atomic` block, or None outside of
+# them.
+_uncommitted = contextvars.ContextVar("uncommitted", default=None)
+
+
+def _caching() -> bool:
+    """Checks whether reads may use the cache.
+
+    Reads made in an `atomic` block may see uncommitted writes, so they
+    neither use nor fill the cache.
+    """
+    return config.settings.CACHE_ENABLED and _uncommitted.get() is None
+
+
+@contextlib.asynccontextmanager
+async def atomic() -> AsyncIterator[aio_session.AsyncSession]:
+    """Yields a session whose writes are all committed at once.
+
+    The commits of the CRUD methods called with the session do not end its
+    transaction: it is committed when the block exits, or rolled back if
+    the block raises. The cached reads are invalidated, and the write
+    listeners called, only once the transaction is committed, yielding to
+    the event loop between the writes.
+
+    Yields:
+        The database session.
+    """
+    writes: List[_DeferredWrite] = []
+    token = _uncommitted.set(writes)
+
+    try:
+        async with database.engine.connect() as connection:
+            async with connection.begin():
+                async with aio_session.AsyncSession(
+                        connection, expire_on_commit=False) as session:
+                    yield session
+                    await session.commit()
+    finally:
+        _uncommitted.reset(token)
+
+    for committed, write, models_db in writes:
+        committed(write, models_db)
+        await asyncio.sleep(0)
+
+
+def add_write_listener(model: type[sqlmodel.SQLModel],
+                       listener: WriteListener,
+                       fields: Sequence[str] = ()):
+    """Registers a function called after the writes of a model.
+
+    The listener is called once the write is committed, with the kind of
+    write and the written models. Deleted models hold their last values.
+    The writes of many models only pass rows of the id and of the fields
+    read by the listeners, in batches of `NOTIFY_BATCH_SIZE`, and skip the
+    listeners when none of these fields are updated.
+
+    Args:
+        model: The database model.
+        listener: The function to call.
+        fields: The fields read by the listener, besides the id.
+    """
+    _write_listeners[model].append(listener)
+    _listened_fields[model].update(fields)
+
+
+class LoadingProfile(enum.Enum):
+    """Relationships eagerly loaded along with a model.
+
+    Relationships are never loaded implicitly: each read states what its
+    response serializes.
+
+    Attributes:
+        NONE: Only the model's columns.
+        PATRON: The patron who proposed the media.
+        MEDIA: All the media proposed by the patron.
+    """
+    NONE = "none"
+    PATRON = "patron"
+    MEDIA = "media"
+
+
+def _parse_key(column: sqlalchemy.Column, value: Any) -> Any:
+    """Converts a sort key value decoded from a cursor to the column type.
+
+    Args:
+        column: The sort key column.
+        value: The decoded value.
+    """
+    if value is None:
+        return None
+    if isinstance(column.type, sqltypes.GUID):
+        return uuid.UUID(value)
+    if isinstance(column.type, sqltypes.AutoString):
+        return value
+
+    python_type = column.type.python_type
+
+    if python_type in (datetime.datetime, datetime.date):
+        return python_type.fromisoformat(value)
+
+    return python_type(value)
+
+
+def _after_key(column: sqlalchemy.Column, value: Any,
+               descending: bool) -> sqlalchemy.sql.ColumnElement:
+    """Returns the condition selecting the column values sorted after one.
+
+    Null values are sorted last in ascending order, and first in descending
+    order, as they are by default and in indexes.
+
+    Args:
+        column: The sort key column.
+        value: The sort key value.
+        descending: Whether the order is descending.
+    """
+    if value is None:
+        return column.is_not(None) if descending else sqlalchemy.false()
+    if descending:
+        return column < value
+    if column.nullable:
+        return sqlalchemy.or_(column > value, column.is_(None))
+
+    return column > value
+
 
 class BaseCRUD(Generic[ModelType, CreateModelType, UpdateModelType],
                metaclass=abc.ABCMeta):
     """Base CRUD controller.
 
     It contains default Create, Read, Update, Delete (CRUD) methods.
+
+    Reads are cached in the worker for `CACHE_TTL_SECONDS`. The cache keys
+    hold the generation of the model, and of the related models loaded
+    along with it, which every write bumps, so cached reads never outlive
+    a write made by the same worker. Cached models are shared between
+    requests and must not be modified.
+
+    Attributes:
+        LOADER_OPTIONS: The loader options of each supported loading profile
+            other than `LoadingProfile.NONE`.
+        KEYSET: The columns lists are sorted by default. The last column
+            must be unique, so that every model has a distinct position.
+        SORTABLE: The columns lists can be sorted by on demand. They should
+            be indexed, and are followed by `id` to break ties.
+        VERSION_COLUMNS: The expressions selected along with `updated_at`
+            to tell whether the relationships loaded by each supported
+            loading profile have changed.
+        UNIQUE: The columns of the unique constraint identifying models
+            besides their id, which `upsert` matches models by, and which
+            `create` and `create_multi` skip the models conflicting on.
     """
+    LOADER_OPTIONS: ClassVar[Dict[LoadingProfile, Sequence[Any]]] = {}
+    VERSION_COLUMNS: ClassVar[Dict[LoadingProfile, Sequence[Any]]] = {}
+    KEYSET: ClassVar[Sequence[str]] = ("created_at", "id")
+    SORTABLE: ClassVar[Sequence[str]] = ("created_at", "updated_at")
+    UNIQUE: ClassVar[Sequence[str]] = ()
+
+    @classmethod
+    def _model(cls) -> type[ModelType]:
+        """Returns the database model handled by the controller."""
+        return get_args(cls.__orig_bases__[0])[0]
+
+    @classmethod
+    def _loader_options(cls, load: LoadingProfile) -> Sequence[Any]:
+        """Returns the loader options of the given loading profile.
+
+        Args:
+            load: The loading profile.
+
+        Raises:
+            ValueError: The profile is not supported by the model.
+        """
+        if load is LoadingProfile.NONE:
+            return ()
+        if load not in cls.LOADER_OPTIONS:
+            raise ValueError(f"{cls.__name__} does not support loading "
+                             f"profile {load.value!r}")
+
+        return cls.LOADER_OPTIONS[load]
+
+    @classmethod
+    def _version_columns(cls, load: LoadingProfile) -> Sequence[Any]:
+        """Returns the version columns of the given loading profile.
+
+        Args:
+            load: The loading profile.
+
+        Raises:
+            ValueError: The profile is not supported by the model.
+        """
+        if load is LoadingProfile.NONE:
+            return ()
+        if load not in cls.VERSION_COLUMNS:
+            raise ValueError(f"{cls.__name__} does not support loading "
+                             f"profile {load.value!r}")
+
+        return cls.VERSION_COLUMNS[load]
+
+    @classmethod
+    def _cache_key(cls, load: LoadingProfile, *params: Any) -> Tuple[Any, ...]:
+        """Returns the cache key of a read.
+
+        It must be computed before reading, so that a write committed in
+        the meantime makes the entry unreachable.
+
+        Args:
+            load: The relationships loaded by the read.
+            params: The parameters of the read.
+        """
+        model = cls._model()
+        models = [model]
+
+        if load is not LoadingProfile.NONE:
+            models.extend(
+                relationship.mapper.class_
+                for relationship in sqlalchemy.inspect(model).relationships)
+
+        return (model, load, *params,
+                tuple(_generations[related] for related in models))
+
+    @classmethod
+    def _committed(cls, write: Write, models_db: Sequence[ModelType]):
+        """Handles a committed write of models.
+
+        The cached reads of the model become unreachable, and the write
+        listeners are called. In an `atomic` block, the write is handled
+        once the block commits.
+
+        Args:
+            write: The kind of write.
+            models_db: The written models.
+        """
+        writes = _uncommitted.get()
+
+        if writes is not None:
+            writes.append((cls._notify, write, models_db))
+            return
+
+        cls._notify(write, models_db)
+
+    @classmethod
+    def _notify(cls, write: Write, models_db: Sequence[ModelType]):
+        """Invalidates the cached reads and calls the write listeners.
+
+        Args:
+            write: The kind of write.
+            models_db: The written models.
+        """
+        model = cls._model()
+        _generations[model] += 1
+
+        for listener in _write_listeners[model]:
+            listener(write, models_db)
+
+    @classmethod
+    def _keyset_columns(cls) -> List[sqlalchemy.Column]:
+        """Returns the columns lists are sorted by."""
+        table = cls._model().__table__
+
+        return [table.c[name] for name in cls.KEYSET]
+
+    @classmethod
+    def _sort_keys(cls, sort: str | None) -> List[SortKey]:
+        """Returns the keys lists are sorted by.
+
+        Args:
+            sort: The comma-separated names of the columns to sort by, each
+                prefixed by `-` for a descending order, or None to sort by
+                `KEYSET`.
+
+        Raises:
+            InvalidSortError: A column is not sortable or repeated.
+        """
+        table = cls._model().__table__
+
+        if not sort:
+            return [(table.c[name], False) for name in cls.KEYSET]
+
+        keys = []
+
+        for field in sort.split(","):
+            name = field.removeprefix("-")
+
+            if name not in cls.SORTABLE:
+                raise pagination.InvalidSortError(
+                    f"Cannot sort by {name!r}. Sortable fields: "
+                    f"{', '.join(cls.SORTABLE)}.")
+            if any(column.name == name for column, _ in keys):
+                raise pagination.InvalidSortError(
+                    f"Cannot sort by {name!r} more than once.")
+
+            keys.append((table.c[name], field.startswith("-")))
+
+        return keys + [(table.c.id, keys[-1][1])]
+
+    @classmethod
+    def _after(cls, cursor: str,
+               keys: Sequence[SortKey]) -> sqlalchemy.sql.ColumnElement:
+        """Returns the condition selecting the models following a cursor.
+
+        When the keys are sorted in the same direction and cannot be null,
+        they are compared as a row, which an index on them serves as a
+        single range. Otherwise, the models must either be after the
+        cursor on the first key, or equal on it and after on the next ones.
+
+        Args:
+            cursor: The cursor returned by `cursor`.
+            keys: The sort keys of the list.
+
+        Raises:
+            InvalidCursorError: The cursor is malformed.
+        """
+        values = pagination.decode_cursor(cursor)
+
+        if len(values) != len(keys):
+            raise pagination.InvalidCursorError("Invalid cursor.")
+
+        try:
+            values = [
+                _parse_key(column, value)
+                for (column, _), value in zip(keys, values)
+            ]
+        except (TypeError, ValueError) as error:
+            raise pagination.InvalidCursorError("Invalid cursor.") from error
+
+        columns = [column for column, _ in keys]
+
+        if (len({descending for _, descending in keys}) == 1 and
+                not any(column.nullable for column in columns)):
+            row = sqlalchemy.tuple_(*columns)
+            cursor_row = sqlalchemy.tuple_(
+                *(sqlalchemy.literal(value, column.type)
+                  for column, value in zip(columns, values)))
+
+            return row < cursor_row if keys[0][1] else row > cursor_row
+
+        conditions = []
+
+        for position, (column, descending) in enumerate(keys):
+            equal = [
+                column_.is_(None) if value is None else column_ == value
+                for column_, value in zip(columns[:position], values)
+            ]
+            conditions.append(
+                sqlalchemy.and_(
+                    *equal, _after_key(column, values[position], descending)))
+
+        return sqlalchemy.or_(*conditions)
+
+    @classmethod
+    def _conditions(
+            cls, filters: Dict[str, Any] | None
+    ) -> List[sqlalchemy.sql.ColumnElement]:
+        """Returns the conditions selecting the models matching filters.
+
+        A filter named after a column selects the models whose column is
+        equal to its value, and a filter named after a column followed by
+        `_from`, `_to` or `_since` selects a range, bounds included.
+
+        Args:
+            filters: The values of the filters, by name.
+
+        Raises:
+            ValueError: A filter does not match any column.
+        """
+        table = cls._model().__table__
+        conditions = []
+
+        for name, value in (filters or {}).items():
+            if name in table.c:
+                conditions.append(table.c[name] == value)
+                continue
+
+            for suffix, compare in _FILTER_OPERATORS.items():
+                column = name.removesuffix(suffix)
+
+                if column != name and column in table.c:
+                    conditions.append(compare(table.c[column], value))
+                    break
+            else:
+                raise ValueError(
+                    f"{cls.__name__} has no column to filter by {name!r}")
+
+        return conditions
+
+    @classmethod
+    def _matching(
+        cls, model_id: Any, conditions: Dict[str, Any] | None
+    ) -> List[sqlalchemy.sql.ColumnElement]:
+        """Returns the conditions selecting a model by id and column values.
+
+        Args:
+            model_id: The id of the model.
+            conditions: The values the model's columns must be equal to.
+        """
+        table = cls._model().__table__
+
+        return [table.c.id == model_id] + [
+            table.c[field] == value
+            for field, value in (conditions or {}).items()
+        ]
+
+    @classmethod
+    def _columns(cls, fields: Sequence[str]) -> List[sqlalchemy.Column]:
+        """Returns the columns of the given fields.
+
+        Args:
+            fields: The names of the columns.
+
+        Raises:
+            ValueError: A field does not match any column.
+        """
+        table = cls._model().__table__
+
+        for field in fields:
+            if field not in table.c:
+                raise ValueError(f"{cls.__name__} has no column {field!r}")
+
+        return [table.c[field] for field in fields]
+
+    @classmethod
+    def cursor(cls,
+               model_db: ModelType | Mapping[str, Any],
+               *,
+               sort: str | None = None) -> str:
+        """Returns the cursor of the page following the given model.
+
+        Args:
+            model_db: The last model of a page, or the last row of a page
+                read with `fields`.
+            sort: The sort order of the list, as given to `read_multi`.
+
+        Raises:
+            InvalidSortError: The sort order is invalid.
+        """
+        if isinstance(model_db, Mapping):
+            return pagination.encode_cursor(
+                model_db[column.key] for column, _ in cls._sort_keys(sort))
+
+        return pagination.encode_cursor(
+            getattr(model_db, column.key) for column, _ in cls._sort_keys(sort))
+
+    @classmethod
+    def _insert(cls, values: Any) -> Any:
+        """Returns the `INSERT` of rows, skipping the ones already stored.
+
+        Only the rows conflicting with existing ones on `UNIQUE` are
+        skipped: any other constraint violation, e.g. on the primary key,
+        raises.
+
+        Args:
+            values: The values of the row, or a list of them.
+        """
+        statement = postgresql.insert(cls._model().__table__).values(values)
+
+        if not cls.UNIQUE:
+            return statement
+
+        return statement.on_conflict_do_nothing(index_elements=cls.UNIQUE)
 
     @classmethod
     async def create(cls,
                      session: aio_session.AsyncSession,
                      *,
                      model_in: CreateModelType,
-                     update: Dict[str, Any] | None = None) -> ModelType:
-        """Creates a new model.
+                     update: Dict[str, Any] | None = None) -> ModelType | None:
+        """Creates a new model with a single statement.
+
+        Models conflicting with existing ones on `UNIQUE` are not
+        inserted, without raising.
 
         Args:
             session: The database session.
             model_in: The data used to create the model.
+            update: The values overriding the ones of `model_in`.
 
         Returns:
-            The ceated model.
-        """
-        model_db = get_args(cls.__orig_bases__[0])[0].from_orm(model_in, update)
+            The created model, or None if it conflicts with another one.
 
-        session.add(model_db)
+        Raises:
+            IntegrityError: The model violates another constraint.
+        """
+        model = cls._model()
+        table = model.__table__
+        values = model.from_orm(model_in, update).dict()
+        rows = await session.execute(cls._insert(values).returning(*table.c))
+        row = rows.mappings().first()
         await session.commit()
-        await session.refresh(model_db)
+
+        if row is None:
+            return None
+
+        model_db = model(**row)
+        cls._committed(Write.CREATE, [model_db])
 
         return model_db
 
     @classmethod
-    async def read(cls, session: aio_session.AsyncSession,
-                   model_id: Any) -> ModelType | None:
+    async def create_multi(
+            cls, session: aio_session.AsyncSession, *,
+            models_in: Sequence[CreateModelType]) -> List[ModelType | None]:
+        """Creates many models in a single transaction.
+
+        Rows are inserted with one multi-row `INSERT` per `BATCH_SIZE`
+        models, and committed once. Models conflicting with existing ones,
+        or with the previous ones, on `UNIQUE` are not inserted.
+        The created models are notified in batches of `NOTIFY_BATCH_SIZE`,
+        yielding to the event loop in between.
+
+        Args:
+            session: The database session.
+            models_in: The data used to create the models.
+
+        Returns:
+            The created models, in the same order, None standing for the
+            models not inserted.
+
+        Raises:
+            IntegrityError: A model violates another constraint.
+        """
+        model = cls._model()
+        models_db = [model.from_orm(model_in) for model_in in models_in]
+        table = model.__table__
+        inserted = set()
+
+        for start in range(0, len(models_db), BATCH_SIZE):
+            model_ids = await session.execute(
+                cls._insert([
+                    model_db.dict()
+                    for model_db in models_db[start:start + BATCH_SIZE]
+                ]).returning(table.c.id))
+            inserted.update(model_ids.scalars())
+
+        await session.commit()
+        created = [
+            model_db for model_db in models_db if model_db.id in inserted
+        ]
+
+        for start in range(0, len(created), NOTIFY_BATCH_SIZE):
+            cls._committed(Write.CREATE,
+                           created[start:start + NOTIFY_BATCH_SIZE])
+            await asyncio.sleep(0)
+
+        return [
+            model_db if model_db.id in inserted else None
+            for model_db in models_db
+        ]
+
+    @classmethod
+    async def upsert(
+        cls,
+        session: aio_session.AsyncSession,
+        *,
+        model_in: CreateModelType,
+        conditions: Dict[str, Any] | None = None
+    ) -> Tuple[ModelType, bool] | None:
+        """Creates a model, or updates the one matching it on `UNIQUE`.
+
+        The model is written with a single `INSERT ... ON CONFLICT DO
+        UPDATE` statement, so concurrent upserts of the same model cannot
+        both insert it.
+
+        Args:
+            session: The database session.
+            model_in: The data of the model.
+            conditions: The values the columns of the existing model must be
+                equal to for it to be updated, e.g. the id of the patron
+                allowed to update it.
+
+        Returns:
+            The written model and whether it was created, or None if an
+            existing model did not match the conditions.
+
+        Raises:
+            ValueError: The model has no unique columns.
+        """
+        if not cls.UNIQUE:
+            raise ValueError(f"{cls.__name__} has no unique columns")
+
+        model = cls._model()
+        table = model.__table__
+        statement = postgresql.insert(table).values(
+            model.from_orm(model_in).dict())
+        matching = [
+            table.c[field] == value
+            for field, value in (conditions or {}).items()
+        ]
+        statement = statement.on_conflict_do_update(
+            index_elements=cls.UNIQUE,
+            set_={
+                field: statement.excluded[field]
+                for field in (*model_in.__fields__, "updated_at")
+                if field not in cls.UNIQUE
+            },
+            where=sqlalchemy.and_(*matching) if matching else None)
+        # `xmax` is only set on the rows updated by the statement.
+        rows = await session.execute(
+            statement.returning(
+                *table.c,
+                sqlalchemy.literal_column("xmax = 0").label("inserted")))
+        row = rows.mappings().first()
+        await session.commit()
+
+        if row is None:
+            return None
+
+        values = dict(row)
+        created = values.pop("inserted")
+        model_db = model(**values)
+        cls._committed(Write.CREATE if created else Write.UPDATE, [model_db])
+
+        return model_db, created
+
+    @classmethod
+    async def read(
+        cls,
+        session: aio_session.AsyncSession,
+        model_id: Any,
+        *,
+        load: LoadingProfile = LoadingProfile.NONE,
+        fields: Sequence[str] | None = None
+    ) -> ModelType | Dict[str, Any] | None:
         """Reads a model given its id.
 
         Args:
             session: The database session.
             model_id: The model id.
+            load: The relationships to load along with the model, when
+                reading the whole model.
+            fields: The names of the only columns to read, or None to read
+                the whole model.
+
+        Returns:
+            A model, the values of the given fields by name, or None if the
+            model could not be found.
+
+        Raises:
+            ValueError: A field does not match any column.
+        """
+        if fields is not None:
+            load = LoadingProfile.NONE
+
+        key = cls._cache_key(load, model_id, tuple(fields or ()))
+        model_db = _entities.get(key) if _caching() else None
+
+        if model_db is None and fields is not None:
+            table = cls._model().__table__
+            rows = await session.execute(
+                sqlalchemy.select(*cls._columns(fields)).where(
+                    table.c.id == model_id))
+            row = rows.mappings().first()
+            model_db = None if row is None else dict(row)
+        elif model_db is None:
+            model_db = await session.get(cls._model(),
+                                         model_id,
+                                         options=cls._loader_options(load))
+
+            if model_db is not None and _caching():
+                _entities.set(key, model_db, cache.sizeof(model_db))
+
+        return model_db
+
+    @classmethod
+    async def read_many(cls, session: aio_session.AsyncSession,
+                        model_ids: Sequence[Any], *,
+                        fields: Sequence[str]) -> Dict[Any, Dict[str, Any]]:
+        """Reads the given columns of many models given their ids.
+
+        All the models are read with a single query, whatever their number.
+
+        Args:
+            session: The database session.
+            model_ids: The model ids.
+            fields: The names of the columns to read. The id is read as well.
+
+        Returns:
+            The values of the columns by name, by id of the models found.
+
+        Raises:
+            ValueError: A field does not match any column.
+        """
+        model_ids = list(dict.fromkeys(model_ids))
+        key = cls._cache_key(LoadingProfile.NONE, "many", tuple(model_ids),
+                             tuple(fields))
+        rows_by_id = _queries.get(key) if _caching() else None
+
+        if rows_by_id is not None:
+            return rows_by_id
+
+        table = cls._model().__table__
+        columns = cls._columns(fields)
+
+        if "id" not in fields:
+            columns.append(table.c.id)
+
+        rows = await session.execute(
+            sqlalchemy.select(*columns).where(table.c.id.in_(model_ids)))
+        rows_by_id = {row["id"]: dict(row) for row in rows.mappings()}
+
+        if _caching():
+            _queries.set(key, rows_by_id, cache.sizeof(rows_by_id))
+
+        return rows_by_id
+
+    @classmethod
+    async def exists(cls, session: aio_session.AsyncSession,
+                     model_id: Any) -> bool:
+        """Checks whether a model exists without loading it.
+
+        Args:
+            session: The database session.
+            model_id: The model id.
+        """
+        table = cls._model().__table__
+        model_ids = await session.execute(
+            sqlalchemy.select(table.c.id).where(table.c.id == model_id))
+
+        return model_ids.first() is not None
+
+    @classmethod
+    async def read_version(
+            cls,
+            session: aio_session.AsyncSession,
+            model_id: Any,
+            *,
+            load: LoadingProfile = LoadingProfile.NONE
+    ) -> Tuple[Any, ...] | None:
+        """Reads the version of a model without loading it.
+
+        Args:
+            session: The database session.
+            model_id: The model id.
+            load: The relationships loaded along with the model.
 
         Returns:
-            A model or None if the model could not be found.
+            The model's `updated_at` followed by the version columns of the
+            loading profile, or None if the model could not be found.
         """
-        return await session.get(get_args(cls.__orig_bases__[0])[0], model_id)
+        table = cls._model().__table__
+        versions = await session.execute(
+            sqlalchemy.select(
+                table.c.updated_at,
+                *cls._version_columns(load)).where(table.c.id == model_id))
+        version = versions.first()
+
+        return None if version is None else tuple(version)
 
     @classmethod
-    async def read_multi(cls,
-                         session: aio_session.AsyncSession,
-                         *,
-                         offset: int = 0,
-                         limit: int = 100) -> List[ModelType]:
+    async def read_multi_version(
+            cls, session: aio_session.AsyncSession) -> Tuple[Any, ...]:
+        """Reads the version of the whole collection without loading it.
+
+        Any created, updated or deleted model changes either the latest
+        `updated_at` or the number of models.
+
+        Args:
+            session: The database session.
+
+        Returns:
+            The latest `updated_at` and the number of models.
+        """
+        table = cls._model().__table__
+        versions = await session.execute(
+            sqlalchemy.select(sqlalchemy.func.max(table.c.updated_at),
+                              sqlalchemy.func.count()).select_from(table))
+
+        return tuple(versions.one())
+
+    @classmethod
+    async def read_multi(
+        cls,
+        session: aio_session.AsyncSession,
+        *,
+        offset: int = 0,
+        limit: int = 100,
+        cursor: str | None = None,
+        filters: Dict[str, Any] | None = None,
+        sort: str | None = None,
+        load: LoadingProfile = LoadingProfile.NONE,
+        fields: Sequence[str] | None = None
+    ) -> List[ModelType] | List[Dict[str, Any]]:
         """Reads the first `limit` models starting at the `offset` position.
 
+        Models are sorted by `KEYSET`, unless a sort order is given. When a
+        cursor is given, reading starts right after the model it points to,
+        whatever the page depth, and `offset` is counted from there.
+
+        When fields are given, only their columns are selected, along with
+        the sort keys needed by `cursor`, and rows are returned as dicts
+        instead of models.
+
         Args:
             session: The database session.
             offset: The starting position at which the database is queried.
             limit: The limit of models to read.
+            cursor: The cursor returned by `cursor` for the previous page.
+            filters: The values of the filters the models must match, as
+                described by `_conditions`.
+            sort: The comma-separated names of the columns to sort by, among
+                `SORTABLE`, each prefixed by `-` for a descending order.
+            load: The relationships to load along with the models, when
+                reading whole models.
+            fields: The names of the only columns to read, or None to read
+                whole models.
 
         Returns:
-            A list of models.
+            A list of models, or of the values of the columns by name.
+
+        Raises:
+            InvalidCursorError: The cursor is malformed.
+            InvalidSortError: The sort order is invalid.
+            ValueError: A field does not match any column.
+        """
+        if fields is not None:
+            load = LoadingProfile.NONE
+
+        key = cls._cache_key(load, offset, limit, cursor,
+                             tuple(sorted((filters or {}).items())), sort,
+                             tuple(fields or ()))
+        models_db = _queries.get(key) if _caching() else None
+
+        if models_db is not None:
+            return models_db
+
+        keys = cls._sort_keys(sort)
+
+        if fields is None:
+            statement = sqlmodel.select(
+                cls._model()).options(*cls._loader_options(load))
+        else:
+            statement = sqlalchemy.select(
+                *cls._columns(fields),
+                *(column for column, _ in keys if column.key not in fields))
+
+        statement = statement.where(*cls._conditions(filters)).order_by(
+            *(column.desc().nulls_first() if descending else column.asc().
+              nulls_last() for column, descending in keys))
+
+        if cursor is not None:
+            statement = statement.where(cls._after(cursor, keys))
+
+        statement = statement.offset(offset).limit(limit)
+
+        if fields is None:
+            models = await session.exec(statement)
+            models_db = models.all()
+        else:
+            rows = await session.execute(statement)
+            models_db = [dict(row) for row in rows.mappings()]
+
+        if _caching():
+            _queries.set(key, models_db, cache.sizeof(models_db))
+
+        return models_db
+
+    @classmethod
+    async def stream(
+        cls,
+        session: aio_session.AsyncSession,
+        *,
+        fields: Sequence[str],
+        batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[sqlalchemy.engine.RowMapping]]:
+        """Streams the given columns of all the models in batches.
+
+        Rows are fetched through a server-side cursor sorted by `KEYSET`,
+        so that memory usage does not depend on the size of the table.
+
+        Args:
+            session: The database session.
+            fields: The names of the columns to read.
+            batch_size: The number of rows fetched at a time.
+
+        Yields:
+            Batches of rows.
         """
-        models = await session.exec(
-            sqlmodel.select(get_args(
-                cls.__orig_bases__[0])[0]).offset(offset).limit(limit))
+        table = cls._model().__table__
+        result = await session.stream(
+            sqlalchemy.select(*(table.c[field] for field in fields)).order_by(
+                *cls._keyset_columns()))
 
-        return models.all()
+        async for rows in result.mappings().partitions(batch_size):
+            yield rows
 
     @classmethod
-    async def update(cls, session: aio_session.AsyncSession, *,
-                     model_db: ModelType,
-                     model_in: UpdateModelType | Dict[str, Any]) -> ModelType:
-        """Updates a model.
+    async def update_by_id(
+            cls,
+            session: aio_session.AsyncSession,
+            model_id: Any,
+            *,
+            model_in: UpdateModelType | Dict[str, Any],
+            conditions: Dict[str, Any] | None = None) -> ModelType | None:
+        """Updates a model given its id with a single statement.
+
+        The model is neither read beforehand nor refreshed afterwards: the
+        `UPDATE` only matches if the model exists and its columns are equal
+        to the given conditions, and returns the updated row.
 
         Args:
             session: The database session.
+            model_id: The id of the model.
             model_in: The updated model's data.
+            conditions: The values the model's columns must be equal to,
+                e.g. the id of the patron allowed to update it.
 
         Returns:
-            The updated model.
+            The updated model or None if no model matched.
+
+        Raises:
+            ConflictError: The update conflicts with another model on a
+                unique constraint.
         """
         if isinstance(model_in, dict):
             update_data = model_in
         else:
             update_data = model_in.dict(exclude_unset=True)
 
-        for field, value in update_data.items():
-            setattr(model_db, field, value)
+        model = cls._model()
+        table = model.__table__
+
+        try:
+            rows = await session.execute(
+                sqlalchemy.update(table).where(
+                    *cls._matching(model_id, conditions)).values(
+                        **update_data).returning(*table.c))
+        except sqlalchemy.exc.IntegrityError as error:
+            if getattr(error.orig, "pgcode", None) != UNIQUE_VIOLATION:
+                raise
 
-        session.add(model_db)
+            await session.rollback()
+            raise ConflictError(str(error.orig)) from error
+
+        row = rows.mappings().first()
         await session.commit()
-        await session.refresh(model_db)
+
+        if row is None:
+            return None
+
+        model_db = model(**row)
+        cls._committed(Write.UPDATE, [model_db])
 
         return model_db
 
     @classmethod
-    async def delete(cls, session: aio_session.AsyncSession, model_id: Any):
-        """Deletes a model.
+    async def _write_multi(cls, session: aio_session.AsyncSession,
+                           statement: Any, write: Write) -> int:
+        """Runs a write of many models and notifies it in batches.
+
+        Only the id and the fields read by the write listeners are returned
+        by the statement. The rows are processed and notified a batch at a
+        time, yielding to the event loop in between, so that a write of
+        many thousand models does not hold up the other requests.
 
         Args:
             session: The database session.
-            model_id: The id of the model.
+            statement: The `UPDATE` or `DELETE` statement.
+            write: The kind of write.
+
+        Returns:
+            The number of written models.
+        """
+        table = cls._model().__table__
+        columns = [
+            table.c[name]
+            for name in ["id", *sorted(_listened_fields[cls._model()])]
+        ]
+        result = await session.execute(statement.returning(*columns))
+        await session.commit()
+        count = 0
+
+        for rows in result.partitions(NOTIFY_BATCH_SIZE):
+            cls._committed(write, rows)
+            count += len(rows)
+            await asyncio.sleep(0)
+
+        return count
+
+    @classmethod
+    async def update_multi(
+        cls,
+        session: aio_session.AsyncSession,
+        *,
+        filters: Dict[str, Any],
+        model_in: Dict[str, Any],
+    ) -> int:
+        """Updates all the models matching filters with a single statement.
+
+        When none of the fields read by the write listeners are updated,
+        e.g. when the models are reassigned to another patron, the cached
+        reads are invalidated without returning any row.
+
+        Args:
+            session: The database session.
+            filters: The values of the filters the models must match, as
+                described by `_conditions`.
+            model_in: The values of the updated columns.
+
+        Returns:
+            The number of updated models.
         """
-        model_db = await session.get(
-            get_args(cls.__orig_bases__[0])[0], model_id)
+        statement = sqlalchemy.update(cls._model().__table__).where(
+            *cls._conditions(filters)).values(**model_in)
+
+        if not _listened_fields[cls._model()].isdisjoint(model_in):
+            return await cls._write_multi(session, statement, Write.UPDATE)
 
-        await session.delete(model_db)
+        result = await session.execute(statement)
         await session.commit()
+
+        if result.rowcount:
+            cls._committed(Write.UPDATE, [])
+
+        return result.rowcount
+
+    @classmethod
+    async def delete_by_id(
+            cls,
+            session: aio_session.AsyncSession,
+            model_id: Any,
+            *,
+            conditions: Dict[str, Any] | None = None) -> ModelType | None:
+        """Deletes a model given its id with a single statement.
+
+        Args:
+            session: The database session.
+            model_id: The id of the model.
+            conditions: The values the model's columns must be equal to.
+
+        Returns:
+            The deleted model or None if no model matched.
+        """
+        model = cls._model()
+        table = model.__table__
+        rows = await session.execute(
+            sqlalchemy.delete(table).where(
+                *cls._matching(model_id, conditions)).returning(*table.c))
+        row = rows.mappings().first()
+        await session.commit()
+
+        if row is None:
+            return None
+
+        model_db = model(**row)
+        cls._committed(Write.DELETE, [model_db])
+
+        return model_db
+
+    @classmethod
+    async def delete_multi(cls, session: aio_session.AsyncSession, *,
+                           filters: Dict[str, Any]) -> int:
+        """Deletes all the models matching filters with a single statement.
+
+        Args:
+            session: The database session.
+            filters: The values of the filters the models must match, as
+                described by `_conditions`.
+
+        Returns:
+            The number of deleted models.
+        """
+        return await cls._write_multi(
+            session,
+            sqlalchemy.delete(
+                cls._model().__table__).where(*cls._conditions(filters)),
+            Write.DELETE)
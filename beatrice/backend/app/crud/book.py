@@ -1,10 +1,11 @@
 """Book CRUD controller."""
 
 import sqlmodel
-from sqlmodel.ext.asyncio import session as aio_session
+from sqlalchemy import orm
 
 from app.crud import base
 from app.models import book
+from app.models import patron
 
 
 class BookCRUD(base.BaseCRUD[book.Book, book.BookCreate, book.BookUpdate]):
@@ -13,17 +14,15 @@ class BookCRUD(base.BaseCRUD[book.Book, book.BookCreate, book.BookUpdate]):
     It contains Create, Read, Update, and Delete methods.
     """
 
-    @classmethod
-    async def get_by_title(cls, session: aio_session.AsyncSession,
-                           title: str) -> book.Book | None:
-        """Gets a book by their title.
+    LOADER_OPTIONS = {
+        base.LoadingProfile.PATRON: (orm.selectinload(book.Book.patron),),
+    }
+    VERSION_COLUMNS = {
+        base.LoadingProfile.PATRON:
+            (sqlmodel.select(patron.Patron.updated_at).where(
+                patron.Patron.id == book.Book.proposed_by).scalar_subquery(),),
+    }
 
-        Args:
-            session: The database session.
-            title: The book's title.
-        """
-        books = await session.exec(
-            sqlmodel.select(book.Book).where(title in (book.Book.title_orig,
-                                                       book.Book.title_en,
-                                                       book.Book.title_it)))
-        return books.first()
+    SORTABLE = ("created_at", "updated_at", "title_en", "author",
+                "release_year")
+    UNIQUE = ("title_en",)
@@ -0,0 +1,128 @@
+"""Near-duplicate titles controller.
+
+The English titles of each media type are kept in an in-memory trigram
+index, built at startup and updated by the writes of the media CRUD
+controllers. Each worker holds its own index, which only sees the writes
+it serves.
+"""
+
+import collections
+import uuid
+from typing import Any, Dict, List
+
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.core import config
+from app.core import similarity
+from app.crud import anime as anime_crud
+from app.crud import base
+from app.crud import book as book_crud
+from app.crud import manga as manga_crud
+from app.crud import movie as movie_crud
+from app.models import anime
+from app.models import book
+from app.models import manga
+from app.models import movie
+
+# The checked media types, with their CRUD controller and database model.
+MEDIA = (
+    ("anime", anime_crud.AnimeCRUD, anime.Anime),
+    ("book", book_crud.BookCRUD, book.Book),
+    ("manga", manga_crud.MangaCRUD, manga.Manga),
+    ("movie", movie_crud.MovieCRUD, movie.Movie),
+)
+
+indexes = {
+    media_type: similarity.TrigramIndex(
+        min_threshold=config.settings.NEAR_DUPLICATE_THRESHOLD)
+    for media_type, _, _ in MEDIA
+}
+
+# The English titles of the indexed media, by media type and id.
+_titles: Dict[str, Dict[uuid.UUID, str]] = collections.defaultdict(dict)
+
+
+def _index_writes(media_type: str) -> base.WriteListener:
+    """Returns the write listener keeping the titles of a media up to date.
+
+    Args:
+        media_type: The media type.
+    """
+
+    def listener(write: base.Write, models_db: List[Any]):
+        for model_db in models_db:
+            if write is base.Write.DELETE:
+                indexes[media_type].remove(model_db.id)
+                _titles[media_type].pop(model_db.id, None)
+            else:
+                indexes[media_type].add(model_db.id, model_db.title_en)
+                _titles[media_type][model_db.id] = model_db.title_en
+
+    return listener
+
+
+for _media_type, _, _model in MEDIA:
+    base.add_write_listener(_model, _index_writes(_media_type), ["title_en"])
+
+
+async def load(session: aio_session.AsyncSession):
+    """Builds the indexes from the titles stored in the database.
+
+    Args:
+        session: The database session.
+    """
+    for media_type, crud, _ in MEDIA:
+        titles = {}
+
+        async for rows in crud.stream(session, fields=["id", "title_en"]):
+            titles.update((row["id"], row["title_en"]) for row in rows)
+
+        indexes[media_type].build(titles.items())
+        _titles[media_type] = titles
+
+
+def find(media_type: str, title: str) -> List[Dict[str, Any]]:
+    """Returns the media whose English title is similar to the given one.
+
+    Args:
+        media_type: The media type.
+        title: The English title.
+
+    Returns:
+        The `id`, `title_en` and `similarity` of the similar media, most
+        similar first.
+    """
+    return [{
+        "id": media_id,
+        "title_en": _titles[media_type][media_id],
+        "similarity": similarity_
+    } for media_id, similarity_ in indexes[media_type].search(
+        title, config.settings.NEAR_DUPLICATE_THRESHOLD)]
+
+
+def clusters(media_type: str, threshold: float) -> List[List[Dict[str, Any]]]:
+    """Returns the groups of media whose English titles are similar.
+
+    It may run in a worker thread, and leaves out the media deleted
+    meanwhile.
+
+    Args:
+        media_type: The media type.
+        threshold: The minimum similarity of the titles, between 0 and 1.
+
+    Returns:
+        The `id` and `title_en` of the media of each group, largest first.
+    """
+    titles = _titles[media_type]
+    groups = []
+
+    for cluster in indexes[media_type].clusters(threshold):
+        group = [{
+            "id": media_id,
+            "title_en": title
+        } for media_id in cluster if (title := titles.get(media_id))]
+
+        if len(group) > 1:
+            groups.append(group)
+
+    return groups
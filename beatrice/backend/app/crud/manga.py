@@ -1,10 +1,11 @@
 """Manga CRUD controller."""
 
 import sqlmodel
-from sqlmodel.ext.asyncio import session as aio_session
+from sqlalchemy import orm
 
 from app.crud import base
 from app.models import manga
+from app.models import patron
 
 
 class MangaCRUD(base.BaseCRUD[manga.Manga, manga.MangaCreate,
@@ -14,16 +15,15 @@ class MangaCRUD(base.BaseCRUD[manga.Manga, manga.MangaCreate,
     It contains Create, Read, Update, and Delete methods.
     """
 
-    @classmethod
-    async def get_by_title(cls, session: aio_session.AsyncSession,
-                           title: str) -> manga.Manga | None:
-        """Gets a manga by their title.
-
-        Args:
-            session: The database session.
-            title: The manga's title.
-        """
-        manga_list = await session.exec(
-            sqlmodel.select(manga.Manga).where(manga.Manga.title_en == title))
-
-        return manga_list.first()
+    LOADER_OPTIONS = {
+        base.LoadingProfile.PATRON: (orm.selectinload(manga.Manga.patron),),
+    }
+    VERSION_COLUMNS = {
+        base.LoadingProfile.PATRON:
+            (sqlmodel.select(patron.Patron.updated_at).where(
+                patron.Patron.id == manga.Manga.proposed_by).scalar_subquery(),
+            ),
+    }
+
+    SORTABLE = ("created_at", "updated_at", "title_en", "start_date")
+    UNIQUE = ("title_en",)
@@ -1,10 +1,11 @@
 """Movie CRUD controller."""
 
 import sqlmodel
-from sqlmodel.ext.asyncio import session as aio_session
+from sqlalchemy import orm
 
 from app.crud import base
 from app.models import movie
+from app.models import patron
 
 
 class MovieCRUD(base.BaseCRUD[movie.Movie, movie.MovieCreate,
@@ -14,18 +15,16 @@ class MovieCRUD(base.BaseCRUD[movie.Movie, movie.MovieCreate,
     It contains Create, Read, Update, and Delete methods.
     """
 
-    @classmethod
-    async def get_by_title(cls, session: aio_session.AsyncSession,
-                           title: str) -> movie.Movie | None:
-        """Gets a movie by their title.
-
-        Args:
-            session: The database session.
-            title: The movie's title.
-        """
-        movies = await session.exec(
-            sqlmodel.select(movie.Movie).where(title in (movie.Movie.title_orig,
-                                                         movie.Movie.title_en,
-                                                         movie.Movie.title_it)))
-
-        return movies.first()
+    LOADER_OPTIONS = {
+        base.LoadingProfile.PATRON: (orm.selectinload(movie.Movie.patron),),
+    }
+    VERSION_COLUMNS = {
+        base.LoadingProfile.PATRON:
+            (sqlmodel.select(patron.Patron.updated_at).where(
+                patron.Patron.id == movie.Movie.proposed_by).scalar_subquery(),
+            ),
+    }
+
+    SORTABLE = ("created_at", "updated_at", "title_en", "release_date",
+                "running_time")
+    UNIQUE = ("title_en",)
@@ -1,51 +1,318 @@
 """Patron CRUD controller."""
 
-from typing import Any, Dict
+from typing import Any, Dict, Sequence, Tuple
 
+import sqlalchemy
 import sqlmodel
+from sqlalchemy import orm
 from sqlmodel.ext.asyncio import session as aio_session
 
+from app.core import cache
+from app.core import config
 from app.core import security
+from app.crud import anime as anime_crud
 from app.crud import base
+from app.crud import book as book_crud
+from app.crud import manga as manga_crud
+from app.crud import movie as movie_crud
+from app.models import anime
+from app.models import book
+from app.models import manga
+from app.models import movie
 from app.models import patron
 
 
+def _media_count(media: type[sqlmodel.SQLModel]) -> Any:
+    """Returns the number of a patron's media.
+
+    Args:
+        media: The media database model.
+    """
+    return sqlmodel.select(sqlalchemy.func.count()).select_from(media).where(
+        media.proposed_by == patron.Patron.id).scalar_subquery()
+
+
+def _media_version(media: type[sqlmodel.SQLModel]) -> Tuple[Any, Any]:
+    """Returns the latest update and the number of a patron's media.
+
+    Args:
+        media: The media database model.
+    """
+    return (
+        sqlmodel.select(sqlalchemy.func.max(media.updated_at)).where(
+            media.proposed_by == patron.Patron.id).scalar_subquery(),
+        _media_count(media),
+    )
+
+
+# The media database models, by name of the patron's relationships.
+_MEDIA = {
+    "anime": anime.Anime,
+    "manga": manga.Manga,
+    "movies": movie.Movie,
+    "books": book.Book,
+}
+
+# The CRUD controllers of the media.
+_MEDIA_CRUDS = (anime_crud.AnimeCRUD, manga_crud.MangaCRUD,
+                movie_crud.MovieCRUD, book_crud.BookCRUD)
+
+_principals = cache.TTLCache(
+    ttl=config.settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=config.settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    name="principals")
+
+
+def _evict_principals(
+        write: base.Write,  # pylint: disable=unused-argument
+        models_db: Sequence[Any]):
+    """Evicts the cached principals of written patrons.
+
+    It is called once the write is committed, so that a concurrent read
+    cannot cache the principal again from the row being written.
+
+    Args:
+        write: The kind of write.
+        models_db: The written patrons.
+    """
+    for model_db in models_db:
+        _principals.pop(model_db.username)
+
+
+base.add_write_listener(patron.Patron, _evict_principals, ["username"])
+
+
 class PatronCRUD(base.BaseCRUD[patron.Patron, patron.PatronCreate,
                                patron.PatronUpdate]):
     """CRUD controller for patrons.
 
     It contains Create, Read, Update, and Delete methods and additional
     methods for authentication and read by username.
+
+    The authentication principals read by username are cached for
+    `PRINCIPAL_CACHE_TTL_SECONDS` and invalidated once the update or
+    deletion of a patron is committed.
     """
 
+    LOADER_OPTIONS = {
+        base.LoadingProfile.MEDIA: (
+            orm.selectinload(patron.Patron.anime),
+            orm.selectinload(patron.Patron.manga),
+            orm.selectinload(patron.Patron.movies),
+            orm.selectinload(patron.Patron.books),
+        ),
+    }
+    VERSION_COLUMNS = {
+        base.LoadingProfile.MEDIA:
+            (*_media_version(anime.Anime), *_media_version(manga.Manga),
+             *_media_version(movie.Movie), *_media_version(book.Book)),
+    }
+    UNIQUE = ("username",)
+
     @classmethod
-    async def update(
-            cls, session: aio_session.AsyncSession, *, model_db: patron.Patron,
-            model_in: patron.PatronUpdate | Dict[str, Any]) -> patron.Patron:
-        """Updates a patron.
+    async def _update_data(
+            cls,
+            model_in: patron.PatronUpdate | Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the columns to update, with the password hashed.
 
         Args:
-            session: The database session.
-            patron_db: The current patron's data.
-            patron_in: The updated patron's data.
-
-        Returns:
-            The updated patron.
+            model_in: The updated patron's data.
         """
         if isinstance(model_in, dict):
-            update_data = model_in
+            update_data = dict(model_in)
         else:
             update_data = model_in.dict(exclude_unset=True)
 
-        if update_data.get("password"):
-            hashed_password = security.get_password_hash(
-                update_data["password"])
-            del update_data["password"]
-            update_data["hashed_password"] = hashed_password
+        password = update_data.pop("password", None)
+
+        if password:
+            update_data[
+                "hashed_password"] = await security.password_hasher.hash(
+                    password)
+
+        return update_data
+
+    @classmethod
+    async def update_by_id(
+            cls,
+            session: aio_session.AsyncSession,
+            model_id: Any,
+            *,
+            model_in: patron.PatronUpdate | Dict[str, Any],
+            conditions: Dict[str, Any] | None = None) -> patron.Patron | None:
+        """Updates a patron given their id with a single statement.
+
+        Since the previous username is not returned by the statement, all
+        the cached principals are invalidated when a patron is renamed.
+
+        Args:
+            session: The database session.
+            model_id: The id of the patron.
+            model_in: The updated patron's data.
+            conditions: The values the patron's columns must be equal to.
+
+        Returns:
+            The updated patron or None if no patron matched.
+        """
+        update_data = await cls._update_data(model_in)
+        model_db = await super().update_by_id(session,
+                                              model_id,
+                                              model_in=update_data,
+                                              conditions=conditions)
+
+        if model_db is not None and "username" in update_data:
+            _principals.clear()
+
+        return model_db
+
+    @classmethod
+    async def delete_by_id(
+            cls,
+            session: aio_session.AsyncSession,
+            model_id: Any,
+            *,
+            conditions: Dict[str, Any] | None = None,
+            reassign_to: Any | None = None) -> patron.Patron | None:
+        """Deletes a patron given their id and deletes or reassigns their media.
+
+        The media are written with one set-based statement per media type,
+        and the patron deleted last, so the number of round trips does not
+        depend on the number of media. The media are deleted by these
+        statements rather than by the cascading foreign keys, which would
+        leave their titles in the title indexes. Reassigned media keep
+        their titles, so they are not notified to the title indexes, and
+        only the ids and titles of deleted media are.
+
+        When conditions are given, the patron is locked and checked first,
+        so that the media of a patron not matching them are left as they
+        are. The writes should be made in an `atomic` block, as done by
+        `delete_with_media`.
+
+        Args:
+            session: The database session.
+            model_id: The id of the patron.
+            conditions: The values the patron's columns must be equal to.
+            reassign_to: The id of the patron the media are reassigned to,
+                or None to delete them.
+
+        Returns:
+            The deleted patron or None if no patron matched.
+        """
+        if conditions:
+            patron_ids = await session.execute(
+                sqlalchemy.select(patron.Patron.id).where(
+                    *cls._matching(model_id, conditions)).with_for_update())
+
+            if patron_ids.first() is None:
+                return None
+
+        proposed = {"proposed_by": model_id}
+
+        for crud in _MEDIA_CRUDS:
+            if reassign_to is None:
+                await crud.delete_multi(session, filters=proposed)
+            else:
+                await crud.update_multi(session,
+                                        filters=proposed,
+                                        model_in={"proposed_by": reassign_to})
+
+        return await super().delete_by_id(session,
+                                          model_id,
+                                          conditions=conditions)
+
+    @classmethod
+    async def delete_multi(cls, session: aio_session.AsyncSession, *,
+                           filters: Dict[str, Any]) -> int:
+        """Deletes all the patrons matching filters, and deletes their media.
+
+        Each patron is deleted by `delete_by_id`, so that their media are
+        removed from the title indexes.
+
+        Args:
+            session: The database session.
+            filters: The values of the filters the patrons must match, as
+                described by `_conditions`.
+
+        Returns:
+            The number of deleted patrons.
+        """
+        patron_ids = await session.execute(
+            sqlalchemy.select(patron.Patron.id).where(
+                *cls._conditions(filters)).with_for_update())
+        count = 0
+
+        for model_id in patron_ids.scalars().all():
+            if await cls.delete_by_id(session, model_id) is not None:
+                count += 1
+
+        return count
+
+    @classmethod
+    async def delete_with_media(
+            cls,
+            model_id: Any,
+            *,
+            reassign_to: Any | None = None) -> patron.Patron | None:
+        """Deletes a patron and deletes or reassigns their media at once.
+
+        The writes of `delete_by_id` are all made in a single transaction.
+
+        Args:
+            model_id: The id of the patron.
+            reassign_to: The id of the patron the media are reassigned to,
+                or None to delete them.
+
+        Returns:
+            The deleted patron or None if no patron matched.
+        """
+        async with base.atomic() as session:
+            return await cls.delete_by_id(session,
+                                          model_id,
+                                          reassign_to=reassign_to)
+
+    @classmethod
+    async def read_media_counts(
+            cls, session: aio_session.AsyncSession,
+            model_ids: Sequence[Any]) -> Dict[Any, Dict[str, Any]]:
+        """Reads the numbers of media proposed by patrons.
+
+        The media of all the patrons are counted with a single query, whose
+        correlated subqueries only scan the indexes starting with
+        `proposed_by`, without loading any media.
+
+        Args:
+            session: The database session.
+            model_ids: The ids of the patrons.
+
+        Returns:
+            The id of each patron found and the number of their media by
+            type, by id.
+        """
+        counts = [
+            _media_count(media).label(name) for name, media in _MEDIA.items()
+        ]
+        rows = await session.execute(
+            sqlalchemy.select(patron.Patron.id,
+                              *counts).where(patron.Patron.id.in_(model_ids)))
 
-        return await super().update(session,
-                                    model_db=model_db,
-                                    model_in=update_data)
+        return {row["id"]: dict(row) for row in rows.mappings()}
+
+    @classmethod
+    async def read_summary(cls, session: aio_session.AsyncSession,
+                           model_id: Any) -> Dict[str, Any] | None:
+        """Reads the numbers of media proposed by a patron.
+
+        Args:
+            session: The database session.
+            model_id: The id of the patron.
+
+        Returns:
+            The id of the patron and the number of their media by type, or
+            None if the patron could not be found.
+        """
+        summaries = await cls.read_media_counts(session, [model_id])
+
+        return summaries.get(model_id)
 
     @classmethod
     async def get_by_username(cls, session: aio_session.AsyncSession,
@@ -65,6 +332,42 @@ class PatronCRUD(base.BaseCRUD[patron.Patron, patron.PatronCreate,
 
         return patrons.first()
 
+    @classmethod
+    async def get_principal(cls, session: aio_session.AsyncSession,
+                            username: str) -> patron.PatronPrincipal | None:
+        """Gets the authentication principal of a patron by their username.
+
+        Only the columns of the principal are selected, so none of the
+        patron's relationships are loaded. Principals are served from the
+        cache when possible.
+
+        Args:
+            session: The database session.
+            username: The patron's username.
+
+        Returns:
+            The principal of the patron with the given username.
+        """
+        principal = _principals.get(username)
+
+        if principal is not None:
+            return principal
+
+        principals = await session.exec(
+            sqlmodel.select(patron.Patron.id, patron.Patron.username,
+                            patron.Patron.is_active,
+                            patron.Patron.is_superuser).where(
+                                patron.Patron.username == username))
+        row = principals.first()
+
+        if row is None:
+            return None
+
+        principal = patron.PatronPrincipal.from_orm(row)
+        _principals.set(username, principal)
+
+        return principal
+
     @classmethod
     async def authenticate(cls, session: aio_session.AsyncSession, *,
                            username: str, password: str) -> patron.Patron:
@@ -82,7 +385,8 @@ class PatronCRUD(base.BaseCRUD[patron.Patron, patron.PatronCreate,
 
         if not user:
             return None
-        if not security.verify_password(password, user.hashed_password):
+        if not await security.password_hasher.verify(password,
+                                                     user.hashed_password):
             return None
 
         return user
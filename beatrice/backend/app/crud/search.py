@@ -0,0 +1,58 @@
+"""Full-text search controller."""
+
+from typing import List
+
+import sqlalchemy
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.models import anime
+from app.models import book
+from app.models import manga
+from app.models import movie
+from app.models import search
+
+# The searched media types, with their model and indexed search document.
+MEDIA = (
+    ("anime", anime.Anime, anime.SEARCH_DOCUMENT),
+    ("book", book.Book, book.SEARCH_DOCUMENT),
+    ("manga", manga.Manga, manga.SEARCH_DOCUMENT),
+    ("movie", movie.Movie, movie.SEARCH_DOCUMENT),
+)
+
+
+async def search_media(session: aio_session.AsyncSession,
+                       text: str,
+                       *,
+                       offset: int = 0,
+                       limit: int = 100) -> List[sqlalchemy.engine.RowMapping]:
+    """Searches the titles, authors and notes of all the media.
+
+    Each media table is matched through its full-text index, and the
+    matches are ranked together.
+
+    Args:
+        session: The database session.
+        text: The search terms, in the web search syntax.
+        offset: The number of results to skip.
+        limit: The maximum number of results.
+
+    Returns:
+        The `type`, `id`, `title_en` and `rank` of the matching media, most
+        relevant first.
+    """
+    query = search.query(text)
+    statements = [
+        sqlalchemy.select(
+            sqlalchemy.literal(media_type).label("type"), model.id,
+            model.title_en,
+            sqlalchemy.func.ts_rank(document, query).label("rank")).where(
+                document.op("@@")(query))
+        for media_type, model, document in MEDIA
+    ]
+    union = sqlalchemy.union_all(*statements).subquery()
+    rows = await session.execute(
+        sqlalchemy.select(union).order_by(
+            union.c.rank.desc(), union.c.type,
+            union.c.id).offset(offset).limit(limit))
+
+    return rows.mappings().all()
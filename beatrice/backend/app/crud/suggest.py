@@ -0,0 +1,97 @@
+"""Title suggestions controller.
+
+The titles of all the media are kept in an in-memory prefix index, built
+at startup and updated by the writes of the media CRUD controllers. Each
+worker holds its own index, which only sees the writes it serves.
+"""
+
+from typing import Any, Dict, List
+
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app.core import autocomplete
+from app.crud import anime as anime_crud
+from app.crud import base
+from app.crud import book as book_crud
+from app.crud import manga as manga_crud
+from app.crud import movie as movie_crud
+from app.models import anime
+from app.models import book
+from app.models import manga
+from app.models import movie
+from app.models import validators
+
+# The suggested media types, with their CRUD controller, database model and
+# title columns.
+MEDIA = (
+    ("anime", anime_crud.AnimeCRUD, anime.Anime, ("title_en", "title_jp")),
+    ("book", book_crud.BookCRUD, book.Book, ("title_orig", "title_en",
+                                             "title_it")),
+    ("manga", manga_crud.MangaCRUD, manga.Manga, ("title_en", "title_jp")),
+    ("movie", movie_crud.MovieCRUD, movie.Movie, ("title_orig", "title_en",
+                                                  "title_it")),
+)
+
+titles = autocomplete.PrefixIndex(normalize=validators.normalize_title)
+
+
+def _index_writes(media_type: str, fields: List[str]) -> base.WriteListener:
+    """Returns the write listener keeping the titles of a media up to date.
+
+    Args:
+        media_type: The media type.
+        fields: The title columns of the media.
+    """
+
+    def listener(write: base.Write, models_db: List[Any]):
+        if write is base.Write.DELETE:
+            titles.remove_many(
+                (media_type, model_db.id) for model_db in models_db)
+            return
+
+        titles.add_many(((media_type, model_db.id),
+                         [getattr(model_db, field)
+                          for field in fields])
+                        for model_db in models_db)
+
+    return listener
+
+
+for _media_type, _, _model, _fields in MEDIA:
+    base.add_write_listener(_model, _index_writes(_media_type, _fields),
+                            _fields)
+
+
+async def load(session: aio_session.AsyncSession):
+    """Builds the index from the titles stored in the database.
+
+    Args:
+        session: The database session.
+    """
+    items = []
+
+    for media_type, crud, _, fields in MEDIA:
+        async for rows in crud.stream(session, fields=["id", *fields]):
+            items.extend(
+                ((media_type, row["id"]), [row[field]
+                                           for field in fields])
+                for row in rows)
+
+    titles.build(items)
+
+
+def suggest(prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Returns the titles starting with the given prefix.
+
+    Args:
+        prefix: The beginning of a title, normalized like titles are.
+        limit: The maximum number of suggestions.
+
+    Returns:
+        The `title`, `type` and `id` of the matching media, sorted by title.
+    """
+    return [{
+        "title": title,
+        "type": media_type,
+        "id": media_id
+    } for title, (media_type, media_id) in titles.search(prefix, limit)]
@@ -26,7 +26,7 @@ async def create_db_and_tables():
                 model_in=admin,
                 update={
                     "hashed_password":
-                        security.get_password_hash(
+                        await security.password_hasher.hash(
                             config.settings.ADMIN_PASSWORD)
                 })
 
@@ -1,10 +1,21 @@
 """Main entrypoint of the application."""
 
+import gc
+
 import fastapi
+from fastapi import responses
+from fastapi import status
 from fastapi.middleware import cors
 
+from app.api import compression
+from app.api import conditional
 from app.api.v1 import api
 from app.core import config
+from app.core import database
+from app.core import pagination
+from app.core import security
+from app.crud import duplicates
+from app.crud import suggest
 
 app = fastapi.FastAPI(title=config.settings.APP_NAME,
                       openapi_url=f"{config.settings.API_V1_STR}/openapi.json")
@@ -15,5 +26,79 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(
+    compression.CompressionMiddleware,
+    minimum_size=config.settings.COMPRESSION_MINIMUM_SIZE,
+    levels={
+        "gzip": config.settings.COMPRESSION_GZIP_LEVEL,
+        "br": config.settings.COMPRESSION_BROTLI_QUALITY,
+        "zstd": config.settings.COMPRESSION_ZSTD_LEVEL,
+    },
+    cache_ttl=config.settings.COMPRESSION_CACHE_TTL_SECONDS,
+    cache_max_bytes=config.settings.COMPRESSION_CACHE_MAX_BYTES,
+)
 
 app.include_router(api.api_router, prefix=config.settings.API_V1_STR)
+
+
+@app.exception_handler(pagination.InvalidCursorError)
+@app.exception_handler(pagination.InvalidSortError)
+async def invalid_cursor_handler(
+    request: fastapi.Request,  # pylint: disable=unused-argument
+    exc: pagination.InvalidCursorError | pagination.InvalidSortError
+) -> responses.JSONResponse:
+    """Returns a bad request response for malformed cursors and sorts."""
+    return responses.JSONResponse(status_code=status.HTTP_400_BAD_REQUEST,
+                                  content={"detail": str(exc)})
+
+
+@app.exception_handler(conditional.NotModifiedError)
+async def not_modified_handler(
+    request: fastapi.Request,  # pylint: disable=unused-argument
+    exc: conditional.NotModifiedError
+) -> fastapi.Response:
+    """Returns a bodiless not modified response for fresh representations."""
+    return fastapi.Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                            headers=exc.headers)
+
+
+@app.exception_handler(security.PasswordHasherBusyError)
+async def password_hasher_busy_handler(
+    request: fastapi.Request,  # pylint: disable=unused-argument
+    exc: security.PasswordHasherBusyError
+) -> responses.JSONResponse:
+    """Returns a service unavailable response when logins pile up."""
+    return responses.JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"})
+
+
+@app.on_event("startup")
+async def load_title_suggestions():
+    """Builds the title suggestions index."""
+    async with database.Session() as session:
+        await suggest.load(session)
+
+
+@app.on_event("startup")
+async def load_near_duplicates():
+    """Builds the near-duplicate titles indexes."""
+    async with database.Session() as session:
+        await duplicates.load(session)
+
+
+@app.on_event("startup")
+def freeze_loaded_objects():
+    """Excludes the objects loaded so far from garbage collection.
+
+    The indexes built at startup hold millions of objects, which every full
+    collection would scan again, pausing all the requests meanwhile.
+    """
+    gc.freeze()
+
+
+@app.on_event("shutdown")
+def shutdown_password_hasher():
+    """Shuts the password hashing workers down."""
+    security.password_hasher.shutdown()
@@ -1,11 +1,14 @@
 """Anime models."""
 
 import typing
+import uuid
 
 import pydantic
+import sqlalchemy
 import sqlmodel
 
 from app.models import mixins
+from app.models import search
 from app.models import validators
 
 if typing.TYPE_CHECKING:
@@ -29,9 +32,25 @@ class AnimeBase(sqlmodel.SQLModel, mixins.ProposalMixin, mixins.LinksMixin):
 
 class Anime(AnimeBase, mixins.TimestampsMixin, mixins.BaseMixin, table=True):
     """Anime database model."""
+    __table_args__ = (sqlalchemy.Index("ix_anime_created_at_id", "created_at",
+                                       "id"),
+                      sqlalchemy.Index("ix_anime_proposed_by_created_at_id",
+                                       "proposed_by", "created_at", "id"),
+                      sqlalchemy.ForeignKeyConstraint(["proposed_by"],
+                                                      ["patron.id"],
+                                                      ondelete="CASCADE"),
+                      sqlalchemy.Index("uq_anime_title_en",
+                                       "title_en",
+                                       unique=True),
+                      sqlalchemy.Index("ix_anime_year", "year"),
+                      sqlalchemy.Index("ix_anime_season_year", "season_year"))
 
-    patron: "Patron" = sqlmodel.Relationship(
-        back_populates="anime", sa_relationship_kwargs={"lazy": "selectin"})
+    patron: "Patron" = sqlmodel.Relationship(back_populates="anime")
+
+
+# The text searched by `GET /search`, indexed for full-text search.
+SEARCH_DOCUMENT = search.document(Anime.title_en, Anime.title_jp, Anime.notes)
+sqlalchemy.Index("ix_anime_search", SEARCH_DOCUMENT, postgresql_using="gin")
 
 
 class AnimeCreate(AnimeBase):
@@ -40,7 +59,7 @@ class AnimeCreate(AnimeBase):
 
 class AnimeRead(AnimeBase):
     """Anime base model."""
-    id: pydantic.UUID4
+    id: uuid.UUID
 
 
 class AnimeReadWithPatron(AnimeRead):
@@ -48,6 +67,21 @@ class AnimeReadWithPatron(AnimeRead):
     patron: "PatronRead" = None
 
 
+class AnimeFilters(sqlmodel.SQLModel, mixins.ListFiltersMixin):
+    """Anime list filters.
+
+    Attributes:
+        year: The year of the anime.
+        year_from: The earliest year of the anime.
+        year_to: The latest year of the anime.
+        season_year: The season of the anime.
+    """
+    year: int | None = None
+    year_from: int | None = None
+    year_to: int | None = None
+    season_year: str | None = None
+
+
 class AnimeUpdate(sqlmodel.SQLModel, mixins.LinksMixin):
     """Anime update model."""
     # TODO: Set default to None when
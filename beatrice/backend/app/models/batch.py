@@ -0,0 +1,71 @@
+"""Batch request models."""
+
+import enum
+import uuid
+from typing import Any, Dict
+
+import pydantic
+import sqlmodel
+
+
+class Action(str, enum.Enum):
+    """Actions of the operations, one per write endpoint of the media."""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class Media(str, enum.Enum):
+    """Media of the operations, named after the paths of their routers."""
+    ANIME = "anime"
+    BOOKS = "books"
+    MANGA = "manga"
+    MOVIES = "movies"
+
+
+class Mode(str, enum.Enum):
+    """How the operations of a batch request are committed.
+
+    Attributes:
+        ATOMIC: The operations are committed all together, or not at all
+            if one fails, in which case the following ones are not run.
+        EACH: Every operation is committed on its own, whether the others
+            fail or not.
+    """
+    ATOMIC = "atomic"
+    EACH = "each"
+
+
+class Operation(sqlmodel.SQLModel):
+    """Operation of a batch request.
+
+    Attributes:
+        action: The endpoint the operation is run as.
+        media: The media the operation writes.
+        id: The id of the media to update or delete.
+        data: The body of the create or update request.
+    """
+    action: Action
+    media: Media
+    id: uuid.UUID | None = None
+    data: Dict[str, Any] | None = None
+
+    @pydantic.validator("id", always=True)
+    @classmethod
+    def check_id(cls, model_id: uuid.UUID | None,
+                 values: Dict[str, Any]) -> uuid.UUID | None:
+        """Checks that updates and deletes have an id."""
+        if values.get("action") in (Action.UPDATE, Action.DELETE):
+            assert model_id is not None, "Updates and deletes need an id"
+
+        return model_id
+
+    @pydantic.validator("data", always=True)
+    @classmethod
+    def check_data(cls, data: Dict[str, Any] | None,
+                   values: Dict[str, Any]) -> Dict[str, Any] | None:
+        """Checks that creates and updates have data."""
+        if values.get("action") in (Action.CREATE, Action.UPDATE):
+            assert data is not None, "Creates and updates need data"
+
+        return data
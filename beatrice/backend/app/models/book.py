@@ -1,11 +1,14 @@
 """Book models."""
 
 import typing
+import uuid
 
 import pydantic
+import sqlalchemy
 import sqlmodel
 
 from app.models import mixins
+from app.models import search
 from app.models import validators
 
 if typing.TYPE_CHECKING:
@@ -31,9 +34,28 @@ class BookBase(sqlmodel.SQLModel, mixins.ProposalMixin, mixins.LinksMixin):
 
 class Book(BookBase, mixins.TimestampsMixin, mixins.BaseMixin, table=True):
     """Book database model."""
-
-    patron: "Patron" = sqlmodel.Relationship(
-        back_populates="books", sa_relationship_kwargs={"lazy": "selectin"})
+    __table_args__ = (sqlalchemy.Index("ix_book_created_at_id", "created_at",
+                                       "id"),
+                      sqlalchemy.Index("ix_book_proposed_by_created_at_id",
+                                       "proposed_by", "created_at", "id"),
+                      sqlalchemy.ForeignKeyConstraint(["proposed_by"],
+                                                      ["patron.id"],
+                                                      ondelete="CASCADE"),
+                      sqlalchemy.Index("ix_book_title_orig", "title_orig"),
+                      sqlalchemy.Index("uq_book_title_en",
+                                       "title_en",
+                                       unique=True),
+                      sqlalchemy.Index("ix_book_title_it", "title_it"),
+                      sqlalchemy.Index("ix_book_author", "author"),
+                      sqlalchemy.Index("ix_book_release_year", "release_year"))
+
+    patron: "Patron" = sqlmodel.Relationship(back_populates="books")
+
+
+# The text searched by `GET /search`, indexed for full-text search.
+SEARCH_DOCUMENT = search.document(Book.title_orig, Book.title_en, Book.title_it,
+                                  Book.author, Book.notes)
+sqlalchemy.Index("ix_book_search", SEARCH_DOCUMENT, postgresql_using="gin")
 
 
 class BookCreate(BookBase):
@@ -42,7 +64,7 @@ class BookCreate(BookBase):
 
 class BookRead(BookBase):
     """Book base model."""
-    id: pydantic.UUID4
+    id: uuid.UUID
 
 
 class BookReadWithPatron(BookRead):
@@ -50,6 +72,21 @@ class BookReadWithPatron(BookRead):
     patron: "PatronRead" = None
 
 
+class BookFilters(sqlmodel.SQLModel, mixins.ListFiltersMixin):
+    """Book list filters.
+
+    Attributes:
+        author: The author of the book.
+        release_year: The release year of the book.
+        release_year_from: The earliest release year of the book.
+        release_year_to: The latest release year of the book.
+    """
+    author: str | None = None
+    release_year: int | None = None
+    release_year_from: int | None = None
+    release_year_to: int | None = None
+
+
 class BookUpdate(sqlmodel.SQLModel, mixins.LinksMixin):
     """Book update model."""
     # TODO: Set default to None when
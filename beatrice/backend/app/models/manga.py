@@ -2,11 +2,14 @@
 
 import datetime
 import typing
+import uuid
 
 import pydantic
+import sqlalchemy
 import sqlmodel
 
 from app.models import mixins
+from app.models import search
 from app.models import validators
 
 if typing.TYPE_CHECKING:
@@ -44,9 +47,24 @@ class MangaBase(sqlmodel.SQLModel, mixins.ProposalMixin, mixins.LinksMixin):
 
 class Manga(MangaBase, mixins.TimestampsMixin, mixins.BaseMixin, table=True):
     """Manga database model."""
+    __table_args__ = (sqlalchemy.Index("ix_manga_created_at_id", "created_at",
+                                       "id"),
+                      sqlalchemy.Index("ix_manga_proposed_by_created_at_id",
+                                       "proposed_by", "created_at", "id"),
+                      sqlalchemy.ForeignKeyConstraint(["proposed_by"],
+                                                      ["patron.id"],
+                                                      ondelete="CASCADE"),
+                      sqlalchemy.Index("uq_manga_title_en",
+                                       "title_en",
+                                       unique=True),
+                      sqlalchemy.Index("ix_manga_start_date", "start_date"))
 
-    patron: "Patron" = sqlmodel.Relationship(
-        back_populates="manga", sa_relationship_kwargs={"lazy": "selectin"})
+    patron: "Patron" = sqlmodel.Relationship(back_populates="manga")
+
+
+# The text searched by `GET /search`, indexed for full-text search.
+SEARCH_DOCUMENT = search.document(Manga.title_en, Manga.title_jp, Manga.notes)
+sqlalchemy.Index("ix_manga_search", SEARCH_DOCUMENT, postgresql_using="gin")
 
 
 class MangaCreate(MangaBase):
@@ -55,7 +73,7 @@ class MangaCreate(MangaBase):
 
 class MangaRead(MangaBase):
     """Manga base model."""
-    id: pydantic.UUID4
+    id: uuid.UUID
 
 
 class MangaReadWithPatron(MangaRead):
@@ -63,6 +81,17 @@ class MangaReadWithPatron(MangaRead):
     patron: "PatronRead" = None
 
 
+class MangaFilters(sqlmodel.SQLModel, mixins.ListFiltersMixin):
+    """Manga list filters.
+
+    Attributes:
+        start_date_from: The earliest start date of the manga.
+        start_date_to: The latest start date of the manga.
+    """
+    start_date_from: datetime.date | None = None
+    start_date_to: datetime.date | None = None
+
+
 class MangaUpdate(sqlmodel.SQLModel, mixins.LinksMixin):
     """Manga update model."""
     # TODO: Set default to None when
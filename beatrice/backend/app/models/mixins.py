@@ -4,8 +4,12 @@ import datetime
 import uuid
 
 import pydantic
+import sqlalchemy
 import sqlmodel
 
+from app.core import ids
+from app.models import validators
+
 
 class BaseMixin(pydantic.BaseModel):
     """Base mixin class.
@@ -14,11 +18,17 @@ class BaseMixin(pydantic.BaseModel):
     should always be inherited from.
 
     Attributes:
-        id: The primary key of the model.
+        id: The primary key of the model, generated by the configured
+            `ID_STRATEGY`, or by the database for the rows inserted
+            without it.
     """
-    id: pydantic.UUID4 | None = sqlmodel.Field(default_factory=uuid.uuid4,
-                                               primary_key=True,
-                                               nullable=False)
+    id: uuid.UUID | None = sqlmodel.Field(
+        default_factory=ids.generate,
+        primary_key=True,
+        nullable=False,
+        sa_column_kwargs={
+            "server_default": sqlalchemy.text("uuid_generate_v7()")
+        })
 
 
 class TimestampsMixin(pydantic.BaseModel):
@@ -32,16 +42,21 @@ class TimestampsMixin(pydantic.BaseModel):
         default_factory=datetime.datetime.utcnow)
     updated_at: datetime.datetime = sqlmodel.Field(
         default_factory=datetime.datetime.utcnow,
+        index=True,
         sa_column_kwargs={"onupdate": datetime.datetime.now})
 
 
 class ProposalMixin(pydantic.BaseModel):
     """Mixin that defines proposal-related fields.
 
+    The foreign key of `proposed_by` is declared by each media table, as
+    a constraint deleting the media along with the patron, since a field
+    cannot carry the `ON DELETE` rule of its foreign key.
+
     Attributes:
         proposed_by: The id of the patron who proposed the media.
     """
-    proposed_by: pydantic.UUID4 = sqlmodel.Field(foreign_key="patron.id")
+    proposed_by: uuid.UUID
 
 
 class LinksMixin(pydantic.BaseModel):
@@ -51,3 +66,17 @@ class LinksMixin(pydantic.BaseModel):
         links: A formatted list of links.
     """
     links: str | None
+
+
+class ListFiltersMixin(pydantic.BaseModel):
+    """Mixin that defines the filters shared by media lists.
+
+    Attributes:
+        proposed_by: The id of the patron who proposed the media.
+        created_at_since: The earliest creation timestamp of the media.
+    """
+    proposed_by: uuid.UUID | None = None
+    created_at_since: datetime.datetime | None = None
+
+    _to_utc = pydantic.validator("created_at_since",
+                                 allow_reuse=True)(validators.to_utc)
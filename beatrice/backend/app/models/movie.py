@@ -2,11 +2,14 @@
 
 import datetime
 import typing
+import uuid
 
 import pydantic
+import sqlalchemy
 import sqlmodel
 
 from app.models import mixins
+from app.models import search
 from app.models import validators
 
 if typing.TYPE_CHECKING:
@@ -31,9 +34,28 @@ class MovieBase(sqlmodel.SQLModel, mixins.ProposalMixin, mixins.LinksMixin):
 
 class Movie(MovieBase, mixins.TimestampsMixin, mixins.BaseMixin, table=True):
     """Movie database model."""
-
-    patron: "Patron" = sqlmodel.Relationship(
-        back_populates="movies", sa_relationship_kwargs={"lazy": "selectin"})
+    __table_args__ = (sqlalchemy.Index("ix_movie_created_at_id", "created_at",
+                                       "id"),
+                      sqlalchemy.Index("ix_movie_proposed_by_created_at_id",
+                                       "proposed_by", "created_at", "id"),
+                      sqlalchemy.ForeignKeyConstraint(["proposed_by"],
+                                                      ["patron.id"],
+                                                      ondelete="CASCADE"),
+                      sqlalchemy.Index("ix_movie_title_orig", "title_orig"),
+                      sqlalchemy.Index("uq_movie_title_en",
+                                       "title_en",
+                                       unique=True),
+                      sqlalchemy.Index("ix_movie_title_it", "title_it"),
+                      sqlalchemy.Index("ix_movie_release_date", "release_date"),
+                      sqlalchemy.Index("ix_movie_running_time", "running_time"))
+
+    patron: "Patron" = sqlmodel.Relationship(back_populates="movies")
+
+
+# The text searched by `GET /search`, indexed for full-text search.
+SEARCH_DOCUMENT = search.document(Movie.title_orig, Movie.title_en,
+                                  Movie.title_it, Movie.notes)
+sqlalchemy.Index("ix_movie_search", SEARCH_DOCUMENT, postgresql_using="gin")
 
 
 class MovieCreate(MovieBase):
@@ -42,7 +64,7 @@ class MovieCreate(MovieBase):
 
 class MovieRead(MovieBase):
     """Movie base model."""
-    id: pydantic.UUID4
+    id: uuid.UUID
 
 
 class MovieReadWithPatron(MovieRead):
@@ -50,6 +72,21 @@ class MovieReadWithPatron(MovieRead):
     patron: "PatronRead" = None
 
 
+class MovieFilters(sqlmodel.SQLModel, mixins.ListFiltersMixin):
+    """Movie list filters.
+
+    Attributes:
+        release_date_from: The earliest release date of the movie.
+        release_date_to: The latest release date of the movie.
+        running_time_from: The shortest running time of the movie.
+        running_time_to: The longest running time of the movie.
+    """
+    release_date_from: datetime.date | None = None
+    release_date_to: datetime.date | None = None
+    running_time_from: int | None = None
+    running_time_to: int | None = None
+
+
 class MovieUpdate(sqlmodel.SQLModel, mixins.LinksMixin):
     """Movie update model."""
     # TODO: Set default to None when
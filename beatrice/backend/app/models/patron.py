@@ -1,9 +1,12 @@
 """Patron (user of the application) models."""
 
+import enum
 from typing import List
 import typing
+import uuid
 
 import pydantic
+import sqlalchemy
 import sqlmodel
 
 from app.models import mixins
@@ -30,18 +33,16 @@ class PatronBase(sqlmodel.SQLModel):
 
 class Patron(PatronBase, mixins.TimestampsMixin, mixins.BaseMixin, table=True):
     """Patron database model."""
+    __table_args__ = (sqlalchemy.Index("ix_patron_created_at_id", "created_at",
+                                       "id"),)
     hashed_password: str | None = None
     is_active: bool = True
     is_superuser: bool = False
 
-    anime: List["Anime"] = sqlmodel.Relationship(
-        back_populates="patron", sa_relationship_kwargs={"lazy": "selectin"})
-    manga: List["Manga"] = sqlmodel.Relationship(
-        back_populates="patron", sa_relationship_kwargs={"lazy": "selectin"})
-    movies: List["Movie"] = sqlmodel.Relationship(
-        back_populates="patron", sa_relationship_kwargs={"lazy": "selectin"})
-    books: List["Book"] = sqlmodel.Relationship(
-        back_populates="patron", sa_relationship_kwargs={"lazy": "selectin"})
+    anime: List["Anime"] = sqlmodel.Relationship(back_populates="patron")
+    manga: List["Manga"] = sqlmodel.Relationship(back_populates="patron")
+    movies: List["Movie"] = sqlmodel.Relationship(back_populates="patron")
+    books: List["Book"] = sqlmodel.Relationship(back_populates="patron")
 
 
 class PatronCreate(PatronBase):
@@ -51,11 +52,40 @@ class PatronCreate(PatronBase):
 
 class PatronRead(PatronBase):
     """Patron read model."""
-    id: pydantic.UUID4
+    id: uuid.UUID
     is_active: bool
     is_superuser: bool
 
 
+class PatronPrincipal(sqlmodel.SQLModel):
+    """Patron authentication principal.
+
+    It only carries the columns needed to authorize a request, so that
+    it can be loaded without the patron's media and cached.
+    """
+    id: uuid.UUID
+    username: str
+    is_active: bool
+    is_superuser: bool
+
+
+class PatronSummary(sqlmodel.SQLModel):
+    """Numbers of media proposed by a patron, by type."""
+    id: uuid.UUID
+    anime: int
+    manga: int
+    movies: int
+    books: int
+
+
+class PatronReadWithCounts(PatronRead):
+    """Patron read model with the numbers of related media."""
+    anime: int
+    manga: int
+    movies: int
+    books: int
+
+
 class PatronReadWithMedia(PatronRead):
     """Patron read model with related media."""
     anime: List["AnimeRead"] = []
@@ -82,3 +112,14 @@ class PatronUpdateAsSuperuser(PatronUpdate):
     """Patron update model as a superuser."""
     is_active: bool = True
     is_superuser: bool = False
+
+
+class MediaDeletion(str, enum.Enum):
+    """What becomes of the media of a deleted patron.
+
+    Attributes:
+        REASSIGN: The media are reassigned to the archive patron.
+        CASCADE: The media are deleted along with the patron.
+    """
+    REASSIGN = "reassign"
+    CASCADE = "cascade"
@@ -1,7 +1,57 @@
 """Response model."""
 
+import uuid
+from typing import Generic, List, TypeVar
+
 import sqlmodel
+from pydantic import generics
+
+ItemType = TypeVar("ItemType")
 
 
 class Response(sqlmodel.SQLModel):
     detail: str
+
+
+class BulkItemResult(sqlmodel.SQLModel):
+    """Result of one item of a bulk request.
+
+    Attributes:
+        index: The position of the item in the request.
+        status: The HTTP status code the item would have had on its own.
+        id: The id of the created model.
+        detail: The reason why the item failed.
+    """
+    index: int
+    status: int
+    id: uuid.UUID | None = None
+    detail: str | None = None
+
+
+class BatchGetResult(generics.GenericModel, Generic[ItemType]):
+    """Result of a batch get request.
+
+    Attributes:
+        items: The models found, in the requested order.
+        missing: The requested ids matching no model, in the requested
+            order.
+    """
+    items: List[ItemType]
+    missing: List[uuid.UUID]
+
+
+class CacheStats(sqlmodel.SQLModel):
+    """Usage statistics of an in-process cache.
+
+    Attributes:
+        entries: The number of cached entries.
+        size_bytes: The estimated size of the cached entries.
+        hits: The number of lookups that found a fresh entry.
+        misses: The number of lookups that found no fresh entry.
+        evictions: The number of entries removed to make room.
+    """
+    entries: int
+    size_bytes: int
+    hits: int
+    misses: int
+    evictions: int
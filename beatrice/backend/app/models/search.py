@@ -0,0 +1,92 @@
+"""Full-text search models."""
+
+import uuid
+from typing import Literal
+
+import sqlalchemy
+import sqlmodel
+
+# The text search configuration. It does not stem words, since titles are
+# written in many languages.
+CONFIG = sqlalchemy.text("'simple'::regconfig")
+
+
+def document(*columns: sqlalchemy.Column) -> sqlalchemy.sql.ColumnElement:
+    """Returns the text search document made of the given columns.
+
+    The expression is immutable and holds no bound parameters, so that it
+    can be indexed, and queries must use the exact same expression for the
+    index to be used. Constants are textual, so that an index on the
+    expression is bound to the table of the columns.
+
+    Args:
+        columns: The searchable text columns.
+    """
+    empty = sqlalchemy.text("''")
+    space = sqlalchemy.text("' '")
+    text = sqlalchemy.func.coalesce(columns[0], empty)
+
+    for column in columns[1:]:
+        text = text.op("||")(space).op("||")(sqlalchemy.func.coalesce(
+            column, empty))
+
+    return sqlalchemy.func.to_tsvector(CONFIG, text)
+
+
+def query(text: str) -> sqlalchemy.sql.ColumnElement:
+    """Returns the text search query parsed from user input.
+
+    Args:
+        text: The search terms, in the web search syntax.
+    """
+    return sqlalchemy.func.websearch_to_tsquery(CONFIG, text)
+
+
+class SearchResult(sqlmodel.SQLModel):
+    """Search result model.
+
+    Attributes:
+        type: The media type.
+        id: The id of the media.
+        title_en: The English title of the media.
+        rank: The relevance of the media, higher first.
+    """
+    type: Literal["anime", "book", "manga", "movie"]
+    id: uuid.UUID
+    title_en: str
+    rank: float
+
+
+class Suggestion(sqlmodel.SQLModel):
+    """Title suggestion model.
+
+    Attributes:
+        title: The suggested title, in any language.
+        type: The media type.
+        id: The id of the media.
+    """
+    title: str
+    type: Literal["anime", "book", "manga", "movie"]
+    id: uuid.UUID
+
+
+class SuggestionStats(sqlmodel.SQLModel):
+    """Usage statistics of the title suggestions index.
+
+    Attributes:
+        entries: The number of indexed titles.
+        size_bytes: The estimated memory used by the index.
+    """
+    entries: int
+    size_bytes: int
+
+
+class NearDuplicate(sqlmodel.SQLModel):
+    """Near-duplicate media model.
+
+    Attributes:
+        id: The id of the media.
+        title_en: The English title of the media.
+    """
+    id: uuid.UUID
+    title_en: str
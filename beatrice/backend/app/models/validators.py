@@ -1,5 +1,7 @@
 """Validation utility functions for models."""
 
+import datetime
+
 
 def normalize_name(name: str) -> str:
     """Capitalizes every word in a name.
@@ -23,3 +25,18 @@ def normalize_title(title: str) -> str:
         The normalized title.
     """
     return title.strip().capitalize()
+
+
+def to_utc(timestamp: datetime.datetime | None) -> datetime.datetime | None:
+    """Converts a timestamp to a naive UTC one, as they are stored.
+
+    Params:
+        timestamp: The timestamp, naive ones being assumed to be UTC.
+
+    Returns:
+        The naive UTC timestamp.
+    """
+    if timestamp is None or timestamp.tzinfo is None:
+        return timestamp
+
+    return timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
@@ -0,0 +1,7 @@
+"""Benchmarks.
+
+Each module is a script run from the backend directory against the
+database configured in the settings, e.g.:
+
+    python -m benchmarks.login_load
+"""
@@ -0,0 +1,89 @@
+"""In-process ASGI client used by the benchmarks.
+
+Requests are sent straight to the application on the current event loop,
+so a handler that blocks the loop delays every other in-flight request
+exactly as it would under uvicorn.
+"""
+
+from typing import Dict, List, Tuple
+import urllib.parse
+
+
+async def request(app,
+                  method: str,
+                  path: str,
+                  *,
+                  headers: Dict[str, str] | None = None,
+                  body: bytes = b"") -> Tuple[int, Dict[str, str], bytes]:
+    """Sends a request to the application and returns the response.
+
+    Args:
+        app: The ASGI application.
+        method: The HTTP method.
+        path: The path, optionally followed by a query string.
+        headers: The request headers.
+        body: The request body.
+
+    Returns:
+        The status code, headers and body of the response.
+    """
+    url = urllib.parse.urlsplit(path)
+    scope = {
+        "type":
+            "http",
+        "asgi": {
+            "version": "3.0"
+        },
+        "http_version":
+            "1.1",
+        "method":
+            method,
+        "scheme":
+            "http",
+        "server": ("benchmark", 80),
+        "client": ("127.0.0.1", 12345),
+        "path":
+            url.path,
+        "raw_path":
+            url.path.encode(),
+        "query_string":
+            url.query.encode(),
+        "root_path":
+            "",
+        "headers": [(name.lower().encode(), value.encode())
+                    for name, value in (headers or {}).items()],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = 0
+    response_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update((name.decode(), value.decode())
+                                    for name, value in message["headers"])
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+
+    return status, response_headers, b"".join(chunks)
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Returns the given percentile of the samples.
+
+    Args:
+        samples: The samples.
+        fraction: The percentile, between 0 and 1.
+    """
+    ordered = sorted(samples)
+
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
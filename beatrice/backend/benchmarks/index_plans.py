@@ -0,0 +1,206 @@
+"""Query plans of the lookups served by the secondary indexes.
+
+The tables are created in a scratch schema and filled with synthetic
+rows, then the lookups issued by the CRUD controllers are explained with
+and without the indexes of the `lookup indexes` revision. Everything runs
+in a single transaction, rolled back at the end.
+
+    python -m benchmarks.index_plans [--rows 1000000] [--patrons 10000]
+"""
+
+import argparse
+import asyncio
+import datetime
+import time
+
+import sqlalchemy
+import sqlmodel
+
+from app.core import database
+from app.models import anime  # pylint: disable=unused-import
+from app.models import book  # pylint: disable=unused-import
+from app.models import manga  # pylint: disable=unused-import
+from app.models import movie  # pylint: disable=unused-import
+from app.models import patron  # pylint: disable=unused-import
+
+SCHEMA = "index_plans"
+
+# The indexes created by the `lookup indexes` revision.
+LOOKUP_INDEXES = {
+    "ix_anime_proposed_by", "ix_anime_title_en", "ix_anime_updated_at",
+    "ix_book_proposed_by", "ix_book_title_orig", "ix_book_title_en",
+    "ix_book_title_it", "ix_book_updated_at", "ix_manga_proposed_by",
+    "ix_manga_title_en", "ix_manga_start_date", "ix_manga_updated_at",
+    "ix_movie_proposed_by", "ix_movie_title_orig", "ix_movie_title_en",
+    "ix_movie_title_it", "ix_movie_release_date", "ix_movie_updated_at",
+    "ix_patron_updated_at"
+}
+
+# The synthetic rows, `i` going from 1 to the number of rows. Media are
+# proposed by random patrons and updated at random times.
+FILL = (
+    """
+    INSERT INTO patron (id, created_at, updated_at, username, email, name,
+                        hashed_password, is_active, is_superuser)
+    SELECT gen_random_uuid(), now() - i * interval '1 hour',
+           now() - random() * interval '3 years', 'patron_' || i,
+           'patron_' || i || '@example.com', 'Patron ' || i, '', true, false
+    FROM generate_series(1, :patrons) AS i
+    """,
+    """
+    INSERT INTO anime (id, created_at, updated_at, proposed_by, title_en,
+                       title_jp, year)
+    SELECT gen_random_uuid(), now() - i * interval '1 minute',
+           now() - random() * interval '3 years',
+           p.ids[1 + floor(random() * p.n)::int], 'Anime ' || i,
+           'Anime jp ' || i, 1960 + i % 60
+    FROM generate_series(1, :rows) AS i,
+         (SELECT array_agg(id) AS ids, count(*) AS n FROM patron) AS p
+    """,
+    """
+    INSERT INTO book (id, created_at, updated_at, proposed_by, title_orig,
+                      title_en, title_it, author)
+    SELECT gen_random_uuid(), now() - i * interval '1 minute',
+           now() - random() * interval '3 years',
+           p.ids[1 + floor(random() * p.n)::int], 'Book orig ' || i,
+           'Book ' || i, 'Libro ' || i, 'Author ' || i % 50000
+    FROM generate_series(1, :rows) AS i,
+         (SELECT array_agg(id) AS ids, count(*) AS n FROM patron) AS p
+    """,
+    """
+    INSERT INTO manga (id, created_at, updated_at, proposed_by, title_en,
+                       title_jp, start_date)
+    SELECT gen_random_uuid(), now() - i * interval '1 minute',
+           now() - random() * interval '3 years',
+           p.ids[1 + floor(random() * p.n)::int], 'Manga ' || i,
+           'Manga jp ' || i, date '1950-01-01' + i % 27000
+    FROM generate_series(1, :rows) AS i,
+         (SELECT array_agg(id) AS ids, count(*) AS n FROM patron) AS p
+    """,
+    """
+    INSERT INTO movie (id, created_at, updated_at, proposed_by, title_orig,
+                       title_en, title_it, release_date)
+    SELECT gen_random_uuid(), now() - i * interval '1 minute',
+           now() - random() * interval '3 years',
+           p.ids[1 + floor(random() * p.n)::int], 'Movie orig ' || i,
+           'Movie ' || i, 'Film ' || i, date '1920-01-01' + i % 37000
+    FROM generate_series(1, :rows) AS i,
+         (SELECT array_agg(id) AS ids, count(*) AS n FROM patron) AS p
+    """,
+)
+
+# The explained lookups, as issued by the CRUD controllers.
+QUERIES = {
+    "PatronCRUD.get_by_username":
+        "SELECT * FROM patron WHERE username = :username",
+    "Patron.anime selectin load":
+        "SELECT * FROM anime WHERE proposed_by IN :patron_ids",
+    "Patron.movies selectin load":
+        "SELECT * FROM movie WHERE proposed_by IN :patron_ids",
+    "AnimeCRUD.read_multi_version (latest update)":
+        "SELECT max(updated_at) FROM anime",
+    "PatronCRUD.read_version (media of a patron)":
+        """SELECT
+             (SELECT max(updated_at) FROM manga WHERE proposed_by = :patron_id),
+             (SELECT count(*) FROM manga WHERE proposed_by = :patron_id)""",
+    "Manga started in a year":
+        "SELECT * FROM manga WHERE start_date BETWEEN :start AND :end",
+    "Movies released in a year":
+        "SELECT * FROM movie WHERE release_date BETWEEN :start AND :end",
+}
+
+
+async def _explain(connection: sqlalchemy.ext.asyncio.AsyncConnection,
+                   parameters: dict):
+    """Prints the plan of each query."""
+    for name, query in QUERIES.items():
+        statement = sqlalchemy.text(f"EXPLAIN (ANALYZE, BUFFERS) {query}")
+
+        if ":patron_ids" in query:
+            statement = statement.bindparams(
+                sqlalchemy.bindparam("patron_ids", expanding=True))
+
+        used = {
+            key: value
+            for key, value in parameters.items()
+            if f":{key}" in query
+        }
+        result = await connection.execute(statement, used)
+        print(f"-- {name}")
+
+        for (line,) in result:
+            print(f"   {line}")
+
+
+async def main(rows: int, patrons: int):
+    """Runs the benchmark and prints the results."""
+    metadata = sqlmodel.SQLModel.metadata
+
+    async with database.engine.connect() as connection:
+        transaction = await connection.begin()
+        await connection.execute(sqlalchemy.text(f"CREATE SCHEMA {SCHEMA}"))
+        await connection.execute(
+            sqlalchemy.text(f"SET LOCAL search_path TO {SCHEMA}, public"))
+        await connection.run_sync(metadata.create_all)
+
+        # Rows are inserted without secondary indexes, which are built next.
+        # The full-text indexes, which serve none of the lookups, are left
+        # out.
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                await connection.run_sync(index.drop)
+
+        start = time.perf_counter()
+
+        for statement in FILL:
+            await connection.execute(sqlalchemy.text(statement), {
+                "rows": rows,
+                "patrons": patrons
+            })
+
+        await connection.execute(
+            sqlalchemy.text("ANALYZE patron, anime, book, manga, movie"))
+        print(f"{rows} rows per media table and {patrons} patrons inserted in"
+              f" {time.perf_counter() - start:.1f} s")
+
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name.endswith("_created_at_id"):
+                    await connection.run_sync(index.create)
+
+        patron_ids = (await connection.execute(
+            sqlalchemy.text("SELECT id FROM patron ORDER BY random() LIMIT 3")
+        )).scalars().all()
+        parameters = {
+            "username": f"patron_{patrons // 2}",
+            "patron_ids": patron_ids,
+            "patron_id": patron_ids[0],
+            "start": datetime.date(1990, 1, 1),
+            "end": datetime.date(1990, 12, 31),
+        }
+        print("\n== Without the lookup indexes\n")
+        await _explain(connection, parameters)
+
+        start = time.perf_counter()
+
+        for table in metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name in LOOKUP_INDEXES:
+                    await connection.run_sync(index.create)
+
+        await connection.execute(
+            sqlalchemy.text("ANALYZE patron, anime, book, manga, movie"))
+        print(f"\n== With the lookup indexes, built in"
+              f" {time.perf_counter() - start:.1f} s\n")
+        await _explain(connection, parameters)
+        await transaction.rollback()
+
+    await database.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--patrons", type=int, default=10_000)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.patrons))
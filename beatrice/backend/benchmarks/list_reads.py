@@ -0,0 +1,190 @@
+"""Throughput of the list endpoints, with and without building models.
+
+The tables are created in a scratch schema and filled with synthetic
+rows, then read page by page as the list endpoints do: once as models
+serialized by FastAPI through the `response_model`, and once as rows
+encoded straight to JSON. Both must produce the same bytes. The rates are
+given per CPU second of this process, the database server excluded.
+Everything runs in a single transaction, rolled back at the end.
+
+    python -m benchmarks.list_reads [--rows 100000] [--limit 100]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import sqlalchemy
+import sqlmodel
+from fastapi import responses
+from fastapi import routing
+from sqlmodel.ext.asyncio import session as aio_session
+
+from app import main as app_main
+from app.api import encoders
+from app.core import config
+from app.core import database
+from app.crud import anime as anime_crud
+from app.crud import movie as movie_crud
+from app.models import anime as anime_model
+from app.models import movie as movie_model
+
+SCHEMA = "list_reads"
+
+# The benchmarked lists: their CRUD controller, read model and path.
+LISTS = {
+    "anime": (anime_crud.AnimeCRUD, anime_model.AnimeRead, "/anime/"),
+    "movie": (movie_crud.MovieCRUD, movie_model.MovieRead, "/movies/"),
+}
+
+# The synthetic rows, `i` going from 1 to the number of rows. Notes and
+# links are set on every other row.
+FILL = (
+    """
+    INSERT INTO patron (id, created_at, updated_at, username, email, name,
+                        hashed_password, is_active, is_superuser)
+    VALUES (gen_random_uuid(), now(), now(), 'patron', 'patron@example.com',
+            'Patron', '', true, false)
+    """,
+    """
+    INSERT INTO anime (id, created_at, updated_at, proposed_by, title_en,
+                       title_jp, season_anime, year, season_year, notes, links)
+    SELECT gen_random_uuid(), now() - i * interval '1 minute', now(),
+           (SELECT id FROM patron), 'Anime ' || i, 'Anime jp ' || i, 1 + i % 4,
+           1960 + i % 60, 'Spring', CASE WHEN i % 2 = 0
+           THEN repeat('Notes of anime ' || i || '. ', 10) END,
+           CASE WHEN i % 2 = 0 THEN 'https://example.com/anime/' || i END
+    FROM generate_series(1, :rows) AS i
+    """,
+    """
+    INSERT INTO movie (id, created_at, updated_at, proposed_by, title_orig,
+                       title_en, title_it, release_date, running_time, notes,
+                       links)
+    SELECT gen_random_uuid(), now() - i * interval '1 minute', now(),
+           (SELECT id FROM patron), 'Movie orig ' || i, 'Movie ' || i,
+           'Film ' || i, date '1920-01-01' + i % 37000, 80 + i % 100,
+           CASE WHEN i % 2 = 0
+           THEN repeat('Notes of movie ' || i || '. ', 10) END,
+           CASE WHEN i % 2 = 0 THEN 'https://example.com/movie/' || i END
+    FROM generate_series(1, :rows) AS i
+    """,
+)
+
+
+def _response_field(path: str) -> Any:
+    """Returns the response field of the list endpoint at a path."""
+    for route in app_main.app.routes:
+        if (isinstance(route, routing.APIRoute) and
+                route.path == f"{config.settings.API_V1_STR}{path}" and
+                "GET" in route.methods):
+            return route.response_field
+
+    raise LookupError(path)
+
+
+async def _read_models(session: aio_session.AsyncSession, crud: Any,
+                       response_field: Any, limit: int,
+                       timings: Dict[str, float]) -> List[bytes]:
+    """Reads all the pages as models serialized by FastAPI."""
+    pages = []
+    cursor = None
+
+    while True:
+        start = time.process_time()
+        models = await crud.read_multi(session, limit=limit, cursor=cursor)
+        timings["read"] += time.process_time() - start
+
+        if not models:
+            return pages
+
+        start = time.process_time()
+        content = await routing.serialize_response(field=response_field,
+                                                   response_content=models)
+        pages.append(responses.JSONResponse(content).body)
+        timings["encode"] += time.process_time() - start
+        cursor = crud.cursor(models[-1])
+        session.expunge_all()
+
+
+async def _read_rows(session: aio_session.AsyncSession, crud: Any,
+                     read_model: Any, limit: int,
+                     timings: Dict[str, float]) -> List[bytes]:
+    """Reads all the pages as rows encoded straight to JSON."""
+    pages = []
+    cursor = None
+    fields = list(read_model.__fields__)
+
+    while True:
+        start = time.process_time()
+        rows = await crud.read_multi(session,
+                                     limit=limit,
+                                     cursor=cursor,
+                                     fields=fields)
+        timings["read"] += time.process_time() - start
+
+        if not rows:
+            return pages
+
+        start = time.process_time()
+        pages.append(encoders.encode_rows(read_model, rows))
+        timings["encode"] += time.process_time() - start
+        cursor = crud.cursor(rows[-1])
+
+
+def _report(name: str, rows: int, timings: Dict[str, float]):
+    """Prints the rates of a path."""
+    total = timings["read"] + timings["encode"]
+    print(f"   {name:<8} read {rows / timings['read']:>9,.0f} rows/s"
+          f"   encode {rows / timings['encode']:>9,.0f} rows/s"
+          f"   total {rows / total:>9,.0f} rows/s")
+
+
+async def main(rows: int, limit: int):
+    """Runs the benchmark and prints the results."""
+    # Every page must be read from the database.
+    config.settings.CACHE_ENABLED = False
+    metadata = sqlmodel.SQLModel.metadata
+
+    async with database.engine.connect() as connection:
+        transaction = await connection.begin()
+        await connection.execute(sqlalchemy.text(f"CREATE SCHEMA {SCHEMA}"))
+        await connection.execute(
+            sqlalchemy.text(f"SET LOCAL search_path TO {SCHEMA}, public"))
+        await connection.run_sync(metadata.create_all)
+
+        for statement in FILL:
+            await connection.execute(sqlalchemy.text(statement), {"rows": rows})
+
+        await connection.execute(sqlalchemy.text("ANALYZE anime, movie"))
+        session = aio_session.AsyncSession(connection)
+        print(f"{rows} rows per list, {limit} rows per page, per CPU second")
+
+        for name, (crud, read_model, path) in LISTS.items():
+            model_timings = {"read": 0.0, "encode": 0.0}
+            row_timings = {"read": 0.0, "encode": 0.0}
+            model_pages = await _read_models(session, crud,
+                                             _response_field(path), limit,
+                                             model_timings)
+            row_pages = await _read_rows(session, crud, read_model, limit,
+                                         row_timings)
+
+            if model_pages != row_pages:
+                raise AssertionError(f"The {name} pages differ")
+
+            print(f"\n== {name}, {len(row_pages)} identical pages\n")
+            _report("models", rows, model_timings)
+            _report("rows", rows, row_timings)
+
+        await session.close()
+        await transaction.rollback()
+
+    await database.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=100)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.limit))
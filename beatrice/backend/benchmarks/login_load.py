@@ -0,0 +1,98 @@
+"""Login throughput and latency of unrelated requests under login load.
+
+Concurrent clients log in repeatedly while another client keeps reading
+the anime list. With `--inline`, passwords are hashed on the event loop
+as they used to be, for comparison.
+
+    python -m benchmarks.login_load [--logins 8] [--seconds 10] [--inline]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import urllib.parse
+
+from app.core import config
+from app.core import security
+from app.main import app
+from benchmarks import asgi
+
+
+async def _login() -> str:
+    """Logs the admin in and returns the access token."""
+    body = urllib.parse.urlencode({
+        "username": config.settings.ADMIN_USERNAME,
+        "password": config.settings.ADMIN_PASSWORD
+    }).encode()
+    status, _, content = await asgi.request(
+        app,
+        "POST",
+        f"{config.settings.API_V1_STR}/login/token",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+        body=body)
+    assert status == 200, content
+
+    return json.loads(content)["access_token"]
+
+
+async def _login_loop(deadline: float) -> int:
+    """Logs in until the deadline and returns the number of logins."""
+    logins = 0
+
+    while time.monotonic() < deadline:
+        await _login()
+        logins += 1
+
+    return logins
+
+
+async def _read_loop(deadline: float, token: str) -> list[float]:
+    """Reads the anime list until the deadline and returns the latencies."""
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        status, _, _ = await asgi.request(
+            app,
+            "GET",
+            f"{config.settings.API_V1_STR}/anime/?limit=10",
+            headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert status == 200
+        await asyncio.sleep(0.01)
+
+    return latencies
+
+
+async def main(logins: int, seconds: float, inline: bool):
+    """Runs the benchmark and prints the results."""
+    if inline:
+
+        async def run_inline(func, *args):
+            return func(*args)
+
+        security.password_hasher._run = run_inline  # pylint: disable=protected-access
+
+    token = await _login()
+    deadline = time.monotonic() + seconds
+    results = await asyncio.gather(
+        _read_loop(deadline, token),
+        *(_login_loop(deadline) for _ in range(logins)))
+    latencies, login_counts = results[0], results[1:]
+
+    print(f"mode: {'inline' if inline else security.password_hasher.pool}"
+          f" ({security.password_hasher.workers} workers)")
+    print(f"logins/s: {sum(login_counts) / seconds:.1f}")
+    print(f"GET /anime p50: {asgi.percentile(latencies, 0.5) * 1000:.1f} ms")
+    print(f"GET /anime p99: {asgi.percentile(latencies, 0.99) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--inline", action="store_true")
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.logins, arguments.seconds, arguments.inline))
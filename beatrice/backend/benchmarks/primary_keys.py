@@ -0,0 +1,92 @@
+"""Insert throughput of random and time-ordered primary keys.
+
+A table shaped like the media tables is created in a scratch schema for
+each id strategy of `app.core.ids`, and filled in batches with the ids it
+generates, as the bulk endpoints do. The time spent generating the ids is
+given apart from the time spent inserting them, along with the size of
+the primary key index built meanwhile. Everything runs in a single
+transaction, rolled back at the end.
+
+    python -m benchmarks.primary_keys [--rows 1000000] [--batch-size 10000]
+"""
+
+import argparse
+import asyncio
+import time
+
+import sqlalchemy
+
+from app.core import database
+from app.core import ids
+
+SCHEMA = "primary_keys"
+
+TABLE = """
+CREATE TABLE {table} (
+    id uuid PRIMARY KEY,
+    created_at timestamp NOT NULL,
+    title_en varchar NOT NULL
+)
+"""
+
+INSERT = """
+INSERT INTO {table} (id, created_at, title_en)
+SELECT id, clock_timestamp(), 'Title ' || id
+FROM unnest(CAST(:ids AS uuid[])) AS id
+"""
+
+SIZES = """
+SELECT pg_relation_size(CAST(:table AS regclass)),
+       pg_relation_size(CAST(:index AS regclass))
+"""
+
+
+async def _fill(connection: sqlalchemy.ext.asyncio.AsyncConnection,
+                strategy: str, rows: int, batch_size: int):
+    """Fills the table of a strategy and prints the results."""
+    table = f"{SCHEMA}.{strategy}"
+    generate = ids.GENERATORS[strategy]
+    await connection.execute(sqlalchemy.text(TABLE.format(table=table)))
+    insert = sqlalchemy.text(INSERT.format(table=table))
+    generating = inserting = 0.0
+
+    for start in range(0, rows, batch_size):
+        begin = time.perf_counter()
+        model_ids = [generate() for _ in range(min(batch_size, rows - start))]
+        generated = time.perf_counter()
+        await connection.execute(insert, {"ids": model_ids})
+        generating += generated - begin
+        inserting += time.perf_counter() - generated
+
+    sizes = await connection.execute(sqlalchemy.text(SIZES), {
+        "table": table,
+        "index": f"{table}_pkey"
+    })
+    table_size, index_size = sizes.one()
+    print(f"{strategy}: ids generated in {generating:.2f} s, inserted in"
+          f" {inserting:.1f} s ({rows / inserting:,.0f} rows/s), table"
+          f" {table_size / 2**20:.0f} MiB, primary key"
+          f" {index_size / 2**20:.0f} MiB")
+
+
+async def main(rows: int, batch_size: int):
+    """Runs the benchmark and prints the results."""
+    async with database.engine.connect() as connection:
+        transaction = await connection.begin()
+        await connection.execute(sqlalchemy.text(f"CREATE SCHEMA {SCHEMA}"))
+        print(f"{rows} rows inserted in batches of {batch_size}\n")
+
+        for strategy in ids.GENERATORS:
+            await _fill(connection, strategy, rows, batch_size)
+
+        await transaction.rollback()
+
+    await database.engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    arguments = parser.parse_args()
+    asyncio.run(main(arguments.rows, arguments.batch_size))
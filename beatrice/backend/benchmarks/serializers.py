@@ -0,0 +1,175 @@
+"""Serialization time and payload size of the response serializers.
+
+Payloads of 100 items are built in memory as the endpoints return them,
+then validated against their response model and serialized: as FastAPI
+does, with `jsonable_encoder` and `json`, and as `serialization.Route`
+does, with orjson and MessagePack. Both JSON payloads must be equal once
+parsed.
+
+    python -m benchmarks.serializers [--items 100] [--repeat 200]
+"""
+
+import argparse
+import datetime
+import functools
+import json
+import time
+import uuid
+from typing import Any, Callable, List
+
+import msgpack
+from fastapi import encoders
+from fastapi import responses
+from fastapi import utils
+from pydantic import fields
+
+from app.api import serialization
+from app.models import anime as anime_model
+from app.models import book as book_model
+from app.models import manga as manga_model
+from app.models import movie as movie_model
+from app.models import patron as patron_model
+
+
+def _anime(index: int, patron_id: uuid.UUID) -> anime_model.Anime:
+    """Returns an anime."""
+    return anime_model.Anime(id=uuid.uuid4(),
+                             proposed_by=patron_id,
+                             title_en=f"Anime {index}",
+                             title_jp=f"アニメ {index}",
+                             season_anime=1 + index % 4,
+                             year=1960 + index % 60,
+                             season_year="Spring",
+                             notes=f"Notes of anime {index}. " * 10,
+                             links=f"https://example.com/anime/{index}")
+
+
+def _movie(index: int, patron_id: uuid.UUID) -> movie_model.Movie:
+    """Returns a movie."""
+    return movie_model.Movie(id=uuid.uuid4(),
+                             proposed_by=patron_id,
+                             title_orig=f"Movie orig {index}",
+                             title_en=f"Movie {index}",
+                             title_it=f"Film {index}",
+                             release_date=datetime.date(1920, 1, 1) +
+                             datetime.timedelta(days=index),
+                             running_time=80 + index % 100,
+                             notes=f"Notes of movie {index}. " * 10)
+
+
+def _patron(items: int) -> patron_model.Patron:
+    """Returns a patron who proposed the given number of media."""
+    patron = patron_model.Patron(id=uuid.uuid4(),
+                                 username="patron",
+                                 email="patron@example.com",
+                                 name="Patron")
+    indexes = range(items // 4)
+    # Relationships cannot be given to the constructor.
+    patron.anime = [_anime(index, patron.id) for index in indexes]
+    patron.movies = [_movie(index, patron.id) for index in indexes]
+    patron.manga = [
+        manga_model.Manga(id=uuid.uuid4(),
+                          proposed_by=patron.id,
+                          title_en=f"Manga {index}",
+                          title_jp=f"漫画 {index}",
+                          start_date=datetime.date(1950, 1, 1) +
+                          datetime.timedelta(days=index),
+                          end_date=datetime.date(1960, 1, 1) +
+                          datetime.timedelta(days=index)) for index in indexes
+    ]
+    patron.books = [
+        book_model.Book(id=uuid.uuid4(),
+                        proposed_by=patron.id,
+                        title_orig=f"Book orig {index}",
+                        title_en=f"Book {index}",
+                        title_it=f"Libro {index}",
+                        author=f"Author {index}",
+                        release_year=1900 + index) for index in indexes
+    ]
+
+    return patron
+
+
+def _validate(field: fields.ModelField, content: Any) -> Any:
+    """Validates content against a response field."""
+    value, errors = field.validate(content, {}, loc=("response",))
+
+    if errors:
+        raise AssertionError(f"The payload is invalid: {errors}")
+
+    return value
+
+
+def _fastapi_json(field: fields.ModelField, content: Any) -> bytes:
+    """Serializes content as FastAPI does."""
+    return responses.JSONResponse(
+        encoders.jsonable_encoder(_validate(field, content))).body
+
+
+def _serialized(field: fields.ModelField, content: Any,
+                media_type: str) -> bytes:
+    """Serializes content as `serialization.Route` does."""
+    return serialization.render(_validate(field, content), media_type)
+
+
+def _time(serialize: Callable[[], Any], repeat: int) -> float:
+    """Returns the mean time of a serialization, in milliseconds."""
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        serialize()
+
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main(items: int, repeat: int):
+    """Runs the benchmark and prints the results."""
+    patron = _patron(items)
+    payloads = {
+        f"List[AnimeRead], {items} items":
+            (List[anime_model.AnimeRead],
+             [_anime(index, patron.id) for index in range(items)]),
+        f"List[MovieRead], {items} items":
+            (List[movie_model.MovieRead],
+             [_movie(index, patron.id) for index in range(items)]),
+        f"PatronReadWithMedia, {items} media":
+            (patron_model.PatronReadWithMedia, patron),
+    }
+
+    for name, (response_model, content) in payloads.items():
+        # Routes validate against a clone of their response model, which
+        # reads ORM instances along with their relationships.
+        field = utils.create_cloned_field(
+            utils.create_response_field(name="response", type_=response_model))
+        serializers = {
+            "FastAPI JSON":
+                functools.partial(_fastapi_json, field, content),
+            "orjson":
+                functools.partial(_serialized, field, content,
+                                  serialization.JSON_MEDIA_TYPE),
+            "MessagePack":
+                functools.partial(_serialized, field, content,
+                                  serialization.MSGPACK_MEDIA_TYPE),
+        }
+        expected = json.loads(serializers["FastAPI JSON"]())
+
+        if json.loads(serializers["orjson"]()) != expected:
+            raise AssertionError(f"The JSON payloads of {name} differ")
+        if msgpack.unpackb(serializers["MessagePack"]()) != expected:
+            raise AssertionError(f"The MessagePack payload of {name} differs")
+
+        validation = _time(functools.partial(_validate, field, content), repeat)
+        print(f"\n== {name}\n")
+        print(f"   {'validation only':<16} {validation:>7.2f} ms")
+
+        for label, serialize in serializers.items():
+            print(f"   {label:<16} {_time(serialize, repeat):>7.2f} ms"
+                  f"   {len(serialize()):>9,} bytes")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    arguments = parser.parse_args()
+    main(arguments.items, arguments.repeat)
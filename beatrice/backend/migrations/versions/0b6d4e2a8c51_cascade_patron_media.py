@@ -0,0 +1,56 @@
+"""cascade patron media
+
+Revision ID: 0b6d4e2a8c51
+Revises: f3c81a6e9d27
+Create Date: 2026-10-18 23:31:18.529407
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '0b6d4e2a8c51'
+down_revision = 'f3c81a6e9d27'
+branch_labels = None
+depends_on = None
+
+# The media tables, whose rows reference the patron who proposed them.
+TABLES = ('anime', 'book', 'manga', 'movie')
+
+
+def replace_foreign_key(table, on_delete):
+    # The constraint is replaced without checking the rows, so the table is
+    # only locked for as long as the migration transaction lasts.
+    op.execute(f'ALTER TABLE {table} '
+               f'DROP CONSTRAINT {table}_proposed_by_fkey, '
+               f'ADD CONSTRAINT {table}_proposed_by_fkey '
+               f'FOREIGN KEY (proposed_by) REFERENCES patron (id) '
+               f'ON DELETE {on_delete} NOT VALID')
+
+
+def validate_foreign_keys(tables):
+    # The rows are checked once the new constraints are committed, outside
+    # of the migration transaction: validating only takes locks letting
+    # writes go on, on both the table and the patrons.
+    with op.get_context().autocommit_block():
+        for table in tables:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT '
+                       f'{table}_proposed_by_fkey')
+
+
+# Deleting a patron deletes their media, unless they were reassigned first,
+# as declared by the foreign keys of the media models.
+def upgrade():
+    for table in TABLES:
+        replace_foreign_key(table, 'CASCADE')
+
+    validate_foreign_keys(TABLES)
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        replace_foreign_key(table, 'NO ACTION')
+
+    validate_foreign_keys(reversed(TABLES))
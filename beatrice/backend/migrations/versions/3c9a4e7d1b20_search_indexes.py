@@ -0,0 +1,48 @@
+"""search indexes
+
+Revision ID: 3c9a4e7d1b20
+Revises: f11e36727751
+Create Date: 2026-10-18 12:04:55.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a4e7d1b20'
+down_revision = 'f11e36727751'
+branch_labels = None
+depends_on = None
+
+# The columns of the text search document of each table, which must match
+# `app.models.search.document`.
+DOCUMENTS = {
+    'anime': ('title_en', 'title_jp', 'notes'),
+    'book': ('title_orig', 'title_en', 'title_it', 'author', 'notes'),
+    'manga': ('title_en', 'title_jp', 'notes'),
+    'movie': ('title_orig', 'title_en', 'title_it', 'notes'),
+}
+
+
+def _document(columns):
+    text = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+
+    return sa.text(f"to_tsvector('simple'::regconfig, {text})")
+
+
+# Indexes are built concurrently, as in the keyset indexes revision.
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table, columns in DOCUMENTS.items():
+            op.create_index(f'ix_{table}_search', table, [_document(columns)],
+                            unique=False, postgresql_using='gin',
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in reversed(list(DOCUMENTS)):
+            op.drop_index(f'ix_{table}_search', table_name=table,
+                          postgresql_concurrently=True)
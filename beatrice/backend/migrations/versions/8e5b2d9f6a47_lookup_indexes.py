@@ -0,0 +1,47 @@
+"""lookup indexes
+
+Revision ID: 8e5b2d9f6a47
+Revises: 3c9a4e7d1b20
+Create Date: 2026-10-18 15:21:09.407615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = '8e5b2d9f6a47'
+down_revision = '3c9a4e7d1b20'
+branch_labels = None
+depends_on = None
+
+# The indexed columns of each table.
+INDEXES = {
+    'anime': ('proposed_by', 'title_en', 'updated_at'),
+    'book': ('proposed_by', 'title_orig', 'title_en', 'title_it',
+             'updated_at'),
+    'manga': ('proposed_by', 'title_en', 'start_date', 'updated_at'),
+    'movie': ('proposed_by', 'title_orig', 'title_en', 'title_it',
+              'release_date', 'updated_at'),
+    'patron': ('updated_at',),
+}
+
+
+# Indexes are built concurrently, so that the tables are not locked against
+# writes meanwhile, which cannot be done inside a transaction. A failed
+# build leaves an invalid index behind, to be dropped before trying again.
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table, columns in INDEXES.items():
+            for column in columns:
+                op.create_index(f'ix_{table}_{column}', table, [column],
+                                unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, columns in reversed(list(INDEXES.items())):
+            for column in reversed(columns):
+                op.drop_index(f'ix_{table}_{column}', table_name=table,
+                              postgresql_concurrently=True)
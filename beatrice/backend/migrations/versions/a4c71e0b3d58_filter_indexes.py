@@ -0,0 +1,41 @@
+"""filter indexes
+
+Revision ID: a4c71e0b3d58
+Revises: 8e5b2d9f6a47
+Create Date: 2026-10-18 17:02:47.915230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c71e0b3d58'
+down_revision = '8e5b2d9f6a47'
+branch_labels = None
+depends_on = None
+
+# The indexed columns of each table.
+INDEXES = {
+    'anime': ('year', 'season_year'),
+    'book': ('author', 'release_year'),
+    'movie': ('running_time',),
+}
+
+
+# Indexes are built concurrently, as in the lookup indexes revision.
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table, columns in INDEXES.items():
+            for column in columns:
+                op.create_index(f'ix_{table}_{column}', table, [column],
+                                unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, columns in reversed(list(INDEXES.items())):
+            for column in reversed(columns):
+                op.drop_index(f'ix_{table}_{column}', table_name=table,
+                              postgresql_concurrently=True)
@@ -0,0 +1,59 @@
+"""unique titles
+
+Revision ID: d2f8b61c9e04
+Revises: a4c71e0b3d58
+Create Date: 2026-10-18 19:12:35.604918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2f8b61c9e04'
+down_revision = 'a4c71e0b3d58'
+branch_labels = None
+depends_on = None
+
+# The tables whose English titles become unique.
+TABLES = ('anime', 'book', 'manga', 'movie')
+
+
+# Duplicate titles must be merged or renamed by hand beforehand, since
+# building a unique index over them fails halfway through.
+def check_duplicates():
+    connection = op.get_bind()
+    duplicates = []
+
+    for table in TABLES:
+        rows = connection.execute(
+            sa.text(f'SELECT title_en FROM {table} GROUP BY title_en '
+                    'HAVING count(*) > 1 ORDER BY title_en LIMIT 10'))
+        duplicates.extend(f'{table}: {row.title_en!r}' for row in rows)
+
+    if duplicates:
+        raise RuntimeError('Duplicate titles must be merged or renamed '
+                           'first:\n' + '\n'.join(duplicates))
+
+
+# The unique indexes replace the lookup ones, and are built concurrently,
+# as in the lookup indexes revision.
+def upgrade():
+    check_duplicates()
+
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(f'uq_{table}_title_en', table, ['title_en'],
+                            unique=True, postgresql_concurrently=True)
+            op.drop_index(f'ix_{table}_title_en', table_name=table,
+                          postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.create_index(f'ix_{table}_title_en', table, ['title_en'],
+                            unique=False, postgresql_concurrently=True)
+            op.drop_index(f'uq_{table}_title_en', table_name=table,
+                          postgresql_concurrently=True)
@@ -0,0 +1,57 @@
+"""time ordered ids
+
+Revision ID: e7a93c5d2b18
+Revises: d2f8b61c9e04
+Create Date: 2026-10-18 20:47:51.183062
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a93c5d2b18'
+down_revision = 'd2f8b61c9e04'
+branch_labels = None
+depends_on = None
+
+# The tables whose ids become time-ordered.
+TABLES = ('patron', 'anime', 'book', 'manga', 'movie')
+
+# Returns a version 7 UUID, made of a random one whose first 48 bits are
+# replaced by the Unix timestamp in milliseconds, and whose version bits
+# are turned from 4 into 7.
+UUID_GENERATE_V7 = """
+CREATE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+    SELECT encode(
+        set_bit(
+            set_bit(
+                overlay(uuid_send(gen_random_uuid())
+                        PLACING substring(int8send(floor(
+                            extract(epoch FROM clock_timestamp()) * 1000
+                        )::bigint) FROM 3)
+                        FROM 1 FOR 6),
+                52, 1),
+            53, 1),
+        'hex')::uuid
+$$ LANGUAGE sql VOLATILE
+"""
+
+
+# The ids of new models are generated by the application, so the defaults
+# only serve the rows inserted by hand. Existing ids are left as they are,
+# since the foreign keys point to them.
+def upgrade():
+    op.execute(UUID_GENERATE_V7)
+
+    for table in TABLES:
+        op.alter_column(table, 'id',
+                        server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        op.alter_column(table, 'id', server_default=None)
+
+    op.execute('DROP FUNCTION uuid_generate_v7()')
@@ -0,0 +1,37 @@
+"""keyset indexes
+
+Revision ID: f11e36727751
+Revises: b54739582e4a
+Create Date: 2026-10-18 09:12:41.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'f11e36727751'
+down_revision = 'b54739582e4a'
+branch_labels = None
+depends_on = None
+
+TABLES = ('anime', 'book', 'manga', 'movie', 'patron')
+
+
+# Indexes are built concurrently, outside of the migration transaction,
+# so that writes to the tables go on during the builds. An interrupted
+# build leaves an invalid index, which must be dropped before retrying.
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(f'ix_{table}_created_at_id', table,
+                            ['created_at', 'id'], unique=False,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.drop_index(f'ix_{table}_created_at_id', table_name=table,
+                          postgresql_concurrently=True)
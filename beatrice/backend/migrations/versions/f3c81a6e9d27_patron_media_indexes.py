@@ -0,0 +1,43 @@
+"""patron media indexes
+
+Revision ID: f3c81a6e9d27
+Revises: e7a93c5d2b18
+Create Date: 2026-10-18 22:05:43.716290
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c81a6e9d27'
+down_revision = 'e7a93c5d2b18'
+branch_labels = None
+depends_on = None
+
+# The media tables, whose pages by patron are read in keyset order.
+TABLES = ('anime', 'book', 'manga', 'movie')
+
+
+# The indexes serve the pages of the media of a patron, sorted as keysets
+# are, as well as the lookups by patron, so they replace the indexes on
+# `proposed_by` alone. They are built concurrently, as in the lookup
+# indexes revision.
+def upgrade():
+    with op.get_context().autocommit_block():
+        for table in TABLES:
+            op.create_index(f'ix_{table}_proposed_by_created_at_id', table,
+                            ['proposed_by', 'created_at', 'id'],
+                            unique=False, postgresql_concurrently=True)
+            op.drop_index(f'ix_{table}_proposed_by', table_name=table,
+                          postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table in reversed(TABLES):
+            op.create_index(f'ix_{table}_proposed_by', table, ['proposed_by'],
+                            unique=False, postgresql_concurrently=True)
+            op.drop_index(f'ix_{table}_proposed_by_created_at_id',
+                          table_name=table, postgresql_concurrently=True)